@@ -0,0 +1,93 @@
+import copy
+import threading
+import time
+from django.conf import settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+
+class UserCache:
+    """
+    Per-process cache of users by id, each entry kept for `ttl` seconds.
+
+    It lives in process memory, so invalidate() only reaches the current
+    process; other processes see a change once their entry expires.
+    """
+
+    def __init__(self, ttl, max_entries=10000, clock=time.monotonic):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries = {}
+        self._lock = threading.Lock()
+        # Bumped by every invalidation, so a load that raced one is not cached
+        self._generation = 0
+
+    def get(self, user_id, load):
+        """Copy of the cached user, loading it with `load(user_id)` on a miss (None is not cached)"""
+        # Tokens carry the id as a string; invalidate() callers pass the pk
+        key = str(user_id)
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= now:
+            generation = self._generation
+            user = load(user_id)
+            if user is None:
+                return None
+            with self._lock:
+                if generation == self._generation:
+                    if len(self._entries) >= self.max_entries:
+                        self._entries = {k: v for k, v in self._entries.items() if v[1] > now}
+                        if len(self._entries) >= self.max_entries:
+                            self._entries.clear()
+                    self._entries[key] = (user, now + self.ttl)
+        else:
+            user = entry[0]
+        # Requests may modify request.user; never hand out the shared instance
+        return copy.copy(user)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._generation += 1
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+user_cache = UserCache(ttl=settings.AUTH_USER_CACHE_TTL)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that resolves the user_id claim through user_cache
+    instead of a users SELECT on every request. The active and revoked-token
+    checks still run on every request, against the cached user.
+    """
+
+    def _load(self, user_id):
+        return self.user_model.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first()
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = user_cache.get(user_id, self._load)
+        if user is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+
+        return user
@@ -0,0 +1,35 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+
+class Command(BaseCommand):
+    help = 'Delete expired outstanding and blacklisted refresh tokens, a chunk of rows at a time. Run it from cron.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='tokens deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.0, help='seconds to sleep between chunks')
+
+    def handle(self, *args, **options):
+        chunk_size = max(options['chunk_size'], 1)
+        now = timezone.now()
+        last_id = 0
+        deleted = 0
+        while True:
+            # Walk the primary key so each chunk is a short range scan, oldest tokens first
+            ids = list(
+                OutstandingToken.objects.filter(id__gt=last_id, expires_at__lte=now)
+                .order_by('id').values_list('id', flat=True)[:chunk_size]
+            )
+            if not ids:
+                break
+            with db_transaction.atomic():
+                BlacklistedToken.objects.filter(token_id__in=ids).delete()
+                OutstandingToken.objects.filter(id__in=ids).delete()
+            deleted += len(ids)
+            last_id = ids[-1]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired tokens.'))
@@ -0,0 +1,137 @@
+"""
+Per-process filter of revoked refresh tokens.
+
+simplejwt checks every refresh token against the blacklist tables with a
+query. RevocationFilter keeps a Bloom filter of blacklisted JTIs in memory, so
+a token that was never revoked (the common case) is accepted without a query.
+A positive from the filter (a revoked token, or a ~1% false positive) falls
+back to simplejwt's exact database check, so the filter never rejects a valid
+token.
+
+Tokens revoked by this process are added immediately. Revocations made by
+other processes are picked up by a sync every `sync_interval` seconds, which
+reads the blacklist's recent rows by primary key, so other processes may
+accept a just-revoked token for up to that long.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        positions = self._positions(item)
+        if all(self.bits[position >> 3] & (1 << (position & 7)) for position in positions):
+            # Already present (or indistinguishable from it); do not count it twice
+            return
+        for position in positions:
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class RevocationFilter:
+    # Ids missing just below a row this recent may belong to a blacklist
+    # insert that has not committed yet; they are re-checked until then
+    commit_margin = timedelta(seconds=60)
+    max_gap = 100
+    load_chunk_size = 5000
+
+    def __init__(self, capacity, sync_interval, error_rate=0.01, clock=time.monotonic):
+        self.capacity = capacity
+        self.sync_interval = sync_interval
+        self.error_rate = error_rate
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Forget everything; the next check reloads the blacklist"""
+        self._bloom = None
+        self._watermark = 0
+        self._gaps = {}
+        self._synced_at = None
+
+    def might_be_revoked(self, jti):
+        if self._synced_at is None or self._clock() - self._synced_at >= self.sync_interval:
+            self.sync()
+        return jti in self._bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self._bloom is not None:
+                self._bloom.add(jti)
+
+    def sync(self):
+        with self._lock:
+            if self._bloom is None or self._bloom.count > self._bloom.capacity:
+                # Sized for what is stored now; purge_expired_tokens keeps that bounded
+                self._bloom = BloomFilter(max(self.capacity, BlacklistedToken.objects.count() * 2), self.error_rate)
+                self._watermark = 0
+                self._gaps = {}
+            self._read_new()
+            self._synced_at = self._clock()
+
+    def _read_new(self):
+        now = timezone.now()
+        if self._gaps:
+            for row_id, jti in BlacklistedToken.objects.filter(id__in=list(self._gaps)).values_list('id', 'token__jti'):
+                self._bloom.add(jti)
+                del self._gaps[row_id]
+            self._gaps = {row_id: deadline for row_id, deadline in self._gaps.items() if deadline > now}
+
+        rows = BlacklistedToken.objects.order_by('id')
+        while True:
+            chunk = list(
+                rows.filter(id__gt=self._watermark)
+                .values_list('id', 'token__jti', 'blacklisted_at')[:self.load_chunk_size]
+            )
+            for row_id, jti, blacklisted_at in chunk:
+                self._bloom.add(jti)
+                deadline = blacklisted_at + self.commit_margin
+                if deadline > now:
+                    for missing in range(max(self._watermark + 1, row_id - self.max_gap), row_id):
+                        self._gaps.setdefault(missing, deadline)
+                self._watermark = row_id
+            if len(chunk) < self.load_chunk_size:
+                return
+
+
+revocation_filter = RevocationFilter(
+    capacity=settings.TOKEN_REVOCATION_BLOOM_CAPACITY,
+    sync_interval=settings.TOKEN_REVOCATION_SYNC_INTERVAL,
+)
+
+
+class FilteredRefreshToken(RefreshToken):
+    """RefreshToken whose blacklist check and blacklisting go through revocation_filter"""
+
+    def check_blacklist(self):
+        if revocation_filter.might_be_revoked(self.payload[api_settings.JTI_CLAIM]):
+            super().check_blacklist()
+
+    def blacklist(self):
+        result = super().blacklist()
+        revocation_filter.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .revocation import FilteredRefreshToken
 
 User = get_user_model()
 
@@ -45,3 +47,8 @@ class PasswordChangeSerializer(serializers.Serializer):
         if attrs['new_password'] != attrs['new_password2']:
             raise serializers.ValidationError({"new_password": "Passwords do not match."})
         return attrs
+
+
+class FilteredTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh serializer that skips the blacklist query for tokens the revocation filter has never seen"""
+    token_class = FilteredRefreshToken
@@ -1,14 +1,27 @@
-from django.test import TestCase
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from .authentication import user_cache
+from .revocation import BloomFilter, FilteredRefreshToken, revocation_filter
 
 User = get_user_model()
 
 
 class AuthTestCase(TestCase):
     def setUp(self):
+        user_cache.clear()
         self.client = APIClient()
         self.register_url = reverse('register')
         self.login_url = reverse('token_obtain_pair')
@@ -97,3 +110,103 @@ class AuthTestCase(TestCase):
         user = User.objects.get(email='test@example.com')
         self.assertNotEqual(user.password, 'SecurePass@123')
         self.assertTrue(user.password.startswith('pbkdf2_'))
+
+
+@override_settings(ADMIN_LOG_MODE='inline')
+class CachedJWTAuthenticationTestCase(TestCase):
+    def setUp(self):
+        user_cache.clear()
+        self.user = User.objects.create_user(email='cached@test.com', username='cached', password='SecurePass@123')
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.admin = User.objects.create_user(
+            email='boss@test.com', username='boss', password='SecurePass@123', is_admin=True, is_staff=True,
+        )
+        self.admin_client = APIClient()
+        self.admin_client.force_authenticate(user=self.admin)
+
+    def test_warm_requests_run_no_auth_queries(self):
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_200_OK)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('profile'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
+
+    def test_deactivation_locks_out_immediately(self):
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_200_OK)
+        self.admin_client.patch(reverse('admin-user-detail', args=[self.user.id]), {'is_active': False}, format='json')
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_user_is_rejected(self):
+        self.client.get(reverse('profile'))
+        self.admin_client.delete(reverse('admin-user-detail', args=[self.user.id]))
+        self.assertEqual(self.client.get(reverse('profile')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_profile_update_is_seen_by_the_next_request(self):
+        self.client.get(reverse('profile'))
+        self.client.patch(reverse('profile'), {'first_name': 'Renamed'}, format='json')
+        self.assertEqual(self.client.get(reverse('profile')).data['first_name'], 'Renamed')
+
+    def test_cached_user_is_not_shared_between_requests(self):
+        load = lambda user_id: User.objects.get(pk=user_id)
+        first = user_cache.get(self.user.id, load)
+        first.first_name = 'Mutated'
+        self.assertNotEqual(user_cache.get(self.user.id, load).first_name, 'Mutated')
+
+
+class RevocationFilterTestCase(TestCase):
+    def setUp(self):
+        revocation_filter.reset()
+        self.client = APIClient()
+        self.user = User.objects.create_user(email='revoke@test.com', username='revoke', password='SecurePass@123')
+
+    def test_bloom_filter_has_no_false_negatives(self):
+        bloom = BloomFilter(capacity=5000)
+        for i in range(5000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(5000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(5000))
+        self.assertLess(false_positives, 150)
+
+    def test_unrevoked_token_is_checked_without_a_query(self):
+        refresh = str(RefreshToken.for_user(self.user))
+        revocation_filter.sync()
+        with mock.patch.object(revocation_filter, 'sync_interval', 3600):
+            with CaptureQueriesContext(connection) as queries:
+                FilteredRefreshToken(refresh)
+        self.assertEqual(len(queries), 0)
+
+    def test_rotated_and_logged_out_tokens_are_rejected(self):
+        first = str(RefreshToken.for_user(self.user))
+        response = self.client.post(reverse('token_refresh'), {'refresh': first}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second = response.data['refresh']
+        replay = self.client.post(reverse('token_refresh'), {'refresh': first}, format='json')
+        self.assertEqual(replay.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        self.client.post(reverse('logout'), {'refresh': second}, format='json')
+        response = self.client.post(reverse('token_refresh'), {'refresh': second}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_revocations_by_other_processes_are_picked_up_by_sync(self):
+        token = RefreshToken.for_user(self.user)
+        revocation_filter.sync()
+        # Blacklisted the way another process would, bypassing this process's filter
+        RefreshToken(str(token)).blacklist()
+        revocation_filter.sync()
+        with self.assertRaises(TokenError):
+            FilteredRefreshToken(str(token))
+
+    def test_purge_deletes_expired_tokens_in_chunks(self):
+        past = timezone.now() - timedelta(days=1)
+        for i in range(5):
+            expired = OutstandingToken.objects.create(user=self.user, jti=f'old-{i}', token='x', expires_at=past)
+            if i % 2:
+                BlacklistedToken.objects.create(token=expired)
+        live = RefreshToken.for_user(self.user)
+        live.blacklist()
+
+        call_command('purge_expired_tokens', '--chunk-size', '2', stdout=StringIO())
+        self.assertEqual(list(OutstandingToken.objects.values_list('jti', flat=True)), [live['jti']])
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
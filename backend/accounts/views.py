@@ -5,6 +5,8 @@ from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth import get_user_model
+from .authentication import user_cache
+from .revocation import FilteredRefreshToken
 from .serializers import RegisterSerializer, UserSerializer, PasswordChangeSerializer
 
 User = get_user_model()
@@ -52,7 +54,7 @@ class LogoutView(APIView):
             refresh_token = request.data.get('refresh')
             if not refresh_token:
                 return Response({'error': 'Refresh token is required.'}, status=status.HTTP_400_BAD_REQUEST)
-            token = RefreshToken(refresh_token)
+            token = FilteredRefreshToken(refresh_token)
             token.blacklist()
             return Response({'message': 'Successfully logged out.'}, status=status.HTTP_200_OK)
         except Exception as e:
@@ -66,6 +68,10 @@ class ProfileView(generics.RetrieveUpdateAPIView):
     def get_object(self):
         return self.request.user
 
+    def perform_update(self, serializer):
+        user = serializer.save()
+        user_cache.invalidate(user.pk)
+
 
 class PasswordChangeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
@@ -78,4 +84,5 @@ class PasswordChangeView(APIView):
             return Response({'error': 'Old password is incorrect.'}, status=status.HTTP_400_BAD_REQUEST)
         user.set_password(serializer.validated_data['new_password'])
         user.save()
+        user_cache.invalidate(user.pk)
         return Response({'message': 'Password changed successfully.'}, status=status.HTTP_200_OK)
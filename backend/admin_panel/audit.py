@@ -0,0 +1,146 @@
+"""
+Admin audit log writer.
+
+With ADMIN_LOG_MODE = 'buffered', record() appends the AdminLog entry to an
+in-memory buffer and returns; a background thread writes the buffer with one
+bulk_create once `batch_size` entries are waiting or `flush_interval`
+seconds have passed. The buffer is flushed at interpreter exit, so a normal
+shutdown (gunicorn/uvicorn stopping a worker) loses nothing; a killed
+process loses at most what was still buffered. With 'inline', record()
+inserts the entry in the request, as tests need to see it immediately.
+"""
+import atexit
+import logging
+import os
+import threading
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction as db_transaction
+from transactions.models import AdminLog
+
+logger = logging.getLogger(__name__)
+
+
+class AdminLogWriter:
+    def __init__(self, batch_size=100, flush_interval=1.0, max_buffer=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._reset()
+
+    def _reset(self):
+        self._condition = threading.Condition()
+        # Serializes writes between the worker and flush() callers
+        self._write_lock = threading.Lock()
+        self._buffer = []
+        self._thread = None
+        self._closed = False
+        self.written = 0
+        self.dropped = 0
+
+    def add(self, entry):
+        """Buffer an unsaved AdminLog; it is written on the next flush"""
+        with self._condition:
+            if self._closed:
+                closed = True
+            else:
+                closed = False
+                if len(self._buffer) >= self.max_buffer:
+                    # The database has been failing for a while; keep the newest entries
+                    del self._buffer[0]
+                    self.dropped += 1
+                    logger.error('Admin log buffer full; dropped the oldest entry (%d so far)', self.dropped)
+                self._buffer.append(entry)
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='admin-log-writer', daemon=True)
+                    self._thread.start()
+                if len(self._buffer) >= self.batch_size:
+                    self._condition.notify()
+        if closed:
+            # Shutting down: nothing will flush a late entry, so write it now
+            self._write([entry])
+
+    def flush(self):
+        """Write everything buffered so far; returns once it is stored"""
+        with self._write_lock:
+            with self._condition:
+                batch, self._buffer = self._buffer, []
+            self._write_locked(batch)
+
+    def close(self):
+        """Stop the worker and write what is left; registered with atexit"""
+        with self._condition:
+            self._closed = True
+            self._condition.notify()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout=self.flush_interval * 5)
+        try:
+            self.flush()
+        except Exception:
+            logger.exception('Could not write %d admin log entries at shutdown', len(self._buffer))
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if len(self._buffer) < self.batch_size and not self._closed:
+                    self._condition.wait(self.flush_interval)
+                if self._closed:
+                    return
+            try:
+                self.flush()
+            except Exception:
+                # Keep the rows for the next attempt; the database may be back by then
+                logger.exception('Could not write admin log entries; retrying in %ss', self.flush_interval)
+                with self._condition:
+                    self._condition.wait(self.flush_interval)
+
+    def _write(self, batch):
+        with self._write_lock:
+            self._write_locked(batch)
+
+    def _write_locked(self, batch):
+        if not batch:
+            return
+        try:
+            try:
+                with db_transaction.atomic():
+                    AdminLog.objects.bulk_create(batch)
+            except IntegrityError:
+                # An entry's admin was deleted since it was buffered; keep the rest
+                # of the batch, and that entry with no admin (as SET_NULL would)
+                for entry in batch:
+                    try:
+                        with db_transaction.atomic():
+                            entry.save()
+                    except IntegrityError:
+                        entry.admin = None
+                        entry.save()
+        except Exception:
+            with self._condition:
+                # Entries saved one by one before the failure already have a pk
+                self._buffer[:0] = [entry for entry in batch if entry.pk is None]
+            raise
+        finally:
+            # This thread's connection would otherwise idle until the server drops it
+            if threading.current_thread() is self._thread:
+                connection.close()
+        self.written += len(batch)
+
+
+admin_log_writer = AdminLogWriter(
+    batch_size=settings.ADMIN_LOG_BATCH_SIZE,
+    flush_interval=settings.ADMIN_LOG_FLUSH_INTERVAL,
+    max_buffer=settings.ADMIN_LOG_MAX_BUFFER,
+)
+atexit.register(admin_log_writer.close)
+# A forked worker must not write (or wait on) its parent's buffer and thread
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=admin_log_writer._reset)
+
+
+def record(entry):
+    """Store an unsaved AdminLog the way ADMIN_LOG_MODE says"""
+    if settings.ADMIN_LOG_MODE == 'inline':
+        entry.save()
+    else:
+        admin_log_writer.add(entry)
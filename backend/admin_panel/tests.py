@@ -1,3 +1,346 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest import skipUnless
+from asgiref.sync import sync_to_async
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase, TransactionTestCase, override_settings, tag
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
+from accounts.authentication import user_cache
+from django.contrib.auth import get_user_model
+from cards.models import Card
+from transactions.filters import filter_date_range
+from transactions.models import AdminLog, DailyTransactionSummary, Transaction
+from transactions.reference import new_reference_id
+from transactions.rollup import find_mismatches, record_created
+from transactions.serializers import AdminLogSerializer, admin_log_values_serializer
+from .audit import AdminLogWriter
 
-# Create your tests here.
+User = get_user_model()
+
+
+class AdminDailySummaryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='admin@test.com', username='admin', password='SecurePass@123', is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        for day, count in ((date(2024, 1, 1), 2), (date(2024, 1, 2), 3), (date(2024, 1, 3), 0)):
+            DailyTransactionSummary.objects.create(
+                date=day, status='SUCCESS', currency='USD', count=count, total=count * 10
+            )
+
+    def test_summary_reads_rollup_with_date_range(self):
+        response = self.client.get(reverse('admin-daily-summary') + '?date_from=2024-01-02&date_to=2024-01-31')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(str(row['date']), row['count']) for row in response.data],
+            [('2024-01-02', 3)],
+        )
+
+    def test_summary_requires_admin(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='plain@test.com', username='plain', password='SecurePass@123'
+        ))
+        response = self.client.get(reverse('admin-daily-summary'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(ADMIN_LOG_MODE='inline')
+class AdminUserDeleteTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='deleter@test.com', username='deleter', password='SecurePass@123', is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin)
+
+    def _spend(self, user, amounts):
+        card = Card.objects.create(
+            user=user, card_holder_name='Spender', last_four_digits='3333',
+            masked_number='**** **** **** 3333', card_type='VISA', expiry_month=12, expiry_year=2030,
+        )
+        created = [
+            Transaction.objects.create(
+                user=user, card=card, amount=amount, currency='USD', merchant_name='Shop',
+                status='SUCCESS', reference_id=new_reference_id(),
+            )
+            for amount in amounts
+        ]
+        record_created(created)
+
+    def test_delete_takes_users_transactions_out_of_rollup(self):
+        leaving = User.objects.create_user(email='leaving@test.com', username='leaving', password='SecurePass@123')
+        staying = User.objects.create_user(email='staying@test.com', username='staying', password='SecurePass@123')
+        self._spend(leaving, ('10.00', '20.00'))
+        self._spend(staying, ('5.00',))
+
+        response = self.client.delete(reverse('admin-user-detail', kwargs={'pk': leaving.pk}))
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        today = timezone.localdate()
+        row = DailyTransactionSummary.objects.get(date=today, status='SUCCESS', currency='USD')
+        self.assertEqual((row.count, row.total), (1, Decimal('5.00')))
+        self.assertEqual(find_mismatches(today, today), [])
+
+
+@override_settings(ADMIN_LOG_MODE='inline')
+class AdminExportCSVTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='exporter@test.com', username='exporter', password='SecurePass@123', is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        self.card = Card.objects.create(
+            user=self.admin, card_holder_name='Export', last_four_digits='3333',
+            masked_number='**** **** **** 3333', card_type='VISA', expiry_month=12, expiry_year=2027,
+        )
+
+    def _create(self, status_val, amount, card=True):
+        return Transaction.objects.create(
+            user=self.admin, card=self.card if card else None, amount=amount, currency='USD',
+            merchant_name='Shop, "Quoted"', status=status_val, reference_id=f'REF{Transaction.objects.count()}',
+        )
+
+    def _rows(self, response, compressed=False):
+        body = b''.join(response.streaming_content)
+        if compressed:
+            body = gzip.decompress(body)
+        return list(csv.reader(io.StringIO(body.decode())))
+
+    def test_export_streams_filtered_rows(self):
+        ok = self._create('SUCCESS', '12.50')
+        self._create('FAILED', '3.00')
+        no_card = self._create('SUCCESS', '7.00', card=False)
+        response = self.client.get(reverse('admin-export-csv') + '?status=SUCCESS')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        rows = self._rows(response)
+        self.assertEqual(rows[0][0], 'ID')
+        self.assertEqual(rows[1], [
+            str(ok.id), 'exporter@test.com', '**** **** **** 3333', '12.50', 'USD', 'Shop, "Quoted"',
+            'SUCCESS', ok.reference_id, ok.created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        ])
+        self.assertEqual(rows[2][:3], [str(no_card.id), 'exporter@test.com', ''])
+        self.assertEqual(len(rows), 3)
+
+    def test_export_is_logged_inline_in_tests(self):
+        response = self.client.get(reverse('admin-export-csv'))
+        b''.join(response.streaming_content)
+        log = AdminLog.objects.get()
+        self.assertEqual((log.admin, log.action, log.description), (self.admin, 'EXPORT', 'CSV Export'))
+
+    @override_settings(ROOT_URLCONF='backend.asgi_urls', ADMIN_EXPORT_CHUNK_SIZE=2)
+    async def test_export_streams_through_async_iterator_under_asgi(self):
+        await sync_to_async(user_cache.clear)()
+        for amount in ('1.00', '2.00', '3.00', '4.00', '5.00'):
+            await sync_to_async(self._create)('SUCCESS', amount)
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.admin)}'}
+        response = await self.async_client.get(reverse('admin-export-csv'), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # The ASGI handler reads a sync iterator whole; an async one is sent chunk by chunk
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(chunks), 4)  # header, then 2 + 2 + 1 rows
+        rows = list(csv.reader(io.StringIO(b''.join(chunks).decode())))
+        self.assertEqual([row[3] for row in rows[1:]], ['1.00', '2.00', '3.00', '4.00', '5.00'])
+
+    def test_gzip_export(self):
+        self._create('SUCCESS', '1.00')
+        response = self.client.get(reverse('admin-export-csv') + '?gzip=1')
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertIn('transactions_export.csv.gz', response['Content-Disposition'])
+        self.assertEqual(len(self._rows(response, compressed=True)), 2)
+
+    @tag('slow')
+    @skipUnless(connection.vendor == 'sqlite', 'seeds rows with a SQLite recursive CTE')
+    def test_export_memory_is_bounded(self):
+        rows = 1_000_000
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO transactions (user_id, card_id, amount, currency, merchant_name, description,"
+                " status, reference_id, failure_reason, created_at, updated_at)"
+                " WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s)"
+                " SELECT %s, %s, (n %% 500) + 1, 'USD', 'Shop ' || (n %% 50), '', 'SUCCESS', 'REF' || n, '',"
+                " '2024-01-01 00:00:00', '2024-01-01 00:00:00' FROM seq",
+                [rows, self.admin.id, self.card.id],
+            )
+        response = self.client.get(reverse('admin-export-csv'))
+        lines = size = 0
+        tracemalloc.start()
+        try:
+            for chunk in response.streaming_content:
+                lines += chunk.count(b'\n')
+                size += len(chunk)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(lines, rows + 1)
+        # The export is tens of MB; only a chunk of rows may be held at a time
+        self.assertGreater(size, 50 * 1024 * 1024)
+        self.assertLess(peak, 16 * 1024 * 1024)
+
+
+class AdminLogListTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user(
+            email='lead@test.com', username='lead', password='SecurePass@123', is_admin=True
+        )
+        self.other = User.objects.create_user(
+            email='deputy@test.com', username='deputy', password='SecurePass@123', is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin)
+        start = timezone.make_aware(datetime(2024, 6, 1, 9, 0))
+        entries = [
+            (self.admin, 'UPDATE', 'User', '7'), (self.other, 'DELETE', 'User', '8'),
+            (self.admin, 'EXPORT', 'Transaction', ''), (None, 'UPDATE', 'User', '7'),
+            (self.other, 'UPDATE', 'Card', '7'), (self.admin, 'UPDATE', 'User', '9'),
+        ]
+        self.logs = [
+            AdminLog.objects.create(
+                admin=admin, action=action, target_model=target_model, target_id=target_id,
+                description=f'{action} {target_model}', ip_address='10.0.0.1',
+                timestamp=start + timedelta(days=n // 2),
+            )
+            for n, (admin, action, target_model, target_id) in enumerate(entries)
+        ]
+
+    def _ids(self, query=''):
+        response = self.client.get(reverse('admin-logs') + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [log['id'] for log in response.data['results']]
+
+    def _expected(self, *positions):
+        # Newest first; same-timestamp entries by descending id
+        logs = sorted((self.logs[n] for n in positions), key=lambda log: (log.timestamp, log.id), reverse=True)
+        return [log.id for log in logs]
+
+    def test_filters(self):
+        self.assertEqual(self._ids(), self._expected(0, 1, 2, 3, 4, 5))
+        self.assertEqual(self._ids(f'?admin={self.other.id}'), self._expected(1, 4))
+        self.assertEqual(self._ids('?action=UPDATE'), self._expected(0, 3, 4, 5))
+        self.assertEqual(self._ids('?target_model=User&target_id=7'), self._expected(0, 3))
+        self.assertEqual(self._ids('?date_from=2024-06-02&date_to=2024-06-02'), self._expected(2, 3))
+        self.assertEqual(self._ids(f'?admin={self.admin.id}&action=UPDATE&date_from=2024-06-02'), self._expected(5))
+
+    def test_rejects_non_numeric_admin(self):
+        response = self.client.get(reverse('admin-logs') + '?admin=lead@test.com')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_keyset_pages_in_one_query(self):
+        pages = []
+        url = reverse('admin-logs') + '?page_size=4'
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(len(queries), 1)
+            pages.append([log['id'] for log in response.data['results']])
+            url = response.data['next']
+        self.assertEqual(pages, [self._expected(0, 1, 2, 3, 4, 5)[:4], self._expected(0, 1, 2, 3, 4, 5)[4:]])
+
+    def test_rows_match_model_serializer(self):
+        queryset = AdminLog.objects.order_by('id')
+        slow = JSONRenderer().render(AdminLogSerializer(queryset, many=True).data)
+        fast = JSONRenderer().render(admin_log_values_serializer.serialize(admin_log_values_serializer.values(queryset)))
+        self.assertEqual(slow, fast)
+        response = self.client.get(reverse('admin-logs') + f'?target_id=7&action=UPDATE&admin={self.admin.id}')
+        self.assertEqual(response.data['results'][0]['admin'], 'lead@test.com')
+        self.assertIsNone(AdminLogSerializer(self.logs[3]).data['admin'])
+
+    @skipUnless(connection.vendor == 'sqlite', 'checks SQLite plan output')
+    def test_filtered_pages_use_timestamp_indexes(self):
+        page = AdminLog.objects.order_by('-timestamp', '-id')
+        for queryset, index in (
+            (page, 'adminlog_timestamp_idx'),
+            (page.filter(admin_id=self.admin.id), 'adminlog_admin_timestamp_idx'),
+            (page.filter(action='UPDATE'), 'adminlog_action_timestamp_idx'),
+            (page.filter(target_model='User', target_id='7'), 'adminlog_target_timestamp_idx'),
+        ):
+            plan = filter_date_range(queryset, 'timestamp', '2024-06-01', None)[:20].explain()
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_requires_admin(self):
+        self.client.force_authenticate(user=User.objects.create_user(
+            email='plain@test.com', username='plain', password='SecurePass@123'
+        ))
+        response = self.client.get(reverse('admin-logs'))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class AdminLogWriterTestCase(TransactionTestCase):
+    """The writer's thread has its own connection, so rows must really be committed"""
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='auditor@test.com', username='auditor', password='SecurePass@123', is_admin=True
+        )
+
+    def _entry(self, n=0, admin=None):
+        return AdminLog(admin=admin or self.admin, action='UPDATE', target_model='User', target_id=str(n))
+
+    def _wait_for(self, writer, count, timeout=5):
+        # Poll the writer, not the table: SQLite's shared cache locks the table against concurrent reads
+        deadline = time.monotonic() + timeout
+        while writer.written < count and time.monotonic() < deadline:
+            time.sleep(0.02)
+        return AdminLog.objects.count()
+
+    def test_flushes_when_batch_is_full(self):
+        writer = AdminLogWriter(batch_size=3, flush_interval=60)
+        for n in range(2):
+            writer.add(self._entry(n))
+        time.sleep(0.2)
+        self.assertEqual(writer.written, 0)
+        writer.add(self._entry(2))
+        self.assertEqual(self._wait_for(writer, 3), 3)
+        writer.close()
+
+    def test_flushes_after_interval(self):
+        writer = AdminLogWriter(batch_size=100, flush_interval=0.1)
+        writer.add(self._entry())
+        self.assertEqual(self._wait_for(writer, 1), 1)
+        writer.close()
+
+    def test_close_writes_everything_with_action_time(self):
+        writer = AdminLogWriter(batch_size=100, flush_interval=60)
+        before = timezone.now()
+        for n in range(5):
+            writer.add(self._entry(n))
+        time.sleep(0.05)
+        queued_until = timezone.now()
+        writer.close()
+        self.assertEqual(sorted(AdminLog.objects.values_list('target_id', flat=True)), ['0', '1', '2', '3', '4'])
+        for timestamp in AdminLog.objects.values_list('timestamp', flat=True):
+            self.assertTrue(before <= timestamp < queued_until)
+        # Late entries during shutdown are written straight away
+        writer.add(self._entry(5))
+        self.assertEqual(AdminLog.objects.count(), 6)
+        self.assertEqual(writer.written, 6)
+
+    def test_entry_of_deleted_admin_is_kept_without_admin(self):
+        gone = User.objects.create_user(
+            email='gone@test.com', username='gone', password='SecurePass@123', is_admin=True
+        )
+        writer = AdminLogWriter(batch_size=100, flush_interval=60)
+        writer.add(self._entry(1))
+        writer.add(self._entry(2, admin=gone))
+        # Deleted elsewhere; the request's own user instance keeps its pk
+        User.objects.filter(pk=gone.pk).delete()
+        writer.close()
+        self.assertEqual(
+            dict(AdminLog.objects.values_list('target_id', 'admin__email')),
+            {'1': 'auditor@test.com', '2': None},
+        )
@@ -1,17 +1,31 @@
 import csv
-from django.http import HttpResponse
-from django.db.models import Sum, Count
-from django.utils.dateparse import parse_date
+import io
+import zlib
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
 from rest_framework import permissions, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework import generics
+from accounts.authentication import user_cache
+from backend.async_views import aiter_sync
 from accounts.models import User
 from accounts.serializers import UserSerializer
 from cards.models import Card
 from cards.serializers import CardSerializer
-from transactions.models import Transaction, AdminLog
-from transactions.serializers import TransactionSerializer
+from transactions import rollup
+from transactions.filters import filter_date_range, parse_day
+from transactions.mixins import ValuesListMixin
+from transactions.models import Transaction, AdminLog, DailyTransactionSummary
+from transactions.pagination import AdminLogPagination, KeysetPagination
+from transactions.serializers import (
+    AdminLogSerializer, TransactionSerializer, admin_log_values_serializer, transaction_values_serializer,
+)
+from . import audit
 
 
 class IsAdminUser(permissions.BasePermission):
@@ -27,10 +41,10 @@ def log_admin_action(admin, action, target_model, target_id='', description='',
             ip = x_forwarded.split(',')[0]
         else:
             ip = request.META.get('REMOTE_ADDR')
-    AdminLog.objects.create(
+    audit.record(AdminLog(
         admin=admin, action=action, target_model=target_model,
         target_id=str(target_id), description=description, ip_address=ip
-    )
+    ))
 
 
 class AdminUserListView(generics.ListAPIView):
@@ -57,6 +71,7 @@ class AdminUserDetailView(APIView):
                 if field in request.data:
                     setattr(user, field, request.data[field])
             user.save()
+            user_cache.invalidate(user.pk)
             log_admin_action(request.user, 'UPDATE', 'User', pk, f'Updated user {user.email}', request)
             return Response(UserSerializer(user).data)
         except User.DoesNotExist:
@@ -66,7 +81,11 @@ class AdminUserDetailView(APIView):
         try:
             user = User.objects.get(pk=pk)
             email = user.email
-            user.delete()
+            with db_transaction.atomic():
+                # The user's transactions go with them (CASCADE); keep the daily rollup in step
+                rollup.record_deleted(Transaction.objects.filter(user=user))
+                user.delete()
+            user_cache.invalidate(pk)
             log_admin_action(request.user, 'DELETE', 'User', pk, f'Deleted user {email}', request)
             return Response({'message': 'User deleted.'}, status=status.HTTP_204_NO_CONTENT)
         except User.DoesNotExist:
@@ -79,77 +98,144 @@ class AdminCardListView(generics.ListAPIView):
     queryset = Card.objects.select_related('user').all()
 
 
-class AdminTransactionListView(generics.ListAPIView):
+def filter_admin_transactions(queryset, params):
+    """status / date_from / date_to / user_id filters shared by the admin list and export"""
+    status_filter = params.get('status')
+    user_id = params.get('user_id')
+    if status_filter:
+        queryset = queryset.filter(status=status_filter)
+    queryset = filter_date_range(queryset, 'created_at', params.get('date_from'), params.get('date_to'))
+    if user_id:
+        queryset = queryset.filter(user_id=user_id)
+    return queryset
+
+
+class AdminTransactionListView(ValuesListMixin, generics.ListAPIView):
     permission_classes = [IsAdminUser]
     serializer_class = TransactionSerializer
+    values_serializer = transaction_values_serializer
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
-        queryset = Transaction.objects.select_related('user', 'card').all()
-        params = self.request.query_params
-        status_filter = params.get('status')
-        date_from = params.get('date_from')
-        date_to = params.get('date_to')
-        user_id = params.get('user_id')
-        if status_filter:
-            queryset = queryset.filter(status=status_filter)
-        if date_from:
-            queryset = queryset.filter(created_at__date__gte=parse_date(date_from))
-        if date_to:
-            queryset = queryset.filter(created_at__date__lte=parse_date(date_to))
-        if user_id:
-            queryset = queryset.filter(user_id=user_id)
-        return queryset
+        return filter_admin_transactions(Transaction.objects.all(), self.request.query_params)
 
 
 class AdminDailySummaryView(APIView):
+    """Daily counts and totals per status and currency, read from the rollup table"""
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        from django.db.models.functions import TruncDate
-        summary = (
-            Transaction.objects
-            .annotate(date=TruncDate('created_at'))
-            .values('date', 'status')
-            .annotate(count=Count('id'), total=Sum('amount'))
-            .order_by('-date')
+        summary = DailyTransactionSummary.objects.filter(count__gt=0)
+        date_from = parse_day(request.query_params.get('date_from'))
+        date_to = parse_day(request.query_params.get('date_to'))
+        if date_from:
+            summary = summary.filter(date__gte=date_from)
+        if date_to:
+            summary = summary.filter(date__lte=date_to)
+        return Response(list(summary.values('date', 'status', 'currency', 'count', 'total')))
+
+
+EXPORT_HEADER = ['ID', 'User Email', 'Card Masked', 'Amount', 'Currency',
+                 'Merchant', 'Status', 'Reference ID', 'Created At']
+EXPORT_COLUMNS = ('id', 'user__email', 'card__masked_number', 'amount', 'currency',
+                  'merchant_name', 'status', 'reference_id', 'created_text')
+
+
+def export_csv_chunks(queryset, chunk_size):
+    """
+    Yield the CSV export as encoded chunks of `chunk_size` rows.
+    Rows are read as tuples, one primary-key range at a time (id > last seen
+    id), so memory stays flat on every backend; MySQL's driver would buffer
+    a whole .iterator() result client-side.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADER)
+    yield buffer.getvalue().encode()
+    last_id = 0
+    while True:
+        rows = list(
+            queryset.filter(id__gt=last_id).order_by('id')
+            # Read created_at as text: the first 19 characters are already 'YYYY-MM-DD HH:MM:SS',
+            # which skips building a datetime and calling strftime for every row
+            .annotate(created_text=Cast('created_at', CharField()))
+            .values_list(*EXPORT_COLUMNS)[:chunk_size]
         )
-        return Response(list(summary))
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            (pk, email or '', masked or '', amount, currency, merchant, txn_status, reference_id, created[:19])
+            for pk, email, masked, amount, currency, merchant, txn_status, reference_id, created in rows
+        )
+        yield buffer.getvalue().encode()
+
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(wbits=31)  # 31 = gzip container
+    for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
 
 
 class AdminExportTransactionsCSV(APIView):
+    """
+    Stream all transactions as CSV, optionally gzipped (?gzip=1).
+    Accepts the same status / date_from / date_to / user_id filters as the admin list.
+    """
     permission_classes = [IsAdminUser]
 
     def get(self, request):
-        response = HttpResponse(content_type='text/csv')
-        response['Content-Disposition'] = 'attachment; filename="transactions_export.csv"'
-        writer = csv.writer(response)
-        writer.writerow(['ID', 'User Email', 'Card Masked', 'Amount', 'Currency',
-                         'Merchant', 'Status', 'Reference ID', 'Created At'])
-        qs = Transaction.objects.select_related('user', 'card').all()
-        for txn in qs:
-            writer.writerow([
-                txn.id, txn.user.email if txn.user else '',
-                txn.card.masked_number if txn.card else '',
-                txn.amount, txn.currency, txn.merchant_name,
-                txn.status, txn.reference_id,
-                txn.created_at.strftime('%Y-%m-%d %H:%M:%S')
-            ])
+        queryset = filter_admin_transactions(Transaction.objects.all(), request.query_params)
+        chunks = export_csv_chunks(queryset, settings.ADMIN_EXPORT_CHUNK_SIZE)
+        filename = 'transactions_export.csv'
+        content_type = 'text/csv'
+        if request.query_params.get('gzip') in ('1', 'true'):
+            chunks = gzip_chunks(chunks)
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(self.streaming_content(chunks), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
         log_admin_action(request.user, 'EXPORT', 'Transaction', description='CSV Export', request=request)
         return response
 
+    def streaming_content(self, chunks):
+        return chunks
+
+
+class AsyncAdminExportTransactionsCSV(AdminExportTransactionsCSV):
+    """AdminExportTransactionsCSV for the ASGI deployment (see backend.asgi_urls)"""
+
+    def streaming_content(self, chunks):
+        # A sync iterator would be read whole into memory by the ASGI handler
+        return aiter_sync(chunks)
 
-class AdminLogListView(generics.ListAPIView):
+
+class AdminLogListView(ValuesListMixin, generics.ListAPIView):
+    """
+    Audit log, newest first, filterable by admin (user id), action,
+    target_model, target_id and date_from/date_to. Every filter combination
+    is served by an index on (filter columns, timestamp) and paged by keyset,
+    so it stays fast however many entries the log holds.
+    """
     permission_classes = [IsAdminUser]
+    serializer_class = AdminLogSerializer
+    values_serializer = admin_log_values_serializer
+    pagination_class = AdminLogPagination
 
-    def get(self, request):
-        logs = AdminLog.objects.select_related('admin').all()[:200]
-        data = [{
-            'id': log.id,
-            'admin': log.admin.email if log.admin else None,
-            'action': log.action,
-            'target_model': log.target_model,
-            'target_id': log.target_id,
-            'description': log.description,
-            'timestamp': log.timestamp,
-        } for log in logs]
-        return Response(data)
+    def get_queryset(self):
+        queryset = AdminLog.objects.all()
+        params = self.request.query_params
+        admin_id = params.get('admin')
+        if admin_id:
+            if not admin_id.isdigit():
+                raise ValidationError({'admin': 'Must be a user id.'})
+            queryset = queryset.filter(admin_id=admin_id)
+        for field in ('action', 'target_model', 'target_id'):
+            if params.get(field):
+                queryset = queryset.filter(**{field: params[field]})
+        return filter_date_range(queryset, 'timestamp', params.get('date_from'), params.get('date_to'))
@@ -0,0 +1,24 @@
+"""
+URL configuration for the ASGI deployment (DJANGO_SERVER=asgi, see
+ROOT_URLCONF in settings): the hot read endpoints are routed to their async
+views and the CSV export to a variant that streams through an async
+iterator; everything else goes to the same views as backend.urls. Under WSGI
+an async view would run in an event loop per request, and an async iterator
+would be read whole, so backend.urls keeps the sync ones.
+"""
+from django.urls import path
+from admin_panel.views import AsyncAdminExportTransactionsCSV
+from cards.views import AsyncCardListCreateView
+from transactions.views import AsyncTransactionDetailView, AsyncTransactionListView
+from .urls import urlpatterns as wsgi_urlpatterns
+
+# Listed first, so they shadow the sync routes of the same path and name
+urlpatterns = [
+    path('api/cards/', AsyncCardListCreateView.as_view(), name='card-list-create'),
+    path('api/transactions/', AsyncTransactionListView.as_view(), name='transaction-list'),
+    path('api/transactions/<int:pk>/', AsyncTransactionDetailView.as_view(), name='transaction-detail'),
+    path(
+        'api/admin-panel/transactions/export/csv/', AsyncAdminExportTransactionsCSV.as_view(),
+        name='admin-export-csv',
+    ),
+] + wsgi_urlpatterns
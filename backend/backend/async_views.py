@@ -0,0 +1,64 @@
+"""
+Async dispatch for DRF views.
+
+DRF's APIView is synchronous. AsyncAPIViewMixin gives it an async dispatch(),
+so handlers written as `async def` can await Django's async ORM; under ASGI
+(backend.asgi behind uvicorn workers) a request waiting on the database then
+holds a coroutine instead of a whole worker. Authentication, permission and
+throttle checks are sync-only (they may query the database) and run through
+sync_to_async, on the request's own thread as Django's ASGI handler sets up.
+
+Django requires every handler of a view to be async once one is, so any
+sync-only handler on the same view wraps its body in sync_to_async. Under
+WSGI Django would run an async view in an event loop per request, which only
+costs time, so the async views are subclasses of the sync ones and only
+backend.asgi_urls routes to them.
+"""
+import inspect
+from asgiref.sync import sync_to_async
+
+_done = object()
+
+
+class AsyncAPIViewMixin:
+    """Mix in before APIView (or a generic view) to make dispatch() async"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+
+            response = handler(request, *args, **kwargs)
+            # options() and http_method_not_allowed() stay sync
+            if inspect.isawaitable(response):
+                response = await response
+
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+async def aiter_sync(iterator):
+    """
+    Async iterator over a sync one, each step run through sync_to_async. Django's
+    ASGI handler reads a sync StreamingHttpResponse iterator into a list before
+    sending it; this keeps a streamed body (and its queries) one chunk at a time.
+    """
+    iterator = iter(iterator)
+    while True:
+        chunk = await sync_to_async(next)(iterator, _done)
+        if chunk is _done:
+            return
+        yield chunk
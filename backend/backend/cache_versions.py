@@ -0,0 +1,37 @@
+"""
+Version counters for invalidating groups of cache entries.
+
+A counter that is missing (never set, or evicted by the cache) is seeded
+with the current time in nanoseconds rather than 0. Seeds only grow, and
+increments never catch up with the clock, so a re-seeded counter cannot land
+on a version that older entries were stored under and serve them again.
+"""
+import time
+from django.core.cache import cache
+
+
+def get_version(key):
+    version = cache.get(key)
+    if version is None:
+        seed = time.time_ns()
+        # Another process may seed it first; theirs wins
+        version = seed if cache.add(key, seed, timeout=None) else cache.get(key, seed)
+    return version
+
+
+async def aget_version(key):
+    """get_version() through the async cache API"""
+    version = await cache.aget(key)
+    if version is None:
+        seed = time.time_ns()
+        version = seed if await cache.aadd(key, seed, timeout=None) else await cache.aget(key, seed)
+    return version
+
+
+def bump_version(key):
+    """Move to a new version; every entry stored under an earlier one becomes unreachable"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Missing: a fresh seed is newer than any version handed out before
+        cache.add(key, time.time_ns(), timeout=None)
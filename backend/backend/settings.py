@@ -42,7 +42,9 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'backend.urls'
+# 'asgi' when served by uvicorn (docker-compose sets it): route the hot read
+# endpoints to their async views, which only pay off without a worker per request
+ROOT_URLCONF = 'backend.asgi_urls' if os.environ.get('DJANGO_SERVER') == 'asgi' else 'backend.urls'
 
 TEMPLATES = [
     {
@@ -61,6 +63,7 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'backend.wsgi.application'
+ASGI_APPLICATION = 'backend.asgi.application'
 
 DATABASES = {
     'default': {
@@ -107,7 +110,7 @@ CORS_ALLOW_CREDENTIALS = True
 # Django REST Framework
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'accounts.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -121,6 +124,50 @@ REST_FRAMEWORK = {
     'PAGE_SIZE': 20,
 }
 
+# Maximum number of items accepted by the bulk transaction endpoints
+TRANSACTION_BULK_MAX_ITEMS = int(os.environ.get('TRANSACTION_BULK_MAX_ITEMS', 500))
+
+# Rows fetched per query by the streaming admin CSV export
+ADMIN_EXPORT_CHUNK_SIZE = int(os.environ.get('ADMIN_EXPORT_CHUNK_SIZE', 2000))
+
+# Admin audit log (see admin_panel.audit): 'buffered' batches AdminLog inserts on
+# a background thread, flushed every ADMIN_LOG_BATCH_SIZE entries or
+# ADMIN_LOG_FLUSH_INTERVAL seconds and at exit; 'inline' inserts each entry in
+# the request. Tests that log admin actions override it to 'inline': a
+# background thread's own connection cannot see rows created inside a test's
+# transaction.
+ADMIN_LOG_MODE = os.environ.get('ADMIN_LOG_MODE', 'buffered')
+ADMIN_LOG_BATCH_SIZE = int(os.environ.get('ADMIN_LOG_BATCH_SIZE', 100))
+ADMIN_LOG_FLUSH_INTERVAL = float(os.environ.get('ADMIN_LOG_FLUSH_INTERVAL', 1.0))
+ADMIN_LOG_MAX_BUFFER = int(os.environ.get('ADMIN_LOG_MAX_BUFFER', 10000))
+
+# Cache backend, e.g. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache
+# and CACHE_LOCATION=redis://redis:6379/0 so every worker shares it. The default
+# per-process memory cache only sees invalidations made by its own process, so
+# other workers can serve stale entries until they expire: any deployment with
+# more than one worker process (docker-compose runs 3) needs a shared backend.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
+# Seconds a user's cached card list and card details are kept
+CARD_CACHE_TIMEOUT = int(os.environ.get('CARD_CACHE_TIMEOUT', 300))
+
+# Spending analytics: cache lifetime in seconds and number of merchants returned
+TRANSACTION_ANALYTICS_CACHE_TIMEOUT = int(os.environ.get('TRANSACTION_ANALYTICS_CACHE_TIMEOUT', 300))
+TRANSACTION_ANALYTICS_TOP_MERCHANTS = int(os.environ.get('TRANSACTION_ANALYTICS_TOP_MERCHANTS', 10))
+
+# Seconds an authenticated user is cached per process (see accounts.authentication)
+AUTH_USER_CACHE_TTL = int(os.environ.get('AUTH_USER_CACHE_TTL', 30))
+
+# Refresh-token revocation filter (see accounts.revocation): expected number of
+# blacklisted tokens, and how often other processes' revocations are picked up
+TOKEN_REVOCATION_BLOOM_CAPACITY = int(os.environ.get('TOKEN_REVOCATION_BLOOM_CAPACITY', 100000))
+TOKEN_REVOCATION_SYNC_INTERVAL = float(os.environ.get('TOKEN_REVOCATION_SYNC_INTERVAL', 1.0))
+
 # JWT Settings
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(hours=1),
@@ -132,6 +179,7 @@ SIMPLE_JWT = {
     'AUTH_HEADER_TYPES': ('Bearer',),
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'accounts.serializers.FilteredTokenRefreshSerializer',
 }
 
 # Swagger
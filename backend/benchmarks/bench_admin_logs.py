@@ -0,0 +1,121 @@
+"""
+Latency of the admin audit log endpoint over a large log: the newest page,
+each filter, and a page deep into the log via its cursor, first with the
+AdminLog indexes and then with them dropped.
+
+Runs against a throwaway test database seeded with --rows log entries spread
+over a year, from 20 admins. From backend/:
+
+    python -m benchmarks.bench_admin_logs --rows 1000000
+"""
+import argparse
+import os
+import random
+import statistics
+import time
+from datetime import timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from transactions.models import AdminLog
+
+    User = get_user_model()
+    admins = [
+        User.objects.create_user(email=f'admin{n}@test.com', username=f'admin{n}', password='Bench@12345', is_admin=True)
+        for n in range(20)
+    ]
+    rng = random.Random(25)
+    actions = [action for action, _ in AdminLog.ACTION_CHOICES]
+    start = timezone.now() - timedelta(days=365)
+    step = timedelta(days=365) / rows
+    batch = []
+    for i in range(rows):
+        batch.append(AdminLog(
+            admin_id=admins[rng.randrange(len(admins))].id, action=rng.choice(actions),
+            target_model=rng.choice(('User', 'Card', 'Transaction')), target_id=str(rng.randrange(10000)),
+            description='Benchmark entry', ip_address='10.0.0.1', timestamp=start + step * i,
+        ))
+        if len(batch) == 5000:
+            AdminLog.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        AdminLog.objects.bulk_create(batch)
+    return admins
+
+
+def time_request(view, request_factory, user, query, repeat):
+    from rest_framework.test import force_authenticate
+    samples = []
+    for _ in range(repeat):
+        request = request_factory.get('/api/admin-panel/logs/', query)
+        force_authenticate(request, user=user)
+        started = time.perf_counter()
+        response = view(request)
+        response.render()
+        samples.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(samples) * 1000
+
+
+def run(args):
+    from django.db import connection
+    from rest_framework.test import APIRequestFactory
+    from admin_panel.views import AdminLogListView
+    from transactions.models import AdminLog
+    from transactions.pagination import AdminLogPagination
+
+    started = time.perf_counter()
+    admins = seed(args.rows)
+    print(f'seeded {args.rows} log entries in {time.perf_counter() - started:.1f}s')
+
+    deep = AdminLog.objects.order_by('-timestamp', '-id')[args.rows // 2]
+    paginator = AdminLogPagination()
+    paginator.ordering = '-timestamp'
+    middle = (deep.timestamp - timedelta(days=1)).date().isoformat()
+    queries = [
+        ('newest page', {}),
+        ('admin', {'admin': admins[3].id}),
+        ('action', {'action': 'DELETE'}),
+        ('target', {'target_model': 'User', 'target_id': '42'}),
+        ('admin + action + date', {'admin': admins[3].id, 'action': 'EXPORT', 'date_to': middle}),
+        ('page at half depth', {'cursor': paginator.encode_cursor(deep)}),
+    ]
+
+    factory = APIRequestFactory()
+    view = AdminLogListView.as_view()
+    indexed = [time_request(view, factory, admins[0], query, args.repeat) for _, query in queries]
+    with connection.schema_editor() as editor:
+        for index in AdminLog._meta.indexes:
+            editor.remove_index(AdminLog, index)
+    unindexed = [time_request(view, factory, admins[0], query, args.repeat) for _, query in queries]
+
+    print(f"{'query':<24} {'indexed ms':>12} {'no index ms':>12}")
+    for (name, _), with_index, without in zip(queries, indexed, unindexed):
+        print(f'{name:<24} {with_index:>12.2f} {without:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Requests/sec and latency of the hot read endpoints (transaction list,
+transaction detail, card list) served the WSGI way and the ASGI way, under
+--concurrency concurrent clients.
+
+WSGI is modelled as production runs it: --workers requests served at a time,
+each holding its worker until done (gunicorn sync workers), with the sync
+views of backend.urls; it is also run with the async views of
+backend.asgi_urls, to show what they would cost there. ASGI serves
+backend.asgi with uvicorn on one event loop and backend.asgi_urls. --db-latency adds a sleep to
+every query to stand in for the network round trip to MySQL; that wait is
+what a sync worker spends blocked.
+
+Both servers run in this process against a throwaway test database. From
+backend/:
+
+    python -m benchmarks.bench_asgi --rows 2000 --concurrency 50 --requests 3000 --db-latency 2
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--requests', type=int, default=3000)
+    parser.add_argument('--workers', type=int, default=3, help='WSGI requests served at once')
+    parser.add_argument('--db-latency', type=float, default=2.0, help='milliseconds added to every query')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+    from cards.models import Card
+    from transactions.models import Transaction
+
+    user = get_user_model().objects.create_user(email='bench@test.com', username='bench', password='Bench@12345')
+    card = Card.objects.create(
+        user=user, card_holder_name='Bench', last_four_digits='4242',
+        masked_number='**** **** **** 4242', card_type='VISA', expiry_month=12, expiry_year=2030,
+    )
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user, card=card, amount=(i % 500) + 1, currency='USD', merchant_name=f'Shop {i % 50}',
+            status=('SUCCESS', 'FAILED', 'PENDING')[i % 3], reference_id=uuid.uuid4().hex[:20].upper(),
+        )
+        for i in range(rows)
+    ], batch_size=5000)
+    return user, list(Transaction.objects.filter(user=user).values_list('id', flat=True)[:100])
+
+
+def add_db_latency(seconds):
+    from django.db.backends.signals import connection_created
+
+    def delayed(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(sender, connection, **kwargs):
+        connection.execute_wrappers.append(delayed)
+
+    connection_created.connect(install, weak=False)
+
+
+class PooledWSGIServer(WSGIServer):
+    """wsgiref server that handles `workers` requests at a time, like gunicorn's sync workers"""
+
+    def __init__(self, address, workers):
+        super().__init__(address, QuietHandler)
+        self.pool = ThreadPoolExecutor(workers)
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_wsgi(workers):
+    from django.core.wsgi import get_wsgi_application
+    server = PooledWSGIServer(('127.0.0.1', 0), workers)
+    server.set_app(get_wsgi_application())
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def stop():
+        server.shutdown()
+        server.pool.shutdown()
+    return f'http://127.0.0.1:{server.server_address[1]}', stop
+
+
+def start_asgi():
+    import uvicorn
+    from backend.asgi import application
+    server = uvicorn.Server(uvicorn.Config(application, host='127.0.0.1', port=0, log_level='warning', lifespan='off'))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    def stop():
+        server.should_exit = True
+        thread.join(timeout=10)
+    return f"http://127.0.0.1:{server.servers[0].sockets[0].getsockname()[1]}", stop
+
+
+def load(base_url, paths, token, concurrency, total):
+    """Run the clients in another process, so they do not compete with the servers for the GIL"""
+    with ProcessPoolExecutor(1, mp_context=multiprocessing.get_context('spawn')) as pool:
+        return pool.submit(_load, base_url, paths, token, concurrency, total).result()
+
+
+def _load(*args):
+    return asyncio.run(_aload(*args))
+
+
+async def _aload(base_url, paths, token, concurrency, total):
+    import httpx
+    latencies = []
+    issued = iter(range(total))
+    # wsgiref speaks HTTP/1.0, so neither side gets keep-alive
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=0)
+    async with httpx.AsyncClient(base_url=base_url, headers={'Authorization': f'Bearer {token}'},
+                                 limits=limits, timeout=60) as client:
+        async def worker():
+            for i in issued:
+                started = time.perf_counter()
+                response = await client.get(paths[i % len(paths)])
+                latencies.append(time.perf_counter() - started)
+                assert response.status_code == 200, (response.status_code, response.text[:200])
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    latencies.sort()
+    return total / elapsed, statistics.median(latencies) * 1000, latencies[int(0.99 * (len(latencies) - 1))] * 1000
+
+
+def run(args):
+    from django.test import override_settings
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    user, ids = seed(args.rows)
+    token = str(AccessToken.for_user(user))
+    add_db_latency(args.db_latency / 1000)
+    paths = ['/api/transactions/', '/api/cards/'] + [f'/api/transactions/{pk}/' for pk in ids[:8]]
+    print(f'{args.concurrency} clients, {args.requests} requests, {args.db_latency}ms per query')
+
+    print(f"{'server':<24} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    wsgi = lambda: start_wsgi(args.workers)
+    for name, start, urlconf in ((f'wsgi ({args.workers} workers)', wsgi, 'backend.urls'),
+                                 ('wsgi, async views', wsgi, 'backend.asgi_urls'),
+                                 ('asgi (uvicorn)', start_asgi, 'backend.asgi_urls')):
+        with override_settings(ROOT_URLCONF=urlconf):
+            base_url, stop = start()
+            try:
+                # Warm-up: user cache, card cache, compiled serializers
+                load(base_url, paths, token, 4, 40)
+                rps, p50, p99 = load(base_url, paths, token, args.concurrency, args.requests)
+            finally:
+                stop()
+        print(f'{name:<24} {rps:>8.0f} {p50:>8.1f} {p99:>8.1f}')
+
+
+if __name__ == '__main__':
+    main()
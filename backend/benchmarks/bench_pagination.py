@@ -0,0 +1,133 @@
+"""
+Page latency of the transaction lists at increasing depth: PageNumberPagination
+(COUNT(*) + OFFSET) against KeysetPagination (index seek from a cursor), for
+the per-user list and the unfiltered admin list, ordered by -created_at and
+by amount.
+
+Runs against a throwaway test database seeded with --rows transactions for one
+(admin) user, so it never touches real data. From backend/:
+
+    python -m benchmarks.bench_pagination --rows 200000
+"""
+import argparse
+import os
+import statistics
+import time
+import uuid
+from datetime import timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--depths', default='1,10,100,1000,5000', help='comma-separated page numbers')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+    from cards.models import Card
+    from transactions.models import Transaction
+
+    user = get_user_model().objects.create_user(
+        email='bench@test.com', username='bench', password='Bench@12345', is_admin=True
+    )
+    card = Card.objects.create(
+        user=user, card_holder_name='Bench', last_four_digits='4242',
+        masked_number='**** **** **** 4242', card_type='VISA', expiry_month=12, expiry_year=2030,
+    )
+    start = timezone.now() - timedelta(seconds=rows)
+    batch = []
+    for i in range(rows):
+        batch.append(Transaction(
+            user=user, card=card, amount=(i % 500) + 1, currency='USD', merchant_name=f'Shop {i % 50}',
+            status=('SUCCESS', 'FAILED', 'PENDING')[i % 3], reference_id=uuid.uuid4().hex[:20].upper(),
+        ))
+        if len(batch) == 5000:
+            Transaction.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        Transaction.objects.bulk_create(batch)
+    # auto_now_add stamps every row with "now"; spread them out like real traffic
+    ids = list(Transaction.objects.order_by('id').values_list('id', flat=True))
+    for i in range(0, len(ids), 5000):
+        Transaction.objects.bulk_update(
+            [Transaction(id=pk, created_at=start + timedelta(seconds=i + n)) for n, pk in enumerate(ids[i:i + 5000])],
+            ['created_at'],
+        )
+    return user
+
+
+def time_request(view, request_factory, user, query, repeat):
+    from asgiref.sync import async_to_sync, iscoroutinefunction
+    from rest_framework.test import force_authenticate
+    if iscoroutinefunction(view):
+        # Call an async view the way Django's WSGI handler would
+        view = async_to_sync(view)
+    samples = []
+    for _ in range(repeat):
+        request = request_factory.get('/api/transactions/', query)
+        force_authenticate(request, user=user)
+        start = time.perf_counter()
+        response = view(request)
+        response.render()
+        samples.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.status_code
+    return statistics.median(samples) * 1000
+
+
+def run(args):
+    from rest_framework.pagination import PageNumberPagination
+    from rest_framework.test import APIRequestFactory
+    from admin_panel.views import AdminTransactionListView
+    from transactions.models import Transaction
+    from transactions.pagination import KeysetPagination
+    from transactions.views import TransactionListView
+
+    started = time.perf_counter()
+    user = seed(args.rows)
+    print(f'seeded {args.rows} rows in {time.perf_counter() - started:.1f}s')
+
+    factory = APIRequestFactory()
+    page_size = KeysetPagination.page_size
+    print(f"{'view':<6} {'ordering':<12} {'page':>6} {'offset ms':>12} {'keyset ms':>12}")
+    for name, view_class in (('user', TransactionListView), ('admin', AdminTransactionListView)):
+        offset_view = view_class.as_view(pagination_class=PageNumberPagination)
+        keyset_view = view_class.as_view(pagination_class=KeysetPagination)
+        for ordering in ('-created_at', 'amount'):
+            paginator = KeysetPagination()
+            paginator.ordering = ordering
+            field = ordering.lstrip('-')
+            rows = Transaction.objects.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+            for depth in [int(d) for d in args.depths.split(',') if d]:
+                if (depth - 1) * page_size >= args.rows:
+                    continue
+                query = {'ordering': ordering}
+                offset_ms = time_request(offset_view, factory, user, {**query, 'page': depth}, args.repeat)
+                keyset_query = dict(query)
+                if depth > 1:
+                    # Cursor pointing at the last row of the previous page, as a client following `next` would hold
+                    last = rows.values('id', field)[(depth - 1) * page_size - 1]
+                    keyset_query['cursor'] = paginator.encode_cursor(last)
+                keyset_ms = time_request(keyset_view, factory, user, keyset_query, args.repeat)
+                print(f'{name:<6} {ordering:<12} {depth:>6} {offset_ms:>12.2f} {keyset_ms:>12.2f}')
+
+
+if __name__ == '__main__':
+    main()
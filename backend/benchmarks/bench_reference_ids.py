@@ -0,0 +1,90 @@
+"""
+Transaction insert throughput with random reference ids (truncated uuid4, the
+previous scheme) against time-ordered ones (transactions.reference).
+
+Random ids scatter inserts across the whole reference_id unique index; ordered
+ids always append at its right-hand edge. The gap grows with the table, so each
+scheme first preloads --preload rows, then times --rows single-row inserts and
+--rows more in bulk batches. Runs against a throwaway test database; point
+DJANGO_SETTINGS_MODULE at MySQL settings to measure InnoDB. From backend/:
+
+    python -m benchmarks.bench_reference_ids --preload 500000 --rows 20000
+"""
+import argparse
+import os
+import time
+import uuid
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preload', type=int, default=200000)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--batch', type=int, default=500)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def random_reference_id():
+    return str(uuid.uuid4()).replace('-', '')[:20].upper()
+
+
+def insert(user, card, make_id, count, batch):
+    from transactions.models import Transaction
+
+    def row(i):
+        return Transaction(
+            user=user, card=card, amount=(i % 500) + 1, currency='USD', merchant_name='Bench Shop',
+            status='SUCCESS', reference_id=make_id(),
+        )
+
+    if batch == 1:
+        for i in range(count):
+            row(i).save(force_insert=True)
+        return
+    for start in range(0, count, batch):
+        Transaction.objects.bulk_create([row(i) for i in range(start, min(start + batch, count))])
+
+
+def run(args):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction as db_transaction
+    from cards.models import Card
+    from transactions.models import Transaction
+    from transactions.reference import new_reference_id
+
+    user = get_user_model().objects.create_user(email='bench@test.com', username='bench', password='Bench@12345')
+    card = Card.objects.create(
+        user=user, card_holder_name='Bench', last_four_digits='4242',
+        masked_number='**** **** **** 4242', card_type='VISA', expiry_month=12, expiry_year=2030,
+    )
+    schemes = (('random uuid4', random_reference_id), ('time-ordered', new_reference_id))
+
+    print(f"{'scheme':<14} {'single rows/s':>14} {'bulk rows/s':>14}")
+    for name, make_id in schemes:
+        Transaction.objects.all().delete()
+        insert(user, card, make_id, args.preload, 5000)
+        rates = []
+        for batch in (1, args.batch):
+            started = time.perf_counter()
+            with db_transaction.atomic():
+                insert(user, card, make_id, args.rows, batch)
+            rates.append(args.rows / (time.perf_counter() - started))
+        print(f'{name:<14} {rates[0]:>14.0f} {rates[1]:>14.0f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Serialization cost of a transaction list: TransactionSerializer over model
+instances (select_related card) against transaction_values_serializer over
+.values() rows. Both timings include the query and JSON rendering, and the
+rendered bytes are checked to be identical.
+
+Runs against a throwaway test database. From backend/:
+
+    python -m benchmarks.bench_serializers --rows 10000
+"""
+import argparse
+import os
+import statistics
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed(rows):
+    from django.contrib.auth import get_user_model
+    from cards.models import Card
+    from transactions.models import Transaction
+    from transactions.reference import new_reference_id
+
+    user = get_user_model().objects.create_user(email='bench@test.com', username='bench', password='Bench@12345')
+    card = Card.objects.create(
+        user=user, card_holder_name='Bench', last_four_digits='4242',
+        masked_number='**** **** **** 4242', card_type='VISA', expiry_month=12, expiry_year=2030,
+    )
+    Transaction.objects.bulk_create([
+        Transaction(
+            user=user, card=card if i % 10 else None, amount=(i % 500) + 1, currency='USD',
+            merchant_name=f'Shop {i % 50}', status=('SUCCESS', 'FAILED', 'PENDING')[i % 3],
+            failure_reason='Card declined by issuer' if i % 3 == 1 else '', reference_id=new_reference_id(),
+        )
+        for i in range(rows)
+    ], batch_size=5000)
+
+
+def measure(fn, repeat):
+    samples = []
+    output = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000, output
+
+
+def run(args):
+    from rest_framework.renderers import JSONRenderer
+    from transactions.models import Transaction
+    from transactions.serializers import TransactionSerializer, transaction_values_serializer
+
+    seed(args.rows)
+    queryset = Transaction.objects.order_by('-created_at', '-id')
+    renderer = JSONRenderer()
+
+    def model_path():
+        return renderer.render(TransactionSerializer(queryset.select_related('card'), many=True).data)
+
+    def values_path():
+        rows = transaction_values_serializer.values(queryset)
+        return renderer.render(transaction_values_serializer.serialize(rows))
+
+    model_ms, model_out = measure(model_path, args.repeat)
+    values_ms, values_out = measure(values_path, args.repeat)
+    assert model_out == values_out, 'serializer outputs differ'
+    print(f'{args.rows} rows, {len(values_out)} bytes of JSON (identical)')
+    print(f"{'ModelSerializer':<18} {model_ms:>10.1f} ms")
+    print(f"{'ValuesSerializer':<18} {values_ms:>10.1f} ms  ({model_ms / values_ms:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Refresh-token rotation throughput with simplejwt's TokenRefreshSerializer
+(blacklist query on every refresh) against FilteredTokenRefreshSerializer
+(in-memory revocation filter), with --blacklisted revoked tokens preloaded.
+
+Each run chains --refreshes rotations, feeding every new refresh token into
+the next call, like a client keeping its session alive. Runs against a
+throwaway test database. From backend/:
+
+    python -m benchmarks.bench_token_refresh --blacklisted 100000 --refreshes 2000
+"""
+import argparse
+import os
+import time
+from datetime import timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blacklisted', type=int, default=100000)
+    parser.add_argument('--refreshes', type=int, default=2000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
+    import django
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=0)
+    try:
+        run(args)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def seed(count, user):
+    from django.utils import timezone
+    from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+    expires = timezone.now() + timedelta(days=7)
+    for start in range(0, count, 5000):
+        tokens = OutstandingToken.objects.bulk_create([
+            OutstandingToken(user=user, jti=f'revoked-{i}', token='x', expires_at=expires)
+            for i in range(start, min(start + 5000, count))
+        ])
+        if tokens[0].pk is None:
+            tokens = OutstandingToken.objects.filter(jti__in=[token.jti for token in tokens])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in tokens])
+
+
+def rotate(serializer_class, refresh, count):
+    for _ in range(count):
+        serializer = serializer_class(data={'refresh': refresh})
+        serializer.is_valid(raise_exception=True)
+        refresh = serializer.validated_data['refresh']
+
+
+def run(args):
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from accounts.revocation import revocation_filter
+    from accounts.serializers import FilteredTokenRefreshSerializer
+
+    user = get_user_model().objects.create_user(email='bench@test.com', username='bench', password='Bench@12345')
+    seed(args.blacklisted, user)
+    started = time.perf_counter()
+    revocation_filter.sync()
+    print(f'{args.blacklisted} blacklisted tokens; filter loaded in {time.perf_counter() - started:.2f}s')
+
+    print(f"{'serializer':<32} {'refresh/s':>10} {'queries/refresh':>16}")
+    for serializer_class in (TokenRefreshSerializer, FilteredTokenRefreshSerializer):
+        refresh = str(RefreshToken.for_user(user))
+        queries = []
+        # Counted with a wrapper: the debug query log is capped at 9000 entries
+        with connection.execute_wrapper(lambda execute, *call: queries.append(1) or execute(*call)):
+            started = time.perf_counter()
+            rotate(serializer_class, refresh, args.refreshes)
+            elapsed = time.perf_counter() - started
+        print(f'{serializer_class.__name__:<32} {args.refreshes / elapsed:>10.0f} '
+              f'{len(queries) / args.refreshes:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-user cache of serialized cards.
+
+Entries are stored under the user's current version (the cache `version`
+argument), so invalidation is a single increment of that counter: every
+entry cached before it becomes unreachable and simply expires. The counter
+is bumped after the writing transaction commits, so a reader can never cache
+the pre-commit state under the new version.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from backend.cache_versions import aget_version, bump_version, get_version
+from .models import Card
+from .serializers import CardSerializer
+
+
+def _version_key(user_id):
+    return f'cards:version:{user_id}'
+
+
+def _version(user_id):
+    return get_version(_version_key(user_id))
+
+
+def _list_key(user_id):
+    return f'cards:list:{user_id}'
+
+
+def card_list(user_id):
+    """Serialized cards of the user, as CardSerializer(many=True) returns them"""
+    version = _version(user_id)
+    data = cache.get(_list_key(user_id), version=version)
+    if data is None:
+        data = CardSerializer(Card.objects.filter(user_id=user_id), many=True).data
+        cache.set(_list_key(user_id), data, settings.CARD_CACHE_TIMEOUT, version=version)
+    return data
+
+
+async def acard_list(user_id):
+    """card_list() for async views, through the async cache and ORM APIs"""
+    version = await aget_version(_version_key(user_id))
+    data = await cache.aget(_list_key(user_id), version=version)
+    if data is None:
+        data = CardSerializer([card async for card in Card.objects.filter(user_id=user_id)], many=True).data
+        await cache.aset(_list_key(user_id), data, settings.CARD_CACHE_TIMEOUT, version=version)
+    return data
+
+
+def card_detail(user_id, pk):
+    """Serialized card, or None if the user has no such card (misses are not cached)"""
+    version = _version(user_id)
+    key = f'cards:detail:{user_id}:{pk}'
+    data = cache.get(key, version=version)
+    if data is None:
+        card = Card.objects.filter(pk=pk, user_id=user_id).first()
+        if card is None:
+            return None
+        data = CardSerializer(card).data
+        cache.set(key, data, settings.CARD_CACHE_TIMEOUT, version=version)
+    return data
+
+
+def _bump(user_id):
+    bump_version(_version_key(user_id))
+
+
+def invalidate(user_id):
+    """Drop the user's cached cards once the current transaction commits"""
+    db_transaction.on_commit(lambda: _bump(user_id))
@@ -32,6 +32,8 @@ class CardCreateSerializer(serializers.Serializer):
             masked_number=masked,
             **validated_data
         )
+        from .cache import invalidate  # cards.cache imports this module
+        invalidate(user.id)
         return card
 
 
@@ -1,7 +1,11 @@
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
+from cards import cache as card_cache
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -9,6 +13,7 @@ User = get_user_model()
 
 class CardTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.user = User.objects.create_user(
             email='carduser@test.com',
@@ -85,3 +90,49 @@ class CardTestCase(TestCase):
             'expiry_year': 2027,
         }, format='json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_warm_reads_run_no_queries(self):
+        card_id = self._add_card().data['id']
+        self.client.get(self.cards_url)
+        self.client.get(reverse('card-detail', args=[card_id]))
+        with CaptureQueriesContext(connection) as queries:
+            listed = self.client.get(self.cards_url)
+            detail = self.client.get(reverse('card-detail', args=[card_id]))
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(listed.data[0]['id'], card_id)
+        self.assertEqual(detail.data['masked_number'], '**** **** **** 1111')
+
+    def test_mutations_are_visible_on_the_next_read(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self._add_card('4111111111111111').data['id']
+        self.assertEqual(len(self.client.get(self.cards_url).data), 1)
+        self.assertTrue(self.client.get(reverse('card-detail', args=[first])).data['is_default'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = self._add_card('5500005555555559').data['id']
+        cards = {card['id']: card for card in self.client.get(self.cards_url).data}
+        self.assertEqual(set(cards), {first, second})
+        self.assertFalse(self.client.get(reverse('card-detail', args=[first])).data['is_default'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(reverse('card-detail', args=[first]), {
+                'is_default': True, 'card_holder_name': 'Renamed',
+            }, format='json')
+        detail = self.client.get(reverse('card-detail', args=[first])).data
+        self.assertEqual((detail['is_default'], detail['card_holder_name']), (True, 'Renamed'))
+        cards = {card['id']: card for card in self.client.get(self.cards_url).data}
+        self.assertFalse(cards[second]['is_default'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.delete(reverse('card-detail', args=[second]))
+        self.assertEqual([card['id'] for card in self.client.get(self.cards_url).data], [first])
+        response = self.client.get(reverse('card-detail', args=[second]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        # Cached before the user's version counter was ever bumped
+        self.assertEqual(self.client.get(self.cards_url).data, [])
+        with self.captureOnCommitCallbacks(execute=True):
+            self._add_card()
+        cache.delete(card_cache._version_key(self.user.id))  # evicted under memory pressure
+        self.assertEqual(len(self.client.get(self.cards_url).data), 1)
@@ -1,6 +1,9 @@
+from asgiref.sync import sync_to_async
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
+from backend.async_views import AsyncAPIViewMixin
+from . import cache as card_cache
 from .models import Card
 from .serializers import CardSerializer, CardCreateSerializer
 
@@ -9,9 +12,7 @@ class CardListCreateView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get(self, request):
-        cards = Card.objects.filter(user=request.user)
-        serializer = CardSerializer(cards, many=True)
-        return Response(serializer.data)
+        return Response(card_cache.card_list(request.user.id))
 
     def post(self, request):
         serializer = CardCreateSerializer(data=request.data, context={'request': request})
@@ -21,6 +22,17 @@ class CardListCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class AsyncCardListCreateView(AsyncAPIViewMixin, CardListCreateView):
+    """CardListCreateView for the ASGI deployment (see backend.asgi_urls)"""
+
+    async def get(self, request):
+        return Response(await card_cache.acard_list(request.user.id))
+
+    async def post(self, request):
+        # A view's handlers must be all sync or all async
+        return await sync_to_async(super().post)(request)
+
+
 class CardDetailView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -31,10 +43,10 @@ class CardDetailView(APIView):
             return None
 
     def get(self, request, pk):
-        card = self.get_object(pk, request.user)
-        if not card:
+        data = card_cache.card_detail(request.user.id, pk)
+        if data is None:
             return Response({'error': 'Card not found.'}, status=status.HTTP_404_NOT_FOUND)
-        return Response(CardSerializer(card).data)
+        return Response(data)
 
     def patch(self, request, pk):
         card = self.get_object(pk, request.user)
@@ -48,6 +60,7 @@ class CardDetailView(APIView):
         for attr, value in data.items():
             setattr(card, attr, value)
         card.save()
+        card_cache.invalidate(request.user.id)
         return Response(CardSerializer(card).data)
 
     def delete(self, request, pk):
@@ -55,4 +68,5 @@ class CardDetailView(APIView):
         if not card:
             return Response({'error': 'Card not found.'}, status=status.HTTP_404_NOT_FOUND)
         card.delete()
+        card_cache.invalidate(request.user.id)
         return Response({'message': 'Card deleted successfully.'}, status=status.HTTP_204_NO_CONTENT)
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Transaction, AdminLog
+from .models import Transaction, AdminLog, DailyTransactionSummary
 
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
@@ -13,3 +13,9 @@ class AdminLogAdmin(admin.ModelAdmin):
     list_display = ['admin', 'action', 'target_model', 'target_id', 'timestamp']
     list_filter = ['action', 'target_model']
     readonly_fields = ['timestamp']
+
+@admin.register(DailyTransactionSummary)
+class DailyTransactionSummaryAdmin(admin.ModelAdmin):
+    list_display = ['date', 'status', 'currency', 'count', 'total', 'updated_at']
+    list_filter = ['status', 'currency']
+    readonly_fields = ['date', 'status', 'currency', 'count', 'total', 'updated_at']
@@ -0,0 +1,97 @@
+"""
+Per-user spending analytics, aggregated in SQL and cached.
+
+Each user's result is cached under one key, so a repeated dashboard load is a
+single cache read. Writes call invalidate(), which, once the database
+transaction commits, bumps the user's version counter and deletes the entry.
+A request that was computing while the version moved drops what it stored,
+so a result read before a write can never outlive it.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from backend.cache_versions import bump_version, get_version
+from .models import Transaction
+
+
+def _data_key(user_id):
+    return f'transactions:analytics:{user_id}'
+
+
+def _version_key(user_id):
+    return f'transactions:analytics:version:{user_id}'
+
+
+def _money(value):
+    return f'{value:.2f}'
+
+
+def compute(user_id):
+    """Spend per month, top merchants, per card and per status; spend counts SUCCESS transactions only"""
+    transactions = Transaction.objects.filter(user_id=user_id).order_by()
+    spent = transactions.filter(status='SUCCESS')
+    totals = {'count': Count('id'), 'total': Sum('amount')}
+
+    by_month = (
+        spent.annotate(month=TruncMonth('created_at'))
+        .values('month', 'currency').annotate(**totals).order_by('month', 'currency')
+    )
+    by_merchant = (
+        spent.values('merchant_name', 'currency').annotate(**totals)
+        .order_by('-total', 'merchant_name')[:settings.TRANSACTION_ANALYTICS_TOP_MERCHANTS]
+    )
+    by_card = (
+        spent.values('card', 'card__masked_number', 'card__card_type', 'currency').annotate(**totals)
+        .order_by('-total', 'card')
+    )
+    by_status = transactions.values('status', 'currency').annotate(**totals).order_by('status', 'currency')
+
+    return {
+        'by_month': [
+            {'month': row['month'].strftime('%Y-%m'), 'currency': row['currency'],
+             'count': row['count'], 'total': _money(row['total'])}
+            for row in by_month
+        ],
+        'by_merchant': [
+            {'merchant_name': row['merchant_name'], 'currency': row['currency'],
+             'count': row['count'], 'total': _money(row['total'])}
+            for row in by_merchant
+        ],
+        'by_card': [
+            {'card': row['card'], 'masked_number': row['card__masked_number'], 'card_type': row['card__card_type'],
+             'currency': row['currency'], 'count': row['count'], 'total': _money(row['total'])}
+            for row in by_card
+        ],
+        'by_status': [
+            {'status': row['status'], 'currency': row['currency'],
+             'count': row['count'], 'total': _money(row['total'])}
+            for row in by_status
+        ],
+    }
+
+
+def get_analytics(user_id):
+    data = cache.get(_data_key(user_id))
+    if data is not None:
+        return data
+    version = get_version(_version_key(user_id))
+    data = compute(user_id)
+    cache.set(_data_key(user_id), data, settings.TRANSACTION_ANALYTICS_CACHE_TIMEOUT)
+    if cache.get(_version_key(user_id)) != version:
+        # A write committed while we were computing; do not keep the stale result
+        cache.delete(_data_key(user_id))
+    return data
+
+
+def _bump(user_ids):
+    for user_id in user_ids:
+        bump_version(_version_key(user_id))
+        cache.delete(_data_key(user_id))
+
+
+def invalidate(user_ids):
+    """Drop the cached analytics of these users once the current transaction commits"""
+    user_ids = set(user_ids)
+    db_transaction.on_commit(lambda: _bump(user_ids))
@@ -0,0 +1,35 @@
+from datetime import datetime, time, timedelta
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+
+def parse_day(value):
+    """Parse YYYY-MM-DD; None for missing, malformed or impossible dates"""
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def _day_start(value):
+    """Start of the given YYYY-MM-DD day in the current timezone, or None if it does not parse"""
+    day = parse_day(value)
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def filter_date_range(queryset, field, date_from=None, date_to=None):
+    """
+    Keep rows whose `field` falls on a day between date_from and date_to (inclusive).
+    The days are turned into a half-open range [date_from 00:00, date_to + 1 day 00:00)
+    on the raw column, so an index on `field` can be used; filtering on
+    `field__date` would wrap the column in DATE() and force a scan.
+    """
+    start = _day_start(date_from) if date_from else None
+    end = _day_start(date_to) if date_to else None
+    if start is not None:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end is not None:
+        queryset = queryset.filter(**{f'{field}__lt': end + timedelta(days=1)})
+    return queryset
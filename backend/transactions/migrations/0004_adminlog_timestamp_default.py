@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0003_daily_transaction_summary'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='adminlog',
+            name='timestamp',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:24
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_adminlog_timestamp_default'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['timestamp'], name='adminlog_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['admin', 'timestamp'], name='adminlog_admin_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['action', 'timestamp'], name='adminlog_action_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='adminlog',
+            index=models.Index(fields=['target_model', 'target_id', 'timestamp'], name='adminlog_target_timestamp_idx'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+from asgiref.sync import sync_to_async
+from rest_framework.response import Response
+
+
+class ValuesListMixin:
+    """
+    ListAPIView.list() that reads the page with `.values()` and renders it
+    through `values_serializer` (a serializers.ValuesSerializer) instead of
+    building model instances and running the ModelSerializer per row.
+    """
+    values_serializer = None
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.values_serializer.values(self.filter_queryset(self.get_queryset()))
+        page = self.paginate_queryset(queryset)
+        if page is None:
+            return Response(self.values_serializer.serialize(queryset))
+        return self.get_paginated_response(self.values_serializer.serialize(page))
+
+
+class AsyncValuesListMixin(ValuesListMixin):
+    """ValuesListMixin with an async list(), for views using AsyncAPIViewMixin"""
+
+    async def list(self, request, *args, **kwargs):
+        queryset = self.values_serializer.values(self.filter_queryset(self.get_queryset()))
+        if self.paginator is None:
+            return Response(self.values_serializer.serialize([row async for row in queryset]))
+        if hasattr(self.paginator, 'apaginate_queryset'):
+            page = await self.paginator.apaginate_queryset(queryset, request, view=self)
+        else:
+            page = await sync_to_async(self.paginate_queryset)(queryset)
+        return self.get_paginated_response(self.values_serializer.serialize(page))
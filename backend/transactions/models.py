@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 
 class Transaction(models.Model):
@@ -33,11 +34,49 @@ class Transaction(models.Model):
     class Meta:
         db_table = 'transactions'
         ordering = ['-created_at']
+        indexes = [
+            # Per-user history; scanned backwards for newest first. Ascending, so the
+            # implicit id suffix matches the keyset's (created_at, id) order
+            models.Index(fields=['user', 'created_at'], name='txn_user_created_idx'),
+            # Unfiltered admin listing, in either keyset ordering
+            models.Index(fields=['created_at', 'id'], name='txn_created_idx'),
+            models.Index(fields=['amount', 'id'], name='txn_amount_idx'),
+            # Admin listing filtered by status and date
+            models.Index(fields=['status', 'created_at'], name='txn_status_created_idx'),
+            # Per-user history ordered by amount
+            models.Index(fields=['user', 'amount'], name='txn_user_amount_idx'),
+            # Per-user history filtered by status
+            models.Index(fields=['user', 'status', 'created_at'], name='txn_user_status_created_idx'),
+        ]
 
     def __str__(self):
         return f"TXN-{self.reference_id} | {self.amount} | {self.status}"
 
 
+class DailyTransactionSummary(models.Model):
+    """
+    Per-day rollup of transactions by status and currency. Kept up to date
+    incrementally by transactions.rollup; rebuild with
+    `manage.py rebuild_daily_summary`.
+    """
+    date = models.DateField()
+    status = models.CharField(max_length=10, choices=Transaction.STATUS_CHOICES)
+    currency = models.CharField(max_length=3)
+    count = models.BigIntegerField(default=0)
+    total = models.DecimalField(max_digits=18, decimal_places=2, default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'daily_transaction_summaries'
+        ordering = ['-date', 'status', 'currency']
+        constraints = [
+            models.UniqueConstraint(fields=['date', 'status', 'currency'], name='daily_summary_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.date} | {self.status} | {self.currency} | {self.count} | {self.total}"
+
+
 class AdminLog(models.Model):
     ACTION_CHOICES = [
         ('CREATE', 'Create'),
@@ -59,11 +98,20 @@ class AdminLog(models.Model):
     target_id = models.CharField(max_length=50, blank=True)
     description = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True)
+    # Set when the entry is created, not when the buffered writer inserts it
+    timestamp = models.DateTimeField(default=timezone.now, editable=False)
 
     class Meta:
         db_table = 'admin_logs'
         ordering = ['-timestamp']
+        indexes = [
+            # Whole log, newest first
+            models.Index(fields=['timestamp'], name='adminlog_timestamp_idx'),
+            # Filtered by admin, action or target, newest first
+            models.Index(fields=['admin', 'timestamp'], name='adminlog_admin_timestamp_idx'),
+            models.Index(fields=['action', 'timestamp'], name='adminlog_action_timestamp_idx'),
+            models.Index(fields=['target_model', 'target_id', 'timestamp'], name='adminlog_target_timestamp_idx'),
+        ]
 
     def __str__(self):
         return f"{self.admin} | {self.action} | {self.target_model} | {self.timestamp}"
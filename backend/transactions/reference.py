@@ -0,0 +1,70 @@
+"""
+Time-ordered transaction reference ids.
+
+References are ULIDs: a 48-bit millisecond timestamp followed by 80 random
+bits, written as 26 Crockford base32 characters. New rows therefore land at
+the right-hand end of the unique index instead of at random pages, which keeps
+InnoDB inserts sequential. Ids generated in the same millisecond by the same
+process increment the random part, so they stay strictly increasing; other
+processes and hosts need no coordination because their random parts differ.
+"""
+import os
+import secrets
+import threading
+import time
+
+ALPHABET = '0123456789ABCDEFGHJKMNPQRSTVWXYZ'
+LENGTH = 26
+_RANDOM_BITS = 80
+_RANDOM_MAX = (1 << _RANDOM_BITS) - 1
+
+
+class ReferenceIdGenerator:
+    def __init__(self, clock=time.time):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def reset(self):
+        """Forget the last id, e.g. in a forked child so it does not continue the parent's sequence"""
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_random = 0
+
+    def __call__(self) -> str:
+        with self._lock:
+            now_ms = int(self._clock() * 1000)
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_random = secrets.randbits(_RANDOM_BITS)
+            elif self._last_random < _RANDOM_MAX:
+                # Same millisecond (or the clock went back): stay monotonic
+                self._last_random += 1
+            else:
+                self._last_ms += 1
+                self._last_random = secrets.randbits(_RANDOM_BITS)
+            value = (self._last_ms << _RANDOM_BITS) | self._last_random
+        return encode(value)
+
+
+def encode(value: int) -> str:
+    chars = []
+    for _ in range(LENGTH):
+        value, index = divmod(value, 32)
+        chars.append(ALPHABET[index])
+    return ''.join(reversed(chars))
+
+
+def timestamp_ms(reference_id: str) -> int:
+    """Millisecond timestamp embedded in a reference id"""
+    value = 0
+    for char in reference_id[:10]:
+        value = value * 32 + ALPHABET.index(char)
+    return value
+
+
+new_reference_id = ReferenceIdGenerator()
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=new_reference_id.reset)
@@ -0,0 +1,143 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from django.db import IntegrityError, transaction as db_transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from .models import DailyTransactionSummary, Transaction
+
+
+def _key(txn, status=None):
+    return (timezone.localdate(txn.created_at), status or txn.status, txn.currency)
+
+
+def apply_deltas(deltas):
+    """
+    Add {(date, status, currency): (count, total)} deltas to the rollup.
+    Increments are done in SQL (F expressions), so concurrent writers never
+    lose updates; keys are applied in sorted order to avoid deadlocks.
+    """
+    for (day, status, currency), (count, total) in sorted(deltas.items()):
+        if not count and not total:
+            continue
+        key = {'date': day, 'status': status, 'currency': currency}
+        increment = {'count': F('count') + count, 'total': F('total') + total}
+        if DailyTransactionSummary.objects.filter(**key).update(**increment):
+            continue
+        try:
+            with db_transaction.atomic():
+                DailyTransactionSummary.objects.create(**key, count=count, total=total)
+        except IntegrityError:
+            # Another request created the row first
+            DailyTransactionSummary.objects.filter(**key).update(**increment)
+
+
+def record_created(transactions):
+    """Count newly created transactions into the rollup"""
+    deltas = defaultdict(lambda: (0, Decimal('0')))
+    for txn in transactions:
+        count, total = deltas[_key(txn)]
+        deltas[_key(txn)] = (count + 1, total + Decimal(str(txn.amount)))
+    apply_deltas(deltas)
+
+
+def record_status_change(txn, old_status):
+    """Move a transaction from its old status bucket to its current one"""
+    record_status_changes([(txn, old_status)])
+
+
+def record_status_changes(changes):
+    """Like record_status_change for many (transaction, old_status) pairs, netted per key"""
+    deltas = defaultdict(lambda: (0, Decimal('0')))
+    for txn, old_status in changes:
+        if old_status == txn.status:
+            continue
+        amount = Decimal(str(txn.amount))
+        for key, sign in ((_key(txn, old_status), -1), (_key(txn), 1)):
+            count, total = deltas[key]
+            deltas[key] = (count + sign, total + sign * amount)
+    apply_deltas(deltas)
+
+
+def _day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _aggregate(queryset):
+    rows = (
+        queryset
+        .annotate(date=TruncDate('created_at'))
+        .values('date', 'status', 'currency')
+        .annotate(count=Count('id'), total=Sum('amount'))
+        .order_by()
+    )
+    return {(row['date'], row['status'], row['currency']): (row['count'], row['total']) for row in rows}
+
+
+def record_deleted(transactions):
+    """Take a queryset of transactions out of the rollup; call in the same atomic block as the delete"""
+    apply_deltas({key: (-count, -total) for key, (count, total) in _aggregate(transactions).items()})
+
+
+def recompute(date_from, date_to):
+    """Aggregate transactions for [date_from, date_to] straight from the transactions table"""
+    return _aggregate(Transaction.objects.filter(
+        created_at__gte=_day_start(date_from), created_at__lt=_day_start(date_to + timedelta(days=1)),
+    ))
+
+
+def stored(date_from, date_to):
+    rows = DailyTransactionSummary.objects.filter(date__gte=date_from, date__lte=date_to)
+    return {(row.date, row.status, row.currency): (row.count, row.total) for row in rows if row.count or row.total}
+
+
+def transaction_date_bounds():
+    """(first, last) transaction dates, or (None, None) when there are none"""
+    first = Transaction.objects.order_by('created_at').values_list('created_at', flat=True).first()
+    last = Transaction.objects.order_by('-created_at').values_list('created_at', flat=True).first()
+    if first is None:
+        return None, None
+    return timezone.localdate(first), timezone.localdate(last)
+
+
+def iter_chunks(date_from, date_to, days):
+    """Split [date_from, date_to] into consecutive ranges of at most `days` days"""
+    start = date_from
+    while start <= date_to:
+        end = min(start + timedelta(days=days - 1), date_to)
+        yield start, end
+        start = end + timedelta(days=1)
+
+
+def rebuild(date_from, date_to):
+    """Replace the rollup rows for [date_from, date_to] with a fresh recompute; returns rows written"""
+    with db_transaction.atomic():
+        rows = DailyTransactionSummary.objects.filter(date__gte=date_from, date__lte=date_to)
+        # Writers apply their deltas in the same transaction as the rows they
+        # change, so with the range locked every delta is either already in the
+        # recompute or waits and lands on top of the rebuilt rows
+        list(rows.select_for_update())
+        fresh = recompute(date_from, date_to)
+        rows.delete()
+        DailyTransactionSummary.objects.bulk_create([
+            DailyTransactionSummary(date=day, status=status, currency=currency, count=count, total=total)
+            for (day, status, currency), (count, total) in fresh.items()
+        ])
+    return len(fresh)
+
+
+def find_mismatches(date_from, date_to):
+    """
+    Compare the rollup with a full recompute over [date_from, date_to].
+    Returns [(key, stored (count, total), expected (count, total))] for every difference.
+    """
+    expected = recompute(date_from, date_to)
+    actual = stored(date_from, date_to)
+    mismatches = []
+    for key in sorted(set(expected) | set(actual)):
+        want = expected.get(key, (0, Decimal('0')))
+        have = actual.get(key, (0, Decimal('0')))
+        if want[0] != have[0] or Decimal(want[1]) != Decimal(have[1]):
+            mismatches.append((key, have, want))
+    return mismatches
@@ -1,6 +1,9 @@
-from rest_framework import serializers
-from decimal import Decimal
-from .models import Transaction
+from rest_framework import ISO_8601, serializers
+from rest_framework.settings import api_settings
+from decimal import Decimal, getcontext
+from django.utils import timezone
+from django.utils.functional import cached_property
+from .models import AdminLog, Transaction
 from cards.serializers import CardSerializer
 
 
@@ -17,6 +20,118 @@ class TransactionSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'status', 'reference_id', 'failure_reason', 'created_at', 'updated_at']
 
 
+class ValuesSerializer:
+    """
+    Read-only fast path for a ModelSerializer. Rows fetched with
+    `values(queryset)` are rendered straight from dicts, using converters
+    compiled once from the serializer's fields, into exactly the
+    representation the serializer itself would return. Supports the field
+    types used by the list serializers; anything else raises TypeError when
+    the mapping is first compiled.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+
+    @cached_property
+    def _compiled(self):
+        return self._compile(self.serializer_class(), '')
+
+    @cached_property
+    def value_fields(self):
+        keys = []
+
+        def collect(fields):
+            for _, key, convert in fields:
+                keys.append(key)
+                if isinstance(convert, list):
+                    collect(convert)
+        collect(self._compiled)
+        return list(dict.fromkeys(keys))
+
+    def values(self, queryset):
+        return queryset.values(*self.value_fields)
+
+    def serialize(self, rows):
+        tz = timezone.get_current_timezone()
+        return [self._render(self._compiled, row, tz) for row in rows]
+
+    def _render(self, fields, row, tz):
+        out = {}
+        for name, key, convert in fields:
+            value = row[key]
+            if value is None:
+                out[name] = None
+            elif isinstance(convert, list):
+                out[name] = self._render(convert, row, tz)
+            elif convert is _datetime:
+                out[name] = _datetime(value, tz)
+            else:
+                out[name] = convert(value)
+        return out
+
+    def _compile(self, serializer, prefix):
+        fields = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            key = prefix + field.source.replace('.', '__')
+            if isinstance(field, serializers.BaseSerializer):
+                # Nested object: None when the foreign key is null
+                fields.append((name, key, self._compile(field, key + '__')))
+            elif isinstance(field, serializers.PrimaryKeyRelatedField):
+                fields.append((name, key, _identity))
+            elif isinstance(field, serializers.DateTimeField):
+                output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+                if not isinstance(output_format, str) or output_format.lower() != ISO_8601:
+                    raise TypeError(f'{name}: only ISO 8601 datetimes are supported')
+                fields.append((name, key, _datetime))
+            elif isinstance(field, serializers.DecimalField):
+                fields.append((name, key, _decimal(field)))
+            elif isinstance(field, (serializers.CharField, serializers.ChoiceField,
+                                    serializers.IntegerField, serializers.BooleanField)):
+                fields.append((name, key, field.to_representation))
+            else:
+                raise TypeError(f'{name}: {type(field).__name__} is not supported')
+        return fields
+
+
+def _identity(value):
+    return value
+
+
+def _datetime(value, tz):
+    text = value.astimezone(tz).isoformat()
+    return text[:-6] + 'Z' if text.endswith('+00:00') else text
+
+
+def _decimal(field):
+    if not getattr(field, 'coerce_to_string', api_settings.COERCE_DECIMAL_TO_STRING) \
+            or field.normalize_output or field.localize:
+        return field.to_representation
+    exponent = Decimal('.1') ** field.decimal_places
+    context = getcontext().copy()
+    context.prec = field.max_digits
+
+    def convert(value):
+        return f'{value.quantize(exponent, rounding=field.rounding, context=context):f}'
+    return convert
+
+
+class AdminLogSerializer(serializers.ModelSerializer):
+    admin = serializers.EmailField(source='admin.email', read_only=True, allow_null=True)
+
+    class Meta:
+        model = AdminLog
+        fields = ['id', 'admin', 'action', 'target_model', 'target_id', 'description', 'ip_address', 'timestamp']
+        read_only_fields = fields
+
+
+# List endpoints render these serializers' output from .values() rows
+transaction_values_serializer = ValuesSerializer(TransactionSerializer)
+admin_log_values_serializer = ValuesSerializer(AdminLogSerializer)
+
+
 class TransactionCreateSerializer(serializers.Serializer):
     card_id = serializers.IntegerField()
     amount = serializers.DecimalField(max_digits=12, decimal_places=2, min_value=Decimal('0.01'))
@@ -28,3 +143,15 @@ class TransactionCreateSerializer(serializers.Serializer):
         if value <= 0:
             raise serializers.ValidationError("Amount must be greater than zero.")
         return value
+
+
+class TransactionBulkItemSerializer(TransactionCreateSerializer):
+    """Bulk create item; the payment service may record an already-decided status"""
+    status = serializers.ChoiceField(choices=['PENDING', 'SUCCESS', 'FAILED'], default='PENDING')
+    failure_reason = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
+
+
+class TransactionStatusUpdateItemSerializer(serializers.Serializer):
+    reference_id = serializers.CharField(max_length=100)
+    status = serializers.ChoiceField(choices=['SUCCESS', 'FAILED'])
+    failure_reason = serializers.CharField(max_length=255, required=False, allow_blank=True, default='')
@@ -1,11 +1,32 @@
+import asyncio
+import threading
 import uuid
-from django.test import TestCase
-from django.urls import reverse
-from rest_framework.test import APIClient
+from datetime import datetime
+from unittest import skipUnless
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.urls import resolve, reverse
+from asgiref.sync import sync_to_async
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
 from rest_framework import status
+from rest_framework_simplejwt.tokens import AccessToken
 from django.contrib.auth import get_user_model
+from accounts.authentication import user_cache
+from admin_panel.views import filter_admin_transactions
 from cards.models import Card
-from .models import Transaction
+from .filters import filter_date_range
+from .models import DailyTransactionSummary, Transaction
+from .pagination import KeysetPagination
+from .serializers import TransactionSerializer, transaction_values_serializer
+from .reference import LENGTH, ReferenceIdGenerator, new_reference_id, timestamp_ms
+from .rollup import find_mismatches
 
 User = get_user_model()
 
@@ -94,3 +115,456 @@ class TransactionTestCase(TestCase):
             format='json'
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_create_per_item_results(self):
+        response = self.client.post(reverse('transaction-bulk-create'), {'transactions': [
+            {'card_id': self.card.id, 'amount': '10.00', 'merchant_name': 'A', 'status': 'SUCCESS'},
+            {'card_id': 999999, 'amount': '20.00', 'merchant_name': 'B'},
+            {'card_id': self.card.id, 'amount': '0', 'merchant_name': 'C'},
+            {'card_id': self.card.id, 'amount': '30.00', 'merchant_name': 'D',
+             'status': 'FAILED', 'failure_reason': 'Card declined by issuer'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertEqual([r['index'] for r in results], [0, 1, 2, 3])
+        self.assertEqual(results[0]['transaction']['status'], 'SUCCESS')
+        self.assertEqual(results[1]['error'], 'Card not found.')
+        self.assertIn('amount', results[2]['errors'])
+        self.assertEqual(results[3]['transaction']['failure_reason'], 'Card declined by issuer')
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2)
+
+    def test_bulk_create_query_count_does_not_grow_with_batch(self):
+        def batch(size):
+            return {'transactions': [
+                {'card_id': self.card.id, 'amount': '1.00', 'merchant_name': f'M{i}', 'status': 'SUCCESS'}
+                for i in range(size)
+            ] + [{'card_id': 999999, 'amount': '1.00', 'merchant_name': 'Missing'}]}
+
+        # Warm the rollup row so both requests take the same update path
+        self.client.post(reverse('transaction-bulk-create'), batch(1), format='json')
+        counts = []
+        for size in (3, 60):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse('transaction-bulk-create'), batch(size), format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(sum('transaction' in r for r in response.data['results']), size)
+            self.assertTrue(all(r['transaction']['id'] for r in response.data['results'][:size]))
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+
+    def test_bulk_create_rejects_empty_list(self):
+        response = self.client.post(reverse('transaction-bulk-create'), {'transactions': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_update_status_reports_not_found(self):
+        first = self._create_transaction('PENDING')
+        second = self._create_transaction('PENDING')
+        response = self.client.post(reverse('transaction-bulk-update-status'), {'updates': [
+            {'reference_id': first.reference_id, 'status': 'SUCCESS'},
+            {'reference_id': second.reference_id, 'status': 'FAILED', 'failure_reason': 'Insufficient funds'},
+            {'reference_id': 'MISSING', 'status': 'SUCCESS'},
+            {'reference_id': first.reference_id, 'status': 'INVALID'},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['not_found'], ['MISSING'])
+        self.assertEqual([e['index'] for e in response.data['errors']], [3])
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual(first.status, 'SUCCESS')
+        self.assertEqual((second.status, second.failure_reason), ('FAILED', 'Insufficient funds'))
+        self.assertGreater(second.updated_at, second.created_at)
+
+    def test_bulk_update_status_query_count_does_not_grow_with_batch(self):
+        def batch(size):
+            return {'updates': [
+                {'reference_id': self._create_transaction('PENDING').reference_id, 'status': 'SUCCESS'}
+                for _ in range(size)
+            ] + [{'reference_id': 'MISSING', 'status': 'FAILED'}]}
+
+        # Warm the rollup rows so both requests take the same update path
+        self.client.post(reverse('transaction-bulk-update-status'), batch(1), format='json')
+        counts = []
+        for size in (3, 60):
+            body = batch(size)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(reverse('transaction-bulk-update-status'), body, format='json')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['updated'], size)
+            counts.append(len(queries))
+        self.assertEqual(counts[0], counts[1])
+        self.assertFalse(Transaction.objects.filter(status='PENDING').exists())
+
+    def _render_list_both_ways(self):
+        queryset = Transaction.objects.order_by('id')
+        slow = JSONRenderer().render(TransactionSerializer(queryset.select_related('card'), many=True).data)
+        fast = JSONRenderer().render(
+            transaction_values_serializer.serialize(transaction_values_serializer.values(queryset))
+        )
+        return slow, fast
+
+    def test_values_serializer_matches_model_serializer(self):
+        self._create_transaction('PENDING')
+        declined = self._create_transaction('FAILED')
+        declined.amount = '0.10'
+        declined.failure_reason = 'Card declined by issuer'
+        declined.description = 'Ünïcode "quoted" description'
+        declined.save()
+        orphan = self._create_transaction('SUCCESS')
+        orphan.card = None
+        orphan.save()
+
+        slow, fast = self._render_list_both_ways()
+        self.assertEqual(slow, fast)
+        with timezone.override('Asia/Kolkata'):
+            slow, fast = self._render_list_both_ways()
+        self.assertIn(b'+05:30', fast)
+        self.assertEqual(slow, fast)
+
+    def test_list_endpoint_uses_values_rows(self):
+        for _ in range(3):
+            self._create_transaction()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('transaction-list'), {'page_size': 2})
+        self.assertEqual(len(queries), 1)
+        expected = TransactionSerializer(Transaction.objects.order_by('-created_at', '-id')[:2], many=True).data
+        self.assertEqual(response.data['results'], expected)
+        self.assertIsNotNone(response.data['next'])
+
+    def test_date_filters_include_whole_days(self):
+        times = ['2024-03-09 23:59:59', '2024-03-10 00:00:00', '2024-03-11 23:59:59', '2024-03-12 00:00:00']
+        for value in times:
+            txn = self._create_transaction()
+            Transaction.objects.filter(pk=txn.pk).update(
+                created_at=timezone.make_aware(datetime.strptime(value, '%Y-%m-%d %H:%M:%S'))
+            )
+        response = self.client.get(reverse('transaction-list') + '?date_from=2024-03-10&date_to=2024-03-11')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            sorted(txn['created_at'][:19] for txn in response.data['results']),
+            ['2024-03-10T00:00:00', '2024-03-11T23:59:59'],
+        )
+
+
+    def _walk(self, url):
+        """Follow `next` links from url; returns the pages of ids"""
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([txn['id'] for txn in response.data['results']])
+            url = response.data['next']
+        return pages
+
+    def test_keyset_pages_cover_every_row_once(self):
+        # Identical timestamps force the id tie-breaker to do its job
+        same_time = timezone.make_aware(datetime(2024, 5, 1, 12, 0))
+        for i in range(8):
+            txn = self._create_transaction('FAILED' if i % 2 else 'SUCCESS')
+            Transaction.objects.filter(pk=txn.pk).update(created_at=same_time)
+        pages = self._walk(reverse('transaction-list') + '?page_size=3')
+        self.assertEqual([len(page) for page in pages], [3, 3, 2])
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(ids, sorted(ids, reverse=True))
+
+        response = self.client.get(reverse('transaction-list') + '?page_size=3')
+        self.assertNotIn('count', response.data)
+        self.assertIsNone(response.data['previous'])
+        second = self.client.get(response.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual([t['id'] for t in back.data['results']], pages[0])
+
+        failed = self._walk(reverse('transaction-list') + '?page_size=3&status=FAILED')
+        self.assertEqual(
+            [pk for page in failed for pk in page],
+            list(Transaction.objects.filter(status='FAILED').order_by('-id').values_list('id', flat=True)),
+        )
+
+    def test_keyset_follows_ordering_param(self):
+        for amount in ['30.00', '10.00', '20.00', '10.00', '40.00']:
+            txn = self._create_transaction()
+            Transaction.objects.filter(pk=txn.pk).update(amount=amount)
+        pages = self._walk(reverse('transaction-list') + '?page_size=2&ordering=amount')
+        amounts = [str(Transaction.objects.get(pk=pk).amount) for page in pages for pk in page]
+        self.assertEqual(amounts, ['10.00', '10.00', '20.00', '30.00', '40.00'])
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('transaction-list') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_hot_read_views_are_async_only_under_asgi(self):
+        urls = (reverse('transaction-list'), reverse('transaction-detail', args=[1]), reverse('card-list-create'))
+        with override_settings(ROOT_URLCONF='backend.urls'):
+            for url in urls:
+                self.assertFalse(asyncio.iscoroutinefunction(resolve(url).func), url)
+        with override_settings(ROOT_URLCONF='backend.asgi_urls'):
+            for url in urls:
+                self.assertTrue(asyncio.iscoroutinefunction(resolve(url).func), url)
+
+    @override_settings(ROOT_URLCONF='backend.asgi_urls')
+    async def test_async_views_through_asgi_handler(self):
+        await sync_to_async(user_cache.clear)()
+        own = await sync_to_async(self._create_transaction)('SUCCESS')
+        other_user = await sync_to_async(User.objects.create_user)(
+            email='other@test.com', username='other', password='SecurePass@123'
+        )
+        other = await Transaction.objects.acreate(
+            user=other_user, amount='5.00', merchant_name='Elsewhere', status='SUCCESS', reference_id='OTHERREF0001'
+        )
+        headers = {'Authorization': f'Bearer {AccessToken.for_user(self.user)}'}
+
+        response = await self.async_client.get(reverse('transaction-list'), {'page_size': 1}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([txn['id'] for txn in response.json()['results']], [own.id])
+
+        response = await self.async_client.get(reverse('transaction-detail', args=[own.id]), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['card_detail']['masked_number'], '**** **** **** 1111')
+        response = await self.async_client.get(reverse('transaction-detail', args=[other.id]), headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = await self.async_client.get(reverse('card-list-create'), headers=headers)
+        self.assertEqual([card['id'] for card in response.json()], [self.card.id])
+        response = await self.async_client.get(reverse('transaction-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+class ReferenceIdTestCase(TestCase):
+    def test_ids_increase_within_one_millisecond(self):
+        generate = ReferenceIdGenerator(clock=lambda: 1700000000.123)
+        ids = [generate() for _ in range(1000)]
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), 1000)
+        self.assertEqual(timestamp_ms(ids[0]), 1700000000123)
+
+    def test_ids_follow_the_clock(self):
+        now = [1700000000.0]
+        generate = ReferenceIdGenerator(clock=lambda: now[0])
+        first = generate()
+        now[0] += 0.001
+        second = generate()
+        self.assertLess(first, second)
+        self.assertEqual(timestamp_ms(second) - timestamp_ms(first), 1)
+
+    def test_unique_and_ordered_across_threads(self):
+        results = [[] for _ in range(8)]
+
+        def work(out):
+            out.extend(new_reference_id() for _ in range(2000))
+
+        threads = [threading.Thread(target=work, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = [reference_id for out in results for reference_id in out]
+        self.assertEqual(len(set(ids)), len(ids))
+        for out in results:
+            self.assertEqual(out, sorted(out))
+
+    def test_created_transactions_get_ordered_ids(self):
+        user = User.objects.create_user(email='ref@test.com', username='ref', password='SecurePass@123')
+        card = Card.objects.create(
+            user=user, card_holder_name='Ref User', last_four_digits='3333',
+            masked_number='**** **** **** 3333', card_type='VISA', expiry_month=12, expiry_year=2027,
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        single = client.post(reverse('transaction-create'), {
+            'card_id': card.id, 'amount': '1.00', 'merchant_name': 'Shop',
+        }, format='json').data['reference_id']
+        bulk = [r['transaction']['reference_id'] for r in client.post(reverse('transaction-bulk-create'), {
+            'transactions': [{'card_id': card.id, 'amount': '1.00', 'merchant_name': 'Shop'}] * 3,
+        }, format='json').data['results']]
+        self.assertEqual([single] + bulk, sorted([single] + bulk))
+        self.assertTrue(all(len(reference_id) == LENGTH for reference_id in [single] + bulk))
+
+
+class DailySummaryTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='rollup@test.com', username='rollup', password='SecurePass@123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.card = Card.objects.create(
+            user=self.user, card_holder_name='Rollup User', last_four_digits='2222',
+            masked_number='**** **** **** 2222', card_type='VISA', expiry_month=12, expiry_year=2027,
+        )
+        self.today = timezone.localdate()
+
+    def _summary(self):
+        return {
+            (row.status, row.currency): (row.count, str(row.total))
+            for row in DailyTransactionSummary.objects.filter(date=self.today) if row.count
+        }
+
+    def test_rollup_follows_creates_and_status_updates(self):
+        first = self.client.post(reverse('transaction-create'), {
+            'card_id': self.card.id, 'amount': '100.00', 'merchant_name': 'Shop',
+        }, format='json').data
+        second = self.client.post(reverse('transaction-create'), {
+            'card_id': self.card.id, 'amount': '5.50', 'merchant_name': 'Shop', 'currency': 'EUR',
+        }, format='json').data
+        self.client.post(reverse('transaction-bulk-create'), {'transactions': [
+            {'card_id': self.card.id, 'amount': '10.00', 'merchant_name': 'A', 'status': 'SUCCESS'},
+            {'card_id': self.card.id, 'amount': '20.00', 'merchant_name': 'B', 'status': 'FAILED'},
+        ]}, format='json')
+        self.client.patch(
+            reverse('transaction-update-status', kwargs={'reference_id': first['reference_id']}),
+            {'status': 'SUCCESS'}, format='json',
+        )
+        self.assertEqual(self._summary(), {
+            ('SUCCESS', 'USD'): (2, '110.00'),
+            ('FAILED', 'USD'): (1, '20.00'),
+            ('PENDING', 'EUR'): (1, '5.50'),
+        })
+        self.client.post(reverse('transaction-bulk-update-status'), {'updates': [
+            {'reference_id': first['reference_id'], 'status': 'FAILED'},
+            {'reference_id': second['reference_id'], 'status': 'SUCCESS'},
+        ]}, format='json')
+        self.assertEqual(self._summary(), {
+            ('SUCCESS', 'USD'): (1, '10.00'),
+            ('FAILED', 'USD'): (2, '120.00'),
+            ('SUCCESS', 'EUR'): (1, '5.50'),
+        })
+        self.assertEqual(find_mismatches(self.today, self.today), [])
+
+    def test_rebuild_command_restores_rollup(self):
+        for amount in ('1.00', '2.00', '3.00'):
+            self.client.post(reverse('transaction-create'), {
+                'card_id': self.card.id, 'amount': amount, 'merchant_name': 'Shop',
+            }, format='json')
+        expected = self._summary()
+        DailyTransactionSummary.objects.update(count=0, total=0)
+        with self.assertRaises(CommandError):
+            call_command('rebuild_daily_summary', '--check', stdout=StringIO())
+
+        call_command('rebuild_daily_summary', '--chunk-days', '1', stdout=StringIO())
+        self.assertEqual(self._summary(), expected)
+        call_command('rebuild_daily_summary', '--check', stdout=StringIO())
+
+
+class TransactionAnalyticsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email='analytics@test.com', username='analytics', password='SecurePass@123'
+        )
+        self.client.force_authenticate(user=self.user)
+        self.card = Card.objects.create(
+            user=self.user, card_holder_name='Chart User', last_four_digits='4444',
+            masked_number='**** **** **** 4444', card_type='VISA', expiry_month=12, expiry_year=2027,
+        )
+
+    def _create(self, amount, merchant, status_val):
+        return Transaction.objects.create(
+            user=self.user, card=self.card, amount=amount, currency='USD', merchant_name=merchant,
+            status=status_val, reference_id=new_reference_id(),
+        )
+
+    def test_aggregates_spend(self):
+        for amount, merchant, status_val in [
+            ('10.00', 'Cafe', 'SUCCESS'), ('15.50', 'Cafe', 'SUCCESS'),
+            ('99.99', 'Books', 'SUCCESS'), ('500.00', 'Books', 'FAILED'), ('5.00', 'Cafe', 'PENDING'),
+        ]:
+            self._create(amount, merchant, status_val)
+        other = User.objects.create_user(email='other@test.com', username='other', password='SecurePass@123')
+        Transaction.objects.create(
+            user=other, amount='1.00', merchant_name='Cafe', status='SUCCESS', reference_id=new_reference_id(),
+        )
+
+        data = self.client.get(reverse('transaction-analytics')).data
+        month = timezone.now().strftime('%Y-%m')
+        self.assertEqual(data['by_month'], [{'month': month, 'currency': 'USD', 'count': 3, 'total': '125.49'}])
+        self.assertEqual(data['by_merchant'], [
+            {'merchant_name': 'Books', 'currency': 'USD', 'count': 1, 'total': '99.99'},
+            {'merchant_name': 'Cafe', 'currency': 'USD', 'count': 2, 'total': '25.50'},
+        ])
+        self.assertEqual(data['by_card'], [{
+            'card': self.card.id, 'masked_number': '**** **** **** 4444', 'card_type': 'VISA',
+            'currency': 'USD', 'count': 3, 'total': '125.49',
+        }])
+        self.assertEqual(data['by_status'], [
+            {'status': 'FAILED', 'currency': 'USD', 'count': 1, 'total': '500.00'},
+            {'status': 'PENDING', 'currency': 'USD', 'count': 1, 'total': '5.00'},
+            {'status': 'SUCCESS', 'currency': 'USD', 'count': 3, 'total': '125.49'},
+        ])
+
+    def test_repeat_load_is_served_from_cache_until_a_write(self):
+        txn = self._create('20.00', 'Cafe', 'PENDING')
+        self.client.get(reverse('transaction-analytics'))
+        with CaptureQueriesContext(connection) as queries:
+            cached = self.client.get(reverse('transaction-analytics')).data
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(cached['by_month'], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(
+                reverse('transaction-update-status', args=[txn.reference_id]), {'status': 'SUCCESS'}, format='json'
+            )
+        self.assertEqual(self.client.get(reverse('transaction-analytics')).data['by_month'][0]['total'], '20.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('transaction-bulk-create'), {'transactions': [
+                {'card_id': self.card.id, 'amount': '5.00', 'merchant_name': 'Cafe', 'status': 'SUCCESS'},
+            ]}, format='json')
+        self.assertEqual(self.client.get(reverse('transaction-analytics')).data['by_month'][0]['total'], '25.00')
+
+
+@skipUnless(connection.vendor == 'sqlite', 'EXPLAIN QUERY PLAN is SQLite specific')
+class TransactionQueryPlanTestCase(TestCase):
+    """The page queries KeysetPagination runs must be served by an index, not a scan plus a sort"""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='planuser@test.com', username='planuser', password='SecurePass@123'
+        )
+
+    def _page_plans(self, queryset, ordering='-created_at'):
+        """Plans of the first page and of a page continued from a cursor"""
+        field = ordering.lstrip('-')
+        paginator = KeysetPagination()
+        paginator.ordering = ordering
+        value = timezone.make_aware(datetime(2024, 1, 15)) if field == 'created_at' else '10.00'
+        cursor = paginator.encode_cursor({field: value, 'id': 1000})
+        plans = []
+        for query in ({'ordering': ordering}, {'ordering': ordering, 'cursor': cursor}):
+            request = Request(APIRequestFactory().get('/', query))
+            page = KeysetPagination()._page_queryset(queryset.order_by(ordering), request)
+            plans.append(page.explain())
+        return plans
+
+    def _assert_index_only(self, plans, index):
+        for plan in plans:
+            self.assertIn(index, plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_user_history_uses_user_created_index(self):
+        queryset = filter_date_range(
+            Transaction.objects.filter(user=self.user), 'created_at', '2024-01-01', '2024-01-31'
+        )
+        self._assert_index_only(self._page_plans(queryset), 'txn_user_created_idx')
+
+    def test_user_history_by_amount_uses_user_amount_index(self):
+        queryset = Transaction.objects.filter(user=self.user)
+        for ordering in ('amount', '-amount'):
+            self._assert_index_only(self._page_plans(queryset, ordering), 'txn_user_amount_idx')
+
+    def test_user_history_by_status_uses_user_status_index(self):
+        queryset = filter_date_range(
+            Transaction.objects.filter(user=self.user, status='FAILED'), 'created_at', '2024-01-01', None
+        )
+        self._assert_index_only(self._page_plans(queryset), 'txn_user_status_created_idx')
+
+    def test_unfiltered_admin_list_uses_ordering_index(self):
+        queryset = filter_admin_transactions(Transaction.objects.all(), {})
+        self._assert_index_only(self._page_plans(queryset), 'txn_created_idx')
+        for ordering in ('amount', '-amount'):
+            self._assert_index_only(self._page_plans(queryset, ordering), 'txn_amount_idx')
+
+    def test_admin_status_and_date_filter_uses_status_index(self):
+        queryset = filter_date_range(
+            Transaction.objects.filter(status='SUCCESS'), 'created_at', '2024-01-01', '2024-01-31'
+        )
+        self._assert_index_only(self._page_plans(queryset), 'txn_status_created_idx')
@@ -1,9 +1,15 @@
 from django.urls import path
-from .views import TransactionListView, TransactionDetailView, TransactionCreateView, TransactionUpdateStatusView
+from .views import (
+    TransactionListView, TransactionDetailView, TransactionAnalyticsView, TransactionCreateView,
+    TransactionBulkCreateView, TransactionUpdateStatusView, TransactionBulkUpdateStatusView
+)
 
 urlpatterns = [
     path('', TransactionListView.as_view(), name='transaction-list'),
+    path('analytics/', TransactionAnalyticsView.as_view(), name='transaction-analytics'),
     path('create/', TransactionCreateView.as_view(), name='transaction-create'),
+    path('create/bulk/', TransactionBulkCreateView.as_view(), name='transaction-bulk-create'),
     path('<int:pk>/', TransactionDetailView.as_view(), name='transaction-detail'),
+    path('update-status/bulk/', TransactionBulkUpdateStatusView.as_view(), name='transaction-bulk-update-status'),
     path('update-status/<str:reference_id>/', TransactionUpdateStatusView.as_view(), name='transaction-update-status'),
 ]
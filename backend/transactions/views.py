@@ -1,18 +1,33 @@
-import uuid
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.db.models import Case, CharField, Value, When
+from django.utils import timezone
 from rest_framework import generics, permissions, status
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.utils.dateparse import parse_date
+from backend.async_views import AsyncAPIViewMixin
+from . import analytics
+from .filters import filter_date_range
+from .mixins import AsyncValuesListMixin, ValuesListMixin
 from .models import Transaction
-from .serializers import TransactionSerializer
+from .pagination import KeysetPagination
+from .reference import new_reference_id
+from .rollup import record_created, record_status_change, record_status_changes
+from .serializers import (
+    TransactionSerializer, TransactionBulkItemSerializer, TransactionStatusUpdateItemSerializer,
+    transaction_values_serializer,
+)
 from cards.models import Card
 
 
-class TransactionListView(generics.ListAPIView):
+class TransactionListView(ValuesListMixin, generics.ListAPIView):
     serializer_class = TransactionSerializer
+    values_serializer = transaction_values_serializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['status']
     search_fields = ['merchant_name', 'reference_id']
@@ -20,16 +35,11 @@ class TransactionListView(generics.ListAPIView):
     ordering = ['-created_at']
 
     def get_queryset(self):
-        queryset = Transaction.objects.filter(user=self.request.user).select_related('card')
+        queryset = Transaction.objects.filter(user=self.request.user)
         params = self.request.query_params
 
         # Date filtering
-        date_from = params.get('date_from')
-        date_to = params.get('date_to')
-        if date_from:
-            queryset = queryset.filter(created_at__date__gte=parse_date(date_from))
-        if date_to:
-            queryset = queryset.filter(created_at__date__lte=parse_date(date_to))
+        queryset = filter_date_range(queryset, 'created_at', params.get('date_from'), params.get('date_to'))
 
         # Amount filtering
         amount_min = params.get('amount_min')
@@ -42,6 +52,21 @@ class TransactionListView(generics.ListAPIView):
         return queryset
 
 
+class AsyncTransactionListView(AsyncAPIViewMixin, AsyncValuesListMixin, TransactionListView):
+    """TransactionListView for the ASGI deployment (see backend.asgi_urls)"""
+
+    async def get(self, request, *args, **kwargs):
+        return await self.list(request, *args, **kwargs)
+
+
+class TransactionAnalyticsView(APIView):
+    """Spending aggregates for the dashboard charts, cached per user (see transactions.analytics)"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        return Response(analytics.get_analytics(request.user.id))
+
+
 class TransactionDetailView(generics.RetrieveAPIView):
     serializer_class = TransactionSerializer
     permission_classes = [permissions.IsAuthenticated]
@@ -50,6 +75,24 @@ class TransactionDetailView(generics.RetrieveAPIView):
         return Transaction.objects.filter(user=self.request.user)
 
 
+class AsyncTransactionDetailView(AsyncAPIViewMixin, TransactionDetailView):
+    """TransactionDetailView for the ASGI deployment (see backend.asgi_urls)"""
+
+    def get_queryset(self):
+        # The card is serialized inline; lazy loading it is not allowed in async code
+        return super().get_queryset().select_related('card')
+
+    async def get(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.filter_queryset(self.get_queryset())
+        try:
+            instance = await queryset.aget(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        except Transaction.DoesNotExist:
+            raise NotFound()
+        self.check_object_permissions(request, instance)
+        return Response(self.get_serializer(instance).data)
+
+
 class TransactionCreateView(APIView):
     """Internal endpoint called by FastAPI to create PENDING transaction"""
     permission_classes = [permissions.IsAuthenticated]
@@ -66,37 +109,182 @@ class TransactionCreateView(APIView):
         except Card.DoesNotExist:
             return Response({'error': 'Card not found.'}, status=status.HTTP_404_NOT_FOUND)
 
-        reference_id = str(uuid.uuid4()).replace('-', '')[:20].upper()
-        transaction = Transaction.objects.create(
-            user=request.user,
-            card=card,
-            amount=amount,
-            currency=currency,
-            merchant_name=merchant_name,
-            description=description,
-            status='PENDING',
-            reference_id=reference_id,
-        )
+        reference_id = new_reference_id()
+        with db_transaction.atomic():
+            transaction = Transaction.objects.create(
+                user=request.user,
+                card=card,
+                amount=amount,
+                currency=currency,
+                merchant_name=merchant_name,
+                description=description,
+                status='PENDING',
+                reference_id=reference_id,
+            )
+            record_created([transaction])
+            analytics.invalidate([request.user.id])
         return Response(TransactionSerializer(transaction).data, status=status.HTTP_201_CREATED)
 
 
+class TransactionBulkCreateView(APIView):
+    """
+    Internal endpoint called by FastAPI to record a whole batch of payments
+    in one request. Returns one result per item, in input order.
+
+    The database work is constant regardless of batch size: one query
+    resolves every referenced card, one bulk INSERT writes the rows, and the
+    daily rollup is adjusted once per (date, status, currency).
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('transactions') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'transactions must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.TRANSACTION_BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'At most {settings.TRANSACTION_BULK_MAX_ITEMS} transactions per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = TransactionBulkItemSerializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = {'index': index, 'errors': serializer.errors}
+
+        cards = Card.objects.filter(user=request.user).in_bulk({data['card_id'] for _, data in valid})
+        pending = []
+        for index, data in valid:
+            card = cards.get(data['card_id'])
+            if card is None:
+                results[index] = {'index': index, 'error': 'Card not found.'}
+                continue
+            pending.append((index, Transaction(
+                user=request.user,
+                card=card,
+                amount=data['amount'],
+                currency=data['currency'],
+                merchant_name=data['merchant_name'],
+                description=data['description'],
+                status=data['status'],
+                failure_reason=data['failure_reason'],
+                reference_id=new_reference_id(),
+            )))
+
+        created = [txn for _, txn in pending]
+        if created:
+            with db_transaction.atomic():
+                Transaction.objects.bulk_create(created)
+                record_created(created)
+                analytics.invalidate([request.user.id])
+            if created[0].pk is None:
+                # Backends that cannot return ids from a bulk INSERT (MySQL): fetch them in one query
+                ids = dict(
+                    Transaction.objects.filter(reference_id__in=[txn.reference_id for txn in created])
+                    .values_list('reference_id', 'id')
+                )
+                for txn in created:
+                    txn.pk = ids[txn.reference_id]
+        for index, txn in pending:
+            results[index] = {'index': index, 'transaction': TransactionSerializer(txn).data}
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+
 class TransactionUpdateStatusView(APIView):
     """Called by FastAPI to update transaction status after processing"""
     permission_classes = [permissions.IsAuthenticated]
 
     def patch(self, request, reference_id):
-        try:
-            transaction = Transaction.objects.get(reference_id=reference_id)
-        except Transaction.DoesNotExist:
-            return Response({'error': 'Transaction not found.'}, status=status.HTTP_404_NOT_FOUND)
-
         new_status = request.data.get('status')
         failure_reason = request.data.get('failure_reason', '')
 
-        if new_status not in ['SUCCESS', 'FAILED']:
-            return Response({'error': 'Invalid status.'}, status=status.HTTP_400_BAD_REQUEST)
+        with db_transaction.atomic():
+            # Locked, so concurrent updates of the same transaction each see the
+            # status the previous one wrote and the rollup moves it only once
+            try:
+                transaction = Transaction.objects.select_for_update().get(reference_id=reference_id)
+            except Transaction.DoesNotExist:
+                return Response({'error': 'Transaction not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+            if new_status not in ['SUCCESS', 'FAILED']:
+                return Response({'error': 'Invalid status.'}, status=status.HTTP_400_BAD_REQUEST)
 
-        transaction.status = new_status
-        transaction.failure_reason = failure_reason
-        transaction.save()
+            old_status = transaction.status
+            transaction.status = new_status
+            transaction.failure_reason = failure_reason
+            transaction.save(update_fields=['status', 'failure_reason', 'updated_at'])
+            record_status_change(transaction, old_status)
+            analytics.invalidate([transaction.user_id])
         return Response(TransactionSerializer(transaction).data)
+
+
+class TransactionBulkUpdateStatusView(APIView):
+    """
+    Called by FastAPI to apply many status updates in one request.
+
+    Whatever the batch size, this is one SELECT for the affected rows and one
+    UPDATE that picks each row's new status and failure reason with CASE WHEN.
+    References that do not exist (or belong to another user) are returned
+    in `not_found`; invalid items in `errors`. If a reference appears more
+    than once the last update wins.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        items = request.data.get('updates') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'updates must be a non-empty list.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > settings.TRANSACTION_BULK_MAX_ITEMS:
+            return Response(
+                {'error': f'At most {settings.TRANSACTION_BULK_MAX_ITEMS} updates per request.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        errors = []
+        updates = {}
+        for index, item in enumerate(items):
+            serializer = TransactionStatusUpdateItemSerializer(data=item)
+            if serializer.is_valid():
+                data = serializer.validated_data
+                updates.pop(data['reference_id'], None)
+                updates[data['reference_id']] = data
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+
+        updated = 0
+        found = {}
+        if updates:
+            with db_transaction.atomic():
+                found = {
+                    txn.reference_id: txn for txn in
+                    Transaction.objects.select_for_update()
+                    .filter(user=request.user, reference_id__in=list(updates))
+                    .only('id', 'reference_id', 'status', 'amount', 'currency', 'created_at')
+                }
+                if found:
+                    changes = []
+                    status_whens, reason_whens = [], []
+                    for reference_id, txn in found.items():
+                        data = updates[reference_id]
+                        status_whens.append(When(pk=txn.pk, then=Value(data['status'])))
+                        reason_whens.append(When(pk=txn.pk, then=Value(data['failure_reason'])))
+                        changes.append((txn, txn.status))
+                    updated = Transaction.objects.filter(pk__in=[txn.pk for txn in found.values()]).update(
+                        status=Case(*status_whens, output_field=CharField()),
+                        failure_reason=Case(*reason_whens, output_field=CharField()),
+                        updated_at=timezone.now(),
+                    )
+                    for txn, _ in changes:
+                        txn.status = updates[txn.reference_id]['status']
+                    record_status_changes(changes)
+                    analytics.invalidate([request.user.id])
+
+        return Response({
+            'updated': updated,
+            'not_found': [reference_id for reference_id in updates if reference_id not in found],
+            'errors': errors,
+        }, status=status.HTTP_200_OK)
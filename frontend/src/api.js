@@ -66,6 +66,7 @@ export const cardsAPI = {
 // Transactions
 export const transactionsAPI = {
     list: (params) => api.get('/api/transactions/', { params }),
+    analytics: () => api.get('/api/transactions/analytics/'),
     create: (data) => api.post('/api/transactions/create/', data),
     detail: (id) => api.get(`/api/transactions/${id}/`),
     updateStatus: (refId, data) => api.patch(`/api/transactions/update-status/${refId}/`, data),
@@ -85,5 +86,5 @@ export const adminAPI = {
     transactions: (params) => api.get('/api/admin-panel/transactions/', { params }),
     dailySummary: () => api.get('/api/admin-panel/summary/daily/'),
     exportCSV: () => api.get('/api/admin-panel/transactions/export/csv/', { responseType: 'blob' }),
-    logs: () => api.get('/api/admin-panel/logs/'),
+    logs: (params) => api.get('/api/admin-panel/logs/', { params }),
 };
@@ -34,20 +34,20 @@ export default function DashboardPage() {
     const [loading, setLoading] = useState(true);
 
     useEffect(() => {
-        Promise.all([transactionsAPI.list({ ordering: '-created_at' }), cardsAPI.list()])
-            .then(([txnRes, cardRes]) => {
+        Promise.all([transactionsAPI.list({ ordering: '-created_at', page_size: 10 }), transactionsAPI.analytics(), cardsAPI.list()])
+            .then(([txnRes, analyticsRes, cardRes]) => {
                 const txns = txnRes.data.results || txnRes.data;
+                const { by_status, by_month } = analyticsRes.data;
+                const sum = (rows, key) => rows.reduce((s, r) => s + (key === 'total' ? parseFloat(r.total) : r.count), 0);
+                const withStatus = (status) => by_status.filter(r => r.status === status);
                 const now = new Date();
-                const thisMonth = txns.filter(t => {
-                    const d = new Date(t.created_at);
-                    return d.getMonth() === now.getMonth() && d.getFullYear() === now.getFullYear();
-                });
+                const month = `${now.getFullYear()}-${String(now.getMonth() + 1).padStart(2, '0')}`;
                 setStats({
-                    totalSpent: txns.filter(t => t.status === 'SUCCESS').reduce((s, t) => s + parseFloat(t.amount), 0).toFixed(2),
-                    totalTxns: txns.length,
-                    monthSpent: thisMonth.filter(t => t.status === 'SUCCESS').reduce((s, t) => s + parseFloat(t.amount), 0).toFixed(2),
-                    success: txns.filter(t => t.status === 'SUCCESS').length,
-                    failed: txns.filter(t => t.status === 'FAILED').length,
+                    totalSpent: sum(withStatus('SUCCESS'), 'total').toFixed(2),
+                    totalTxns: sum(by_status, 'count'),
+                    monthSpent: sum(by_month.filter(r => r.month === month), 'total').toFixed(2),
+                    success: sum(withStatus('SUCCESS'), 'count'),
+                    failed: sum(withStatus('FAILED'), 'count'),
                     cards: cardRes.data.length,
                 });
                 setTransactions(txns.slice(0, 10));
@@ -12,24 +12,30 @@ export default function TransactionsPage() {
     const [loading, setLoading] = useState(true);
     const [filters, setFilters] = useState({ status: '', date_from: '', date_to: '', amount_min: '', amount_max: '' });
     const [page, setPage] = useState(1);
-    const [total, setTotal] = useState(0);
+    const [cursor, setCursor] = useState(null);
+    const [links, setLinks] = useState({ next: null, previous: null });
+
+    // The API pages with opaque cursors; pull the cursor out of the next/previous links
+    const cursorFrom = (link) => link ? new URL(link).searchParams.get('cursor') : null;
 
     const load = () => {
         setLoading(true);
-        const params = { page, ...Object.fromEntries(Object.entries(filters).filter(([, v]) => v !== '')) };
+        const params = { ...Object.fromEntries(Object.entries(filters).filter(([, v]) => v !== '')) };
+        if (cursor) params.cursor = cursor;
         transactionsAPI.list(params)
             .then(r => {
                 const data = r.data;
-                if (data.results) { setTransactions(data.results); setTotal(data.count || 0); }
-                else { setTransactions(data); setTotal(data.length); }
+                if (data.results) { setTransactions(data.results); setLinks({ next: data.next, previous: data.previous }); }
+                else { setTransactions(data); setLinks({ next: null, previous: null }); }
             })
             .finally(() => setLoading(false));
     };
 
-    useEffect(() => { load(); }, [filters, page]);
+    useEffect(() => { load(); }, [filters, cursor]);
 
-    const handleFilter = (e) => { setFilters({ ...filters, [e.target.name]: e.target.value }); setPage(1); };
-    const clearFilters = () => { setFilters({ status: '', date_from: '', date_to: '', amount_min: '', amount_max: '' }); setPage(1); };
+    const goTo = (link, delta) => { setCursor(cursorFrom(link)); setPage(p => p + delta); };
+    const handleFilter = (e) => { setFilters({ ...filters, [e.target.name]: e.target.value }); setCursor(null); setPage(1); };
+    const clearFilters = () => { setFilters({ status: '', date_from: '', date_to: '', amount_min: '', amount_max: '' }); setCursor(null); setPage(1); };
 
     const inp = { padding: '8px 12px', borderRadius: 8, border: '1px solid var(--border)', background: 'var(--surface)', color: 'var(--text)', fontSize: 13, outline: 'none' };
 
@@ -39,7 +45,7 @@ export default function TransactionsPage() {
                 <div>
                     <h2 style={{ fontSize: 24, fontWeight: 700, color: 'var(--text)', margin: 0 }}>Transaction History</h2>
                     <p style={{ color: 'var(--text-muted)', fontSize: 13, margin: '4px 0 0' }}>
-                        {total > 0 ? `${total} transaction${total !== 1 ? 's' : ''} found` : 'No transactions'}
+                        {transactions.length > 0 ? `Page ${page} · ${transactions.length} transaction${transactions.length !== 1 ? 's' : ''}` : 'No transactions'}
                     </p>
                 </div>
             </div>
@@ -96,15 +102,15 @@ export default function TransactionsPage() {
                 </table>
 
                 {/* Pagination */}
-                {total > 20 && (
+                {(links.next || links.previous) && (
                     <div style={{ display: 'flex', justifyContent: 'flex-end', alignItems: 'center', gap: 8, padding: '12px 16px', borderTop: '1px solid var(--border)' }}>
-                        <button onClick={() => setPage(p => Math.max(1, p - 1))} disabled={page === 1}
-                            style={{ padding: '6px 14px', borderRadius: 6, border: '1px solid var(--border)', background: 'transparent', color: 'var(--text)', cursor: page === 1 ? 'not-allowed' : 'pointer', opacity: page === 1 ? 0.4 : 1 }}>
+                        <button onClick={() => goTo(links.previous, -1)} disabled={!links.previous}
+                            style={{ padding: '6px 14px', borderRadius: 6, border: '1px solid var(--border)', background: 'transparent', color: 'var(--text)', cursor: !links.previous ? 'not-allowed' : 'pointer', opacity: !links.previous ? 0.4 : 1 }}>
                             ← Prev
                         </button>
                         <span style={{ fontSize: 13, color: 'var(--text-muted)' }}>Page {page}</span>
-                        <button onClick={() => setPage(p => p + 1)} disabled={page * 20 >= total}
-                            style={{ padding: '6px 14px', borderRadius: 6, border: '1px solid var(--border)', background: 'transparent', color: 'var(--text)', cursor: page * 20 >= total ? 'not-allowed' : 'pointer', opacity: page * 20 >= total ? 0.4 : 1 }}>
+                        <button onClick={() => goTo(links.next, 1)} disabled={!links.next}
+                            style={{ padding: '6px 14px', borderRadius: 6, border: '1px solid var(--border)', background: 'transparent', color: 'var(--text)', cursor: !links.next ? 'not-allowed' : 'pointer', opacity: !links.next ? 0.4 : 1 }}>
                             Next →
                         </button>
                     </div>
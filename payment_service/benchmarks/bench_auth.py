@@ -0,0 +1,55 @@
+"""
+Per-request cost of verify_jwt_token with and without the verified-token cache.
+
+    python -m payment_service.benchmarks.bench_auth
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+
+import jwt
+from fastapi.security import HTTPAuthorizationCredentials
+
+from payment_service import main
+from payment_service.config import settings
+from payment_service.token_cache import TokenCache
+
+
+def make_token():
+    payload = {
+        "user_id": 1,
+        "email": "bench@example.com",
+        "is_admin": False,
+        "exp": datetime.utcnow() + timedelta(hours=1),
+    }
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def run(iterations, cache_size):
+    main.token_cache = TokenCache(maxsize=cache_size)
+    credentials = HTTPAuthorizationCredentials(scheme="Bearer", credentials=make_token())
+    start = time.perf_counter()
+    for _ in range(iterations):
+        main.verify_jwt_token(credentials)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=50000)
+    args = parser.parse_args()
+
+    original = main.token_cache
+    try:
+        uncached = run(args.iterations, cache_size=0)
+        cached = run(args.iterations, cache_size=settings.JWT_CACHE_SIZE)
+    finally:
+        main.token_cache = original
+
+    print(f"jwt.decode every request : {uncached:8.2f} us/request")
+    print(f"verified-token cache     : {cached:8.2f} us/request")
+    print(f"speedup                  : {uncached / cached:8.1f}x")
+
+
+if __name__ == "__main__":
+    main_cli()
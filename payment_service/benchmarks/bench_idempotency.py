@@ -0,0 +1,98 @@
+"""
+Latency of first-time vs replayed /payments/process requests with an Idempotency-Key,
+for each store backend. Django is replaced by the in-process stub with a fixed latency,
+so replays show the work they skip.
+
+    python -m payment_service.benchmarks.bench_idempotency
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import jwt
+
+from payment_service import main
+from payment_service.config import settings
+from payment_service.django_client import get_django_client
+from payment_service.delivery import InlineStatusDelivery, get_status_delivery
+from payment_service.idempotency import InMemoryIdempotencyStore, SQLiteIdempotencyStore
+from payment_service.benchmarks.django_stub import build_django_stub, stub_client
+from payment_service.benchmarks.loadtest import percentile
+
+PAYMENT = {"card_id": 1, "amount": 42.00, "merchant_name": "Bench Shop"}
+
+
+def make_token():
+    payload = {"user_id": 1, "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+async def measure(ac, token, keys):
+    samples = []
+    for key in keys:
+        headers = {"Authorization": f"Bearer {token}", "Idempotency-Key": key}
+        start = time.perf_counter()
+        response = await ac.post("/payments/process", json=PAYMENT, headers=headers)
+        samples.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return samples
+
+
+async def run(store, requests, django_latency):
+    stub = build_django_stub(latency=django_latency)
+    django = stub_client(stub)
+    main.idempotency_store = store
+    main.app.dependency_overrides[get_django_client] = lambda: django
+    main.app.dependency_overrides[get_status_delivery] = lambda: InlineStatusDelivery(django)
+    token = make_token()
+    keys = [str(uuid.uuid4()) for _ in range(requests)]
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://payments") as ac:
+            first = await measure(ac, token, keys)
+            replay = await measure(ac, token, keys)
+    finally:
+        main.app.dependency_overrides.pop(get_django_client, None)
+        main.app.dependency_overrides.pop(get_status_delivery, None)
+        await django.aclose()
+        store.close()
+    return first, replay
+
+
+def report(name, samples):
+    print(
+        f"  {name:<8} p50={statistics.median(samples):7.3f}ms "
+        f"p95={percentile(samples, 95):7.3f}ms p99={percentile(samples, 99):7.3f}ms"
+    )
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--django-latency", type=float, default=0.002, help="seconds per stubbed Django call")
+    args = parser.parse_args()
+
+    original = main.idempotency_store
+    with tempfile.TemporaryDirectory() as tmp:
+        stores = {
+            "memory": InMemoryIdempotencyStore(ttl=3600, lock_timeout=30, max_keys=args.requests * 2),
+            "sqlite": SQLiteIdempotencyStore(os.path.join(tmp, "idempotency.sqlite3"), ttl=3600, lock_timeout=30),
+        }
+        try:
+            for name, store in stores.items():
+                first, replay = asyncio.run(run(store, args.requests, args.django_latency))
+                print(f"{name} store ({args.requests} requests)")
+                report("first", first)
+                report("replayed", replay)
+        finally:
+            main.idempotency_store = original
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,92 @@
+"""
+Peak memory of /payments/process/stream for growing NDJSON inputs. The request
+body is generated chunk by chunk and the response is counted, not kept, so the
+tracemalloc peak reflects only what the endpoint itself holds.
+
+    python -m payment_service.benchmarks.bench_stream --lines 10000,100000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+
+from payment_service import main
+from payment_service.processor import SimulatedProcessor
+from payment_service.benchmarks.django_stub import build_django_stub, stub_client
+from payment_service.benchmarks.loadtest import make_token
+
+
+class _Discard(dict):
+    """Stub transaction store that keeps nothing, so it does not count towards the peak"""
+
+    def __setitem__(self, key, value):
+        pass
+
+
+async def stream_once(lines, chunk_lines=500):
+    line = (json.dumps({"card_id": 1, "amount": 42.5, "merchant_name": "Bench Shop"}) + "\n").encode()
+    remaining = lines
+    received = 0
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/payments/process/stream", "raw_path": b"/payments/process/stream",
+        "query_string": b"", "root_path": "", "client": ("127.0.0.1", 1), "server": ("payments", 80),
+        "headers": [
+            (b"host", b"payments"),
+            (b"authorization", f"Bearer {make_token()}".encode()),
+            (b"content-type", b"application/x-ndjson"),
+        ],
+        "app": main.app,
+    }
+
+    async def receive():
+        nonlocal remaining
+        count = min(chunk_lines, remaining)
+        remaining -= count
+        return {"type": "http.request", "body": line * count, "more_body": remaining > 0}
+
+    async def send(message):
+        nonlocal received
+        if message["type"] == "http.response.body":
+            received += message.get("body", b"").count(b"\n")
+
+    await main.app(scope, receive, send)
+    return received
+
+
+async def run(levels):
+    stub = build_django_stub()
+    stub.state.transactions = _Discard()
+    django = stub_client(stub)
+    main.app.state.django_client = django
+    original_processor = main.processor
+    main.processor = SimulatedProcessor(seed=1)
+    try:
+        await stream_once(100)  # warm-up
+        for lines in levels:
+            stub.state.calls.clear()
+            tracemalloc.start()
+            start = time.perf_counter()
+            received = await stream_once(lines)
+            elapsed = time.perf_counter() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            print(
+                f"lines={lines:<8} results={received:<8} {lines / elapsed:>10.0f} lines/s  "
+                f"peak={peak / 1024 / 1024:.2f} MiB"
+            )
+    finally:
+        await django.aclose()
+        main.processor = original_processor
+
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", default="10000,100000", help="comma-separated input sizes")
+    args = parser.parse_args()
+    asyncio.run(run([int(n) for n in args.lines.split(",") if n]))
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,92 @@
+"""In-process ASGI stand-in for the Django transaction endpoints used by tests and benchmarks."""
+import asyncio
+import uuid
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def build_django_stub(latency: float = 0.0, workers: int = None):
+    """
+    Minimal stand-in for Django's /api/transactions/ endpoints.
+    `latency` adds an asyncio.sleep to every call to mimic a slow backend, and
+    `workers` caps how many calls are served at once (like gunicorn sync workers).
+    Card id 404 behaves like a card that does not belong to the user.
+    """
+    stub = FastAPI()
+    stub.state.calls = []
+    stub.state.transactions = {}
+    stub.state.latency = latency
+    stub.state.workers = asyncio.Semaphore(workers) if workers else None
+
+    async def serve():
+        if stub.state.latency:
+            await asyncio.sleep(stub.state.latency)
+
+    async def record(kind: str, request: Request):
+        stub.state.calls.append((kind, request.client.port if request.client else None))
+        if stub.state.workers is None:
+            await serve()
+            return
+        async with stub.state.workers:
+            await serve()
+
+    @stub.post("/api/transactions/create/")
+    async def create_transaction(request: Request):
+        data = await request.json()
+        await record("create", request)
+        if not request.headers.get("authorization", "").startswith("Bearer "):
+            return JSONResponse({"detail": "Authentication credentials were not provided."}, status_code=401)
+        if data["card_id"] == 404:
+            return JSONResponse({"error": "Card not found."}, status_code=404)
+        reference_id = str(uuid.uuid4()).replace('-', '')[:20].upper()
+        txn = {**data, "status": "PENDING", "reference_id": reference_id, "failure_reason": ""}
+        stub.state.transactions[reference_id] = txn
+        return JSONResponse(txn, status_code=201)
+
+    @stub.post("/api/transactions/create/bulk/")
+    async def create_transactions_bulk(request: Request):
+        data = await request.json()
+        await record("bulk", request)
+        results = []
+        for index, item in enumerate(data["transactions"]):
+            if item["card_id"] == 404:
+                results.append({"index": index, "error": "Card not found."})
+                continue
+            reference_id = str(uuid.uuid4()).replace('-', '')[:20].upper()
+            txn = {**item, "reference_id": reference_id}
+            stub.state.transactions[reference_id] = txn
+            results.append({"index": index, "transaction": txn})
+        return JSONResponse({"results": results})
+
+    @stub.patch("/api/transactions/update-status/{reference_id}/")
+    async def update_status(reference_id: str, request: Request):
+        data = await request.json()
+        await record("update", request)
+        txn = stub.state.transactions.get(reference_id)
+        if txn is None:
+            return JSONResponse({"error": "Transaction not found."}, status_code=404)
+        txn.update(status=data["status"], failure_reason=data.get("failure_reason", ""))
+        return JSONResponse(txn)
+
+    @stub.post("/api/transactions/update-status/bulk/")
+    async def update_statuses_bulk(request: Request):
+        data = await request.json()
+        await record("bulk-update", request)
+        not_found = []
+        for update in data["updates"]:
+            txn = stub.state.transactions.get(update["reference_id"])
+            if txn is None:
+                not_found.append(update["reference_id"])
+                continue
+            txn.update(status=update["status"], failure_reason=update.get("failure_reason", ""))
+        updated = len(data["updates"]) - len(not_found)
+        return JSONResponse({"updated": updated, "not_found": not_found, "errors": []})
+
+    return stub
+
+
+def stub_client(stub) -> httpx.AsyncClient:
+    """AsyncClient that sends requests straight into the stub, without sockets"""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://django")
@@ -0,0 +1,190 @@
+"""
+Load/benchmark harness for payment_service.
+
+Drives payment_service.main.app in-process over httpx.ASGITransport, with the
+Django API replaced by the local stub behind the app's own Django guard
+(bulkhead, circuit breaker and the admission controller that reads them), and
+reports requests/sec, p50/p95/p99 latency and 429/503 rejections per endpoint
+for a sweep of concurrency levels. Results are written as JSON; pass
+--baseline to compare against an earlier run and fail on regressions.
+
+    python -m payment_service.benchmarks.loadtest --output bench.json
+    python -m payment_service.benchmarks.loadtest --baseline bench.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import jwt
+
+from payment_service import main
+from payment_service.config import settings
+from payment_service.delivery import StatusDeliveryQueue
+from payment_service.processor import SimulatedProcessor, FixedLatency
+from payment_service.django_client import create_django_client
+from payment_service.benchmarks.django_stub import build_django_stub
+
+SCENARIOS = ("health", "process", "batch")
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def make_token(user_id=1):
+    payload = {"user_id": user_id, "exp": datetime.utcnow() + timedelta(hours=1)}
+    return jwt.encode(payload, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def build_request(scenario, batch_size):
+    """(method, url, json body) for one request of the scenario"""
+    payment = {"card_id": 1, "amount": 42.50, "currency": "USD", "merchant_name": "Bench Shop"}
+    if scenario == "health":
+        return "GET", "/health", None
+    if scenario == "process":
+        return "POST", "/payments/process", payment
+    if scenario == "batch":
+        return "POST", "/payments/process/batch", {"payments": [payment] * batch_size}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+async def run_level(ac, scenario, concurrency, requests, batch_size, headers):
+    method, url, body = build_request(scenario, batch_size)
+    latencies = []
+    errors = 0
+    rejected = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors, rejected
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            response = await ac.request(method, url, json=body, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+            if response.status_code in (429, 503):
+                rejected += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "scenario": scenario,
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": errors,
+        "rejected": rejected,
+        "rps": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+    }
+
+
+async def run(scenarios, levels, requests, batch_size, django_latency, processor_latency_ms, seed):
+    app = main.app
+    stub = build_django_stub(latency=django_latency)
+    django = create_django_client(transport=httpx.ASGITransport(app=stub), guard=main.django_guard)
+    original_processor = main.processor
+    main.processor = SimulatedProcessor(latency=FixedLatency(processor_latency_ms / 1000), seed=seed)
+    app.state.django_client = django
+    app.state.status_delivery = StatusDeliveryQueue(django)
+    app.state.status_delivery.start()
+    headers = {"Authorization": f"Bearer {make_token()}"}
+    results = []
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://payments", timeout=60) as ac:
+            for scenario in scenarios:
+                # Warm-up so one-off costs (imports, first JWT decode) stay out of the numbers
+                await run_level(ac, scenario, 1, 10, batch_size, headers)
+                for concurrency in levels:
+                    result = await run_level(ac, scenario, concurrency, requests, batch_size, headers)
+                    results.append(result)
+                    print(
+                        f"{scenario:<8} c={concurrency:<4} {result['rps']:>10.1f} req/s  "
+                        f"p50={result['p50_ms']:.2f}ms p95={result['p95_ms']:.2f}ms "
+                        f"p99={result['p99_ms']:.2f}ms errors={result['errors']} rejected={result['rejected']}",
+                        file=sys.stderr,
+                    )
+    finally:
+        await app.state.status_delivery.stop(settings.STATUS_DELIVERY_DRAIN_TIMEOUT)
+        await django.aclose()
+        main.processor = original_processor
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return human-readable regressions of `results` against a baseline report"""
+    previous = {(r["scenario"], r["concurrency"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        before = previous.get((result["scenario"], result["concurrency"]))
+        if before is None:
+            continue
+        label = f"{result['scenario']} c={result['concurrency']}"
+        if result["rps"] < before["rps"] * (1 - tolerance):
+            regressions.append(f"{label}: rps {before['rps']} -> {result['rps']}")
+        if result["p99_ms"] > before["p99_ms"] * (1 + tolerance):
+            regressions.append(f"{label}: p99 {before['p99_ms']}ms -> {result['p99_ms']}ms")
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", default="1,8,32,128", help="comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+    parser.add_argument("--batch-size", type=int, default=20)
+    parser.add_argument("--django-latency", type=float, default=0.0, help="seconds per stubbed Django call")
+    parser.add_argument("--processor-latency-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report to this file (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report from a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args(argv)
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    levels = [int(level) for level in args.concurrency.split(",") if level]
+    results = asyncio.run(run(
+        scenarios, levels, args.requests, args.batch_size,
+        args.django_latency, args.processor_latency_ms, args.seed,
+    ))
+    report = {
+        "generated_at": datetime.utcnow().isoformat(),
+        "version": main.app.version,
+        "python": platform.python_version(),
+        "config": {
+            "requests": args.requests,
+            "batch_size": args.batch_size,
+            "django_latency": args.django_latency,
+            "processor_latency_ms": args.processor_latency_ms,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,4 +1,5 @@
 import os
+from typing import Optional
 from pydantic_settings import BaseSettings
 
 
@@ -8,8 +9,67 @@ class Settings(BaseSettings):
         "django-insecure-creditcard-payment-system-secret-key-change-in-production"
     )
     JWT_ALGORITHM: str = "HS256"
+    JWT_CACHE_SIZE: int = 10000  # verified tokens kept in memory; 0 disables the cache
     DJANGO_API_URL: str = os.environ.get("DJANGO_API_URL", "http://localhost:8000")
 
+    # Simulated payment processor
+    PROCESSOR_SEED: Optional[int] = None  # set for reproducible runs
+    PROCESSOR_FAILURE_BANDS: str = "5000:0.2,inf:0.4"  # "<amount upper bound>:<failure rate>,..."
+    PROCESSOR_LATENCY_PROFILE: str = "fixed"  # "fixed", "normal" or "longtail"
+    PROCESSOR_LATENCY_MS: float = 0.0  # fixed value, normal mean, or longtail median
+    PROCESSOR_LATENCY_JITTER_MS: float = 0.0  # normal standard deviation
+    PROCESSOR_LATENCY_TAIL_SIGMA: float = 1.0  # longtail log-normal sigma
+    PROCESSOR_LATENCY_MAX_MS: float = 30000.0  # longtail cap
+
+    # Batch payments
+    PAYMENT_BATCH_MAX_ITEMS: int = 100
+    PAYMENT_BATCH_CONCURRENCY: int = 16
+
+    # Streaming NDJSON ingest (/payments/process/stream)
+    PAYMENT_STREAM_WINDOW: int = 100  # lines decided and recorded together
+    PAYMENT_STREAM_WINDOWS_IN_FLIGHT: int = 2  # windows processed concurrently while reading ahead
+    PAYMENT_STREAM_MAX_LINE_BYTES: int = 64 * 1024
+
+    # Idempotency-Key handling for /payments/process
+    IDEMPOTENCY_BACKEND: str = "memory"  # "memory" (per worker) or "sqlite" (shared by workers on a host)
+    IDEMPOTENCY_SQLITE_PATH: str = "idempotency.sqlite3"
+    IDEMPOTENCY_TTL: float = 24 * 60 * 60
+    IDEMPOTENCY_MAX_KEYS: int = 100000
+    IDEMPOTENCY_LOCK_TIMEOUT: float = 30.0  # in-flight claims older than this can be taken over
+    IDEMPOTENCY_WAIT_TIMEOUT: float = 10.0  # how long a duplicate waits for the original request
+
+    # Write-behind delivery of status updates to Django
+    STATUS_DELIVERY_MODE: str = "background"  # "background" (write-behind queue) or "inline"
+    STATUS_DELIVERY_MAX_QUEUE: int = 10000  # put() blocks once this many updates are pending
+    STATUS_DELIVERY_BATCH_SIZE: int = 50
+    STATUS_DELIVERY_MAX_ATTEMPTS: int = 8
+    STATUS_DELIVERY_BACKOFF_BASE: float = 0.2  # seconds; doubled on every retry
+    STATUS_DELIVERY_BACKOFF_MAX: float = 30.0
+    STATUS_DELIVERY_DRAIN_TIMEOUT: float = 15.0  # seconds allowed to drain on shutdown
+    STATUS_DELIVERY_DEAD_LETTER_PATH: str = "status_dead_letters.sqlite3"  # updates given up on, for replay
+
+    # Outbound HTTP client used for payment_service -> Django calls
+    DJANGO_HTTP_MAX_CONNECTIONS: int = 100
+    DJANGO_HTTP_MAX_KEEPALIVE: int = 20
+    DJANGO_HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    DJANGO_HTTP_TIMEOUT: float = 10.0
+    DJANGO_HTTP_CONNECT_TIMEOUT: float = 3.0
+    DJANGO_HTTP_POOL_TIMEOUT: float = 5.0
+    DJANGO_HTTP2: bool = False
+
+    # Protection for payment_service -> Django calls
+    DJANGO_BULKHEAD_MAX_CONCURRENT: int = 10  # Django calls in flight at once
+    DJANGO_BULKHEAD_MAX_WAIT: float = 1.0  # seconds a call may wait for a slot before failing with 503
+    DJANGO_BREAKER_FAILURE_THRESHOLD: int = 5  # consecutive failures that open the circuit
+    DJANGO_BREAKER_RESET_TIMEOUT: float = 10.0  # seconds the circuit stays open before a half-open probe
+    DJANGO_BREAKER_HALF_OPEN_CALLS: int = 1
+
+    # Admission control for /payments/process (rejections carry Retry-After)
+    ADMISSION_MAX_IN_FLIGHT: int = 200  # 429 beyond this many payments in progress
+    ADMISSION_MAX_QUEUE: int = 50  # 429 once this many Django calls wait on the bulkhead
+    ADMISSION_MAX_LATENCY: float = 2.0  # 503 while average Django latency (seconds) is above this and calls queue
+    ADMISSION_RETRY_AFTER: int = 1  # seconds
+
     class Config:
         env_file = ".env"
 
@@ -0,0 +1,322 @@
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import httpx
+from fastapi import HTTPException, Request
+
+from .config import settings
+from .django_client import update_transaction_status, update_transaction_statuses_bulk
+
+logger = logging.getLogger(__name__)
+
+
+class InlineStatusDelivery:
+    """Deliver each status update to Django before the request returns"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+
+    def start(self):
+        pass
+
+    async def stop(self, timeout: float):
+        pass
+
+    async def put(self, token: str, reference_id: str, payment_status: str, failure_reason: str = "", user_id=None):
+        await update_transaction_status(self.client, token, reference_id, payment_status, failure_reason)
+
+    def stats(self) -> dict:
+        return {"mode": "inline"}
+
+
+class DeadLetterStore:
+    """
+    SQLite file of status updates the queue could not deliver, so they can be
+    inspected and replayed instead of leaving their transactions PENDING with
+    no trace. The user's token is not stored; a replay needs a fresh one.
+    """
+
+    def __init__(self, path: str, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS status_dead_letters ("
+                " id INTEGER PRIMARY KEY,"
+                " reference_id TEXT NOT NULL,"
+                " user_id TEXT,"
+                " status TEXT NOT NULL,"
+                " failure_reason TEXT NOT NULL,"
+                " attempts INTEGER NOT NULL,"
+                " reason TEXT NOT NULL,"
+                " created_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn, *args):
+        with self._lock:
+            return fn(self._connection(), *args)
+
+    async def add(self, entries: list, reason: str):
+        """Persist [(reference_id, entry)] with why they were given up on"""
+        rows = [
+            (reference_id, None if entry.get("user_id") is None else str(entry["user_id"]), entry["status"],
+             entry["failure_reason"], entry["attempts"], reason, self._clock())
+            for reference_id, entry in entries
+        ]
+
+        def add(conn):
+            conn.executemany(
+                "INSERT INTO status_dead_letters"
+                " (reference_id, user_id, status, failure_reason, attempts, reason, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        await asyncio.to_thread(self._run, add)
+
+    def entries(self) -> list:
+        """Every dead letter, oldest first, as dicts"""
+        def select(conn):
+            cursor = conn.execute(
+                "SELECT reference_id, user_id, status, failure_reason, attempts, reason, created_at"
+                " FROM status_dead_letters ORDER BY id"
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+        return self._run(select)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class StatusDeliveryQueue:
+    """
+    Write-behind queue for transaction status updates.
+
+    process_payment enqueues the decision and responds immediately; a
+    background worker delivers updates to Django in batches, one bulk
+    update-status call per token in the batch. Updates for the
+    same reference_id are coalesced (latest wins), failed deliveries are
+    retried with exponential backoff, and put() blocks while the queue is full
+    so callers slow down instead of growing memory without bound.
+
+    A 401/403 is retried too: the user's token may have expired while the
+    update waited, and a retry is sent with the newest token seen for that
+    user. Updates Django rejects otherwise, or that run out of attempts, go to
+    `dead_letters` (a DeadLetterStore) when one is given.
+    """
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        maxsize: int = 10000,
+        batch_size: int = 50,
+        max_attempts: int = 8,
+        backoff_base: float = 0.2,
+        backoff_max: float = 30.0,
+        dead_letters: DeadLetterStore = None,
+        clock=time.monotonic,
+    ):
+        self.client = client
+        self.dead_letters = dead_letters
+        self.maxsize = maxsize
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._clock = clock
+        self._pending = OrderedDict()
+        # user_id -> newest token, for retrying updates whose own token has expired
+        self._tokens = OrderedDict()
+        self._wakeup = asyncio.Event()
+        self._space = asyncio.Event()
+        self._worker = None
+        self._closing = False
+        self._in_flight = 0
+        self.delivered = 0
+        self.retried = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.last_lag = 0.0
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self, timeout: float):
+        """Stop accepting work and drain everything still queued"""
+        self._closing = True
+        self._wakeup.set()
+        if self._worker is not None:
+            try:
+                await asyncio.wait_for(self._worker, timeout)
+            except asyncio.TimeoutError:
+                logger.error("Status delivery drain timed out; %d updates not delivered", len(self._pending))
+            self._worker = None
+        if self.dead_letters is not None:
+            self.dead_letters.close()
+
+    async def put(self, token: str, reference_id: str, payment_status: str, failure_reason: str = "", user_id=None):
+        if user_id is not None:
+            self._tokens[user_id] = token
+            self._tokens.move_to_end(user_id)
+            if len(self._tokens) > self.maxsize:
+                self._tokens.popitem(last=False)
+        update = {"token": token, "user_id": user_id, "status": payment_status, "failure_reason": failure_reason}
+        entry = self._pending.get(reference_id)
+        if entry is not None:
+            entry.update(update, attempts=0, not_before=0.0)
+            self.coalesced += 1
+            return
+        while len(self._pending) >= self.maxsize:
+            self._space.clear()
+            await self._space.wait()
+        self._pending[reference_id] = {**update, "attempts": 0, "not_before": 0.0, "enqueued_at": self._clock()}
+        self._wakeup.set()
+
+    def stats(self) -> dict:
+        now = self._clock()
+        oldest = min((entry["enqueued_at"] for entry in self._pending.values()), default=now)
+        return {
+            "mode": "background",
+            "depth": len(self._pending) + self._in_flight,
+            "oldest_age_seconds": round(now - oldest, 6),
+            "last_delivery_lag_seconds": round(self.last_lag, 6),
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+        }
+
+    async def _run(self):
+        while True:
+            batch = self._take_ready()
+            if batch:
+                self._in_flight = len(batch)
+                by_token = {}
+                for reference_id, entry in batch:
+                    token = self._tokens.get(entry["user_id"], entry["token"])
+                    by_token.setdefault(token, []).append((reference_id, entry))
+                await asyncio.gather(*(self._deliver(token, group) for token, group in by_token.items()))
+                self._in_flight = 0
+                self._space.set()
+                continue
+            if self._closing and not self._pending:
+                return
+            await self._wait_for_work()
+
+    def _take_ready(self):
+        now = self._clock()
+        ready = [
+            reference_id for reference_id, entry in self._pending.items()
+            if entry["not_before"] <= now
+        ][:self.batch_size]
+        return [(reference_id, self._pending.pop(reference_id)) for reference_id in ready]
+
+    async def _wait_for_work(self):
+        self._wakeup.clear()
+        timeout = None
+        if self._pending:
+            earliest = min(entry["not_before"] for entry in self._pending.values())
+            timeout = max(earliest - self._clock(), 0)
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _deliver(self, token: str, group: list):
+        updates = [
+            {"reference_id": reference_id, "status": entry["status"], "failure_reason": entry["failure_reason"]}
+            for reference_id, entry in group
+        ]
+        try:
+            result = await update_transaction_statuses_bulk(self.client, token, updates)
+        except HTTPException as exc:
+            # 401/403: the token expired (or was revoked) while the update waited
+            if exc.status_code < 500 and exc.status_code not in (401, 403):
+                await self._dead_letter(group, f"HTTP {exc.status_code}: {exc.detail}")
+                return
+            for reference_id, entry in group:
+                await self._retry(reference_id, entry, f"HTTP {exc.status_code}: {exc.detail}")
+            return
+        except Exception as exc:
+            logger.exception("Unexpected error delivering %d status updates", len(group))
+            for reference_id, entry in group:
+                await self._retry(reference_id, entry, repr(exc))
+            return
+        rejected = set(result.get("not_found", []))
+        for error in result.get("errors", []):
+            rejected.add(group[error["index"]][0])
+        now = self._clock()
+        for reference_id, entry in group:
+            if reference_id in rejected:
+                continue
+            self.delivered += 1
+            self.last_lag = now - entry["enqueued_at"]
+        if rejected:
+            await self._dead_letter(
+                [(reference_id, entry) for reference_id, entry in group if reference_id in rejected],
+                "rejected by Django",
+            )
+
+    async def _dead_letter(self, entries: list, reason: str):
+        self.dropped += len(entries)
+        logger.error("Giving up on %d status updates: %s", len(entries), reason)
+        if self.dead_letters is None:
+            return
+        try:
+            await self.dead_letters.add(entries, reason)
+        except Exception:
+            logger.exception(
+                "Could not store dead letters for %s", ", ".join(reference_id for reference_id, _ in entries)
+            )
+
+    async def _retry(self, reference_id: str, entry: dict, reason: str):
+        if reference_id in self._pending:
+            # A newer update for this reference arrived meanwhile; it supersedes this one
+            return
+        entry["attempts"] += 1
+        if entry["attempts"] >= self.max_attempts:
+            await self._dead_letter([(reference_id, entry)], f"{reason} after {entry['attempts']} attempts")
+            return
+        self.retried += 1
+        delay = min(self.backoff_base * 2 ** (entry["attempts"] - 1), self.backoff_max)
+        entry["not_before"] = self._clock() + delay
+        self._pending[reference_id] = entry
+        self._wakeup.set()
+
+
+def create_status_delivery(client: httpx.AsyncClient):
+    """Build the delivery strategy selected by STATUS_DELIVERY_MODE"""
+    if settings.STATUS_DELIVERY_MODE == "inline":
+        return InlineStatusDelivery(client)
+    if settings.STATUS_DELIVERY_MODE == "background":
+        return StatusDeliveryQueue(
+            client,
+            maxsize=settings.STATUS_DELIVERY_MAX_QUEUE,
+            batch_size=settings.STATUS_DELIVERY_BATCH_SIZE,
+            max_attempts=settings.STATUS_DELIVERY_MAX_ATTEMPTS,
+            backoff_base=settings.STATUS_DELIVERY_BACKOFF_BASE,
+            backoff_max=settings.STATUS_DELIVERY_BACKOFF_MAX,
+            dead_letters=DeadLetterStore(settings.STATUS_DELIVERY_DEAD_LETTER_PATH),
+        )
+    raise ValueError(f"Unknown STATUS_DELIVERY_MODE: {settings.STATUS_DELIVERY_MODE}")
+
+
+def get_status_delivery(request: Request):
+    """Dependency returning the delivery strategy created in the app lifespan"""
+    return request.app.state.status_delivery
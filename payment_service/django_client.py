@@ -0,0 +1,101 @@
+import math
+import httpx
+from fastapi import HTTPException, Request, status
+from .config import settings
+from .resilience import DjangoGuard, GuardedTransport, Rejected
+
+
+def create_django_client(transport: httpx.AsyncBaseTransport = None, guard: DjangoGuard = None) -> httpx.AsyncClient:
+    """
+    Build the application-scoped client for Django calls.
+    Connections are kept alive and pooled so payments reuse them
+    instead of opening a new TCP connection per request. With a `guard`,
+    every call also goes through its bulkhead and circuit breaker.
+    """
+    limits = httpx.Limits(
+        max_connections=settings.DJANGO_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.DJANGO_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.DJANGO_HTTP_KEEPALIVE_EXPIRY,
+    )
+    timeout = httpx.Timeout(
+        settings.DJANGO_HTTP_TIMEOUT,
+        connect=settings.DJANGO_HTTP_CONNECT_TIMEOUT,
+        pool=settings.DJANGO_HTTP_POOL_TIMEOUT,
+    )
+    if guard is not None:
+        transport = GuardedTransport(
+            transport or httpx.AsyncHTTPTransport(limits=limits, http2=settings.DJANGO_HTTP2),
+            guard,
+        )
+    return httpx.AsyncClient(
+        base_url=settings.DJANGO_API_URL,
+        limits=limits,
+        timeout=timeout,
+        http2=settings.DJANGO_HTTP2,
+        transport=transport,
+    )
+
+
+def get_django_client(request: Request) -> httpx.AsyncClient:
+    """Dependency returning the client created in the app lifespan"""
+    return request.app.state.django_client
+
+
+async def _send(client: httpx.AsyncClient, method: str, url: str, token: str, payload: dict) -> dict:
+    headers = {"Authorization": f"Bearer {token}"}
+    try:
+        response = await client.request(method, url, json=payload, headers=headers)
+    except Rejected as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(exc),
+            headers={"Retry-After": str(max(math.ceil(exc.retry_after), 1))},
+        )
+    except httpx.HTTPError:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Django API unavailable")
+
+    if response.status_code >= 500:
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Django API error")
+    if response.status_code >= 400:
+        try:
+            detail = response.json().get("error", response.reason_phrase)
+        except ValueError:
+            detail = response.reason_phrase
+        raise HTTPException(status_code=response.status_code, detail=detail)
+    return response.json()
+
+
+async def create_pending_transaction(client: httpx.AsyncClient, token: str, txn_payload: dict) -> dict:
+    """Create a PENDING transaction in Django and return it"""
+    return await _send(client, "POST", "/api/transactions/create/", token, txn_payload)
+
+
+async def update_transaction_status(
+    client: httpx.AsyncClient,
+    token: str,
+    reference_id: str,
+    payment_status: str,
+    failure_reason: str = "",
+) -> dict:
+    """Move a transaction to SUCCESS or FAILED in Django"""
+    return await _send(
+        client,
+        "PATCH",
+        f"/api/transactions/update-status/{reference_id}/",
+        token,
+        {"status": payment_status, "failure_reason": failure_reason},
+    )
+
+
+async def update_transaction_statuses_bulk(client: httpx.AsyncClient, token: str, updates: list) -> dict:
+    """
+    Apply many {reference_id, status, failure_reason} updates in one call.
+    Returns Django's {"updated", "not_found", "errors"} summary.
+    """
+    return await _send(client, "POST", "/api/transactions/update-status/bulk/", token, {"updates": updates})
+
+
+async def create_transactions_bulk(client: httpx.AsyncClient, token: str, txn_payloads: list) -> list:
+    """Record a whole batch of transactions in one call; returns per-item results in input order"""
+    data = await _send(client, "POST", "/api/transactions/create/bulk/", token, {"transactions": txn_payloads})
+    return sorted(data["results"], key=lambda result: result["index"])
@@ -0,0 +1,247 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .config import settings
+
+# Outcomes of IdempotencyStore.begin()
+NEW = "new"            # caller owns the key and must process the request
+COMPLETED = "completed"  # a stored response is available for replay
+IN_FLIGHT = "in_flight"  # another request with the same key is still processing
+MISMATCH = "mismatch"    # key was used before with a different request body
+
+
+class IdempotencyStore:
+    """
+    Base class for Idempotency-Key stores.
+    A key moves from in-flight (claimed by one request) to completed (response
+    stored for replay until its TTL). Requests that arrive while a key is in
+    flight wait on a local future and are woken up when the owner finishes.
+    """
+
+    def __init__(self, ttl: float, lock_timeout: float, clock=time.time):
+        self.ttl = ttl
+        self.lock_timeout = lock_timeout
+        self._clock = clock
+        self._waiters = {}
+
+    async def begin(self, key: str, fingerprint: str):
+        """Claim `key`; returns (outcome, stored_response)"""
+        raise NotImplementedError
+
+    async def complete(self, key: str, fingerprint: str, response: dict):
+        """Store the response for `key` and wake up waiting requests"""
+        await self._complete(key, fingerprint, response)
+        self._notify(key)
+
+    async def release(self, key: str):
+        """Drop an in-flight claim after a failure so the request can be retried"""
+        await self._release(key)
+        self._notify(key)
+
+    async def wait(self, key: str, timeout: float) -> bool:
+        """Wait until the in-flight request for `key` finishes; False on timeout"""
+        future = self._waiters.get(key)
+        if future is None or future.get_loop() is not asyncio.get_running_loop():
+            future = asyncio.get_running_loop().create_future()
+            self._waiters[key] = future
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def close(self):
+        pass
+
+    def _notify(self, key: str):
+        future = self._waiters.pop(key, None)
+        if future is not None and not future.done():
+            future.get_loop().call_soon_threadsafe(_resolve, future)
+
+    async def _complete(self, key: str, fingerprint: str, response: dict):
+        raise NotImplementedError
+
+    async def _release(self, key: str):
+        raise NotImplementedError
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class InMemoryIdempotencyStore(IdempotencyStore):
+    """Per-process store with TTL expiry and size-bounded (oldest first) eviction"""
+
+    def __init__(self, ttl: float, lock_timeout: float, max_keys: int, clock=time.time):
+        super().__init__(ttl, lock_timeout, clock)
+        self.max_keys = max_keys
+        self._entries = OrderedDict()
+
+    async def begin(self, key, fingerprint):
+        now = self._clock()
+        self._evict(now)
+        entry = self._entries.get(key)
+        if entry is not None and entry["expires_at"] <= now:
+            del self._entries[key]
+            entry = None
+        if entry is None:
+            self._entries[key] = {
+                "fingerprint": fingerprint,
+                "response": None,
+                "expires_at": now + self.lock_timeout,
+            }
+            return NEW, None
+        if entry["fingerprint"] != fingerprint:
+            return MISMATCH, None
+        if entry["response"] is None:
+            return IN_FLIGHT, None
+        return COMPLETED, entry["response"]
+
+    async def _complete(self, key, fingerprint, response):
+        self._entries.pop(key, None)
+        self._entries[key] = {
+            "fingerprint": fingerprint,
+            "response": response,
+            "expires_at": self._clock() + self.ttl,
+        }
+        self._evict(self._clock())
+
+    async def _release(self, key):
+        self._entries.pop(key, None)
+
+    def _evict(self, now):
+        while self._entries:
+            key, entry = next(iter(self._entries.items()))
+            if len(self._entries) <= self.max_keys and entry["expires_at"] > now:
+                break
+            del self._entries[key]
+
+
+class SQLiteIdempotencyStore(IdempotencyStore):
+    """
+    Store kept in a SQLite file so every uvicorn worker on the host shares it.
+    Waiters in other workers cannot be notified directly, so they also poll
+    the row every `poll_interval` seconds.
+    """
+
+    def __init__(self, path: str, ttl: float, lock_timeout: float, poll_interval: float = 0.02, clock=time.time):
+        super().__init__(ttl, lock_timeout, clock)
+        self.path = path
+        self.poll_interval = poll_interval
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connection(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS idempotency_keys ("
+                " key TEXT PRIMARY KEY,"
+                " fingerprint TEXT NOT NULL,"
+                " response TEXT,"
+                " expires_at REAL NOT NULL)"
+            )
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn, *args):
+        with self._lock:
+            return fn(self._connection(), *args)
+
+    def _begin(self, conn, key, fingerprint):
+        now = self._clock()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND expires_at <= ?", (key, now))
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO idempotency_keys (key, fingerprint, response, expires_at)"
+                " VALUES (?, ?, NULL, ?)",
+                (key, fingerprint, now + self.lock_timeout),
+            ).rowcount
+            row = None
+            if not inserted:
+                row = conn.execute(
+                    "SELECT fingerprint, response FROM idempotency_keys WHERE key = ?", (key,)
+                ).fetchone()
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if inserted:
+            return NEW, None
+        if row[0] != fingerprint:
+            return MISMATCH, None
+        if row[1] is None:
+            return IN_FLIGHT, None
+        return COMPLETED, json.loads(row[1])
+
+    async def begin(self, key, fingerprint):
+        return await asyncio.to_thread(self._run, self._begin, key, fingerprint)
+
+    async def _complete(self, key, fingerprint, response):
+        def complete(conn):
+            conn.execute(
+                "INSERT OR REPLACE INTO idempotency_keys (key, fingerprint, response, expires_at)"
+                " VALUES (?, ?, ?, ?)",
+                (key, fingerprint, json.dumps(response), self._clock() + self.ttl),
+            )
+        await asyncio.to_thread(self._run, complete)
+
+    async def _release(self, key):
+        def release(conn):
+            conn.execute("DELETE FROM idempotency_keys WHERE key = ? AND response IS NULL", (key,))
+        await asyncio.to_thread(self._run, release)
+
+    async def wait(self, key, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if await super().wait(key, min(self.poll_interval, remaining)):
+                return True
+            if not await asyncio.to_thread(self._run, self._in_flight, key):
+                return True
+
+    def _in_flight(self, conn, key):
+        row = conn.execute(
+            "SELECT 1 FROM idempotency_keys WHERE key = ? AND response IS NULL AND expires_at > ?",
+            (key, self._clock()),
+        ).fetchone()
+        return row is not None
+
+    def purge_expired(self):
+        """Delete expired rows; returns the number removed"""
+        def purge(conn):
+            return conn.execute("DELETE FROM idempotency_keys WHERE expires_at <= ?", (self._clock(),)).rowcount
+        return self._run(purge)
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_idempotency_store() -> IdempotencyStore:
+    """Build the store selected by IDEMPOTENCY_BACKEND ("memory" or "sqlite")"""
+    if settings.IDEMPOTENCY_BACKEND == "sqlite":
+        return SQLiteIdempotencyStore(
+            settings.IDEMPOTENCY_SQLITE_PATH,
+            ttl=settings.IDEMPOTENCY_TTL,
+            lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+        )
+    if settings.IDEMPOTENCY_BACKEND == "memory":
+        return InMemoryIdempotencyStore(
+            ttl=settings.IDEMPOTENCY_TTL,
+            lock_timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT,
+            max_keys=settings.IDEMPOTENCY_MAX_KEYS,
+        )
+    raise ValueError(f"Unknown IDEMPOTENCY_BACKEND: {settings.IDEMPOTENCY_BACKEND}")
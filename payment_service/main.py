@@ -1,13 +1,55 @@
-import random
-import uuid
+import asyncio
+import hashlib
+import json
+import time
 import httpx
+from collections import deque
+from contextlib import asynccontextmanager
 from datetime import datetime
-from fastapi import FastAPI, Depends, HTTPException, status
+from typing import Optional
+from fastapi import FastAPI, Depends, Header, HTTPException, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
-from .schemas import PaymentRequest, PaymentResponse, PaymentStatusUpdate
+from .schemas import (
+    PaymentRequest,
+    PaymentResponse,
+    PaymentStatusUpdate,
+    BatchPaymentRequest,
+    BatchPaymentItem,
+    BatchPaymentResponse,
+    validate_payment,
+)
 from .config import settings
+from .token_cache import TokenCache
+from .processor import create_processor
+from .streaming import iter_lines, iter_windows, BodyStreamingResponse, LineTooLong
+from .idempotency import create_idempotency_store, NEW, COMPLETED, MISMATCH
+from .django_client import (
+    create_django_client,
+    get_django_client,
+    create_pending_transaction,
+    create_transactions_bulk,
+)
+from .delivery import create_status_delivery, get_status_delivery
+from .resilience import create_django_guard, create_admission_controller, OPEN, HALF_OPEN
+from . import metrics
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Own the pooled Django HTTP client and the status delivery worker for the lifetime of the app"""
+    app.state.django_client = create_django_client(guard=django_guard)
+    app.state.status_delivery = create_status_delivery(app.state.django_client)
+    app.state.status_delivery.start()
+    try:
+        yield
+    finally:
+        await app.state.status_delivery.stop(settings.STATUS_DELIVERY_DRAIN_TIMEOUT)
+        await app.state.django_client.aclose()
+        idempotency_store.close()
+
 
 app = FastAPI(
     title="Payment Processing Service",
@@ -15,6 +57,7 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -25,79 +68,225 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+app.add_middleware(metrics.MetricsMiddleware)
+
 security = HTTPBearer()
+token_cache = TokenCache(maxsize=settings.JWT_CACHE_SIZE)
+idempotency_store = create_idempotency_store()
+processor = create_processor()
+django_guard = create_django_guard()
+admission = create_admission_controller(django_guard)
+
+
+def _delivery_stat(name: str):
+    delivery = getattr(app.state, "status_delivery", None)
+    return delivery.stats().get(name) if delivery else None
+
+
+metrics.registry.register_callback(
+    "status_delivery_queue_depth", "Status updates waiting for delivery to Django",
+    lambda: _delivery_stat("depth"),
+)
+metrics.registry.register_callback(
+    "status_delivery_oldest_age_seconds", "Age of the oldest undelivered status update",
+    lambda: _delivery_stat("oldest_age_seconds"),
+)
+metrics.registry.register_callback(
+    "django_circuit_state", "Django circuit breaker state (0 closed, 1 half-open, 2 open)",
+    lambda: {OPEN: 2, HALF_OPEN: 1}.get(django_guard.breaker.state, 0),
+)
+metrics.registry.register_callback(
+    "django_bulkhead_waiting", "Django calls waiting for a bulkhead slot", lambda: django_guard.bulkhead.waiting,
+)
+metrics.registry.register_callback(
+    "jwt_cache_hits_total", "Verified-token cache hits", lambda: token_cache.hits, type="counter",
+)
+metrics.registry.register_callback(
+    "jwt_cache_misses_total", "Verified-token cache misses", lambda: token_cache.misses, type="counter",
+)
 
 
 def verify_jwt_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Verify JWT token issued by Django backend"""
+    """Verify JWT token issued by Django backend (cached until the token's exp)"""
+    start = time.perf_counter()
     token = credentials.credentials
-    try:
-        payload = jwt.decode(
-            token,
-            settings.JWT_SECRET_KEY,
-            algorithms=[settings.JWT_ALGORITHM]
-        )
-        return payload
-    except jwt.ExpiredSignatureError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
-    except jwt.InvalidTokenError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    payload = token_cache.get(token)
+    result = "hit"
+    if payload is None:
+        result = "miss"
+        try:
+            payload = jwt.decode(
+                token,
+                settings.JWT_SECRET_KEY,
+                algorithms=[settings.JWT_ALGORITHM]
+            )
+        except jwt.ExpiredSignatureError:
+            metrics.JWT_VERIFY_DURATION.observe(time.perf_counter() - start, "expired")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
+        except jwt.InvalidTokenError:
+            metrics.JWT_VERIFY_DURATION.observe(time.perf_counter() - start, "invalid")
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        token_cache.set(token, payload)
+    payload["_raw_token"] = token
+    metrics.JWT_VERIFY_DURATION.observe(time.perf_counter() - start, result)
+    return payload
+
+
+def _txn_payload(payment: PaymentRequest) -> dict:
+    """Django transaction payload for a payment request"""
+    return {
+        "card_id": payment.card_id,
+        "amount": str(payment.amount),
+        "currency": payment.currency,
+        "merchant_name": payment.merchant_name,
+        "description": payment.description or "",
+    }
 
 
-def simulate_payment(amount: float) -> tuple[str, str]:
+async def _process_many(payments, indices, token_payload: dict, django: httpx.AsyncClient):
     """
-    Simulate payment processing.
-    80% success rate. Large amounts have higher failure rate.
+    Decide a group of payments in one processor call and record them in Django
+    with one bulk call. Returns a BatchPaymentItem per payment, in input order.
     """
-    failure_rate = 0.2
-    if amount > 5000:
-        failure_rate = 0.4
-
-    if random.random() < failure_rate:
-        reasons = [
-            "Insufficient funds",
-            "Card declined by issuer",
-            "Transaction limit exceeded",
-            "Suspicious activity detected",
-        ]
-        return "FAILED", random.choice(reasons)
-    return "SUCCESS", ""
+    user_id = token_payload.get("user_id")
+    token = token_payload.get("_raw_token", "")
+    start = time.perf_counter()
+    decisions = await processor.decide_batch(
+        [float(payment.amount) for payment in payments],
+        concurrency=settings.PAYMENT_BATCH_CONCURRENCY,
+    )
+    metrics.PAYMENT_DECISION_DURATION.observe(time.perf_counter() - start, "batch")
+    for payment_status, failure_reason in decisions:
+        metrics.PAYMENTS_TOTAL.inc(payment_status, failure_reason)
+    processed_at = datetime.utcnow().isoformat()
+
+    txn_payloads = [
+        {**_txn_payload(payment), "status": payment_status, "failure_reason": failure_reason}
+        for payment, (payment_status, failure_reason) in zip(payments, decisions)
+    ]
+    recorded = await create_transactions_bulk(django, token, txn_payloads)
+
+    results = []
+    for index, payment, decision, result in zip(indices, payments, decisions, recorded):
+        if "transaction" not in result:
+            error = result.get("error") or str(result.get("errors", "Transaction could not be recorded"))
+            results.append(BatchPaymentItem(index=index, ok=False, error=error))
+            continue
+        payment_status, failure_reason = decision
+        results.append(BatchPaymentItem(
+            index=index,
+            ok=True,
+            payment=PaymentResponse(
+                reference_id=result["transaction"]["reference_id"],
+                status=payment_status,
+                amount=payment.amount,
+                currency=payment.currency,
+                merchant_name=payment.merchant_name,
+                failure_reason=failure_reason,
+                processed_at=processed_at,
+                card_id=payment.card_id,
+                user_id=str(user_id),
+            ),
+        ))
+    return results
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
-    return {"status": "healthy", "service": "payment-processing", "version": "1.0.0"}
+async def health_check(request: Request):
+    delivery = getattr(request.app.state, "status_delivery", None)
+    return {
+        "status": "healthy",
+        "service": "payment-processing",
+        "version": "1.0.0",
+        "jwt_cache": token_cache.stats(),
+        "status_delivery": delivery.stats() if delivery else None,
+        "django": django_guard.stats(),
+    }
+
+
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics_endpoint():
+    """Prometheus text exposition format"""
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
 
 
 @app.post("/payments/process", response_model=PaymentResponse, tags=["Payments"])
 async def process_payment(
     payment: PaymentRequest,
-    token_payload: dict = Depends(verify_jwt_token)
+    response: Response,
+    token_payload: dict = Depends(verify_jwt_token),
+    django: httpx.AsyncClient = Depends(get_django_client),
+    delivery=Depends(get_status_delivery),
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
 ):
     """
     Process a payment.
     - Creates a PENDING transaction in Django
     - Simulates payment processing
-    - Updates Django with SUCCESS or FAILED result
+    - Queues the SUCCESS or FAILED result for delivery to Django, so the
+      response does not wait on Django
+
+    A retry carrying the same Idempotency-Key gets the stored response back
+    instead of being charged again; if the original request is still in
+    flight, the retry waits for its result.
+
+    Under overload the request fails fast with 429 or 503 and a Retry-After
+    header instead of queueing behind a slow Django.
     """
+    with admission.admit():
+        return await _process_idempotent(payment, response, token_payload, django, delivery, idempotency_key)
+
+
+async def _process_idempotent(payment, response, token_payload, django, delivery, idempotency_key):
+    """Process the payment once per Idempotency-Key (or unconditionally without one)"""
+    if idempotency_key is None:
+        return await _process_payment(payment, token_payload, django, delivery)
+
+    key = f"{token_payload.get('user_id')}:{idempotency_key}"
+    fingerprint = hashlib.sha256(payment.model_dump_json().encode()).hexdigest()
+    while True:
+        outcome, stored = await idempotency_store.begin(key, fingerprint)
+        if outcome == NEW:
+            break
+        if outcome == COMPLETED:
+            response.headers["Idempotent-Replayed"] = "true"
+            return PaymentResponse(**stored)
+        if outcome == MISMATCH:
+            raise HTTPException(
+                status_code=422,
+                detail="Idempotency-Key was already used with a different request",
+            )
+        if not await idempotency_store.wait(key, settings.IDEMPOTENCY_WAIT_TIMEOUT):
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is still being processed",
+            )
+
+    try:
+        result = await _process_payment(payment, token_payload, django, delivery)
+    except BaseException:
+        await idempotency_store.release(key)
+        raise
+    await idempotency_store.complete(key, fingerprint, result.model_dump(mode="json"))
+    return result
+
+
+async def _process_payment(payment: PaymentRequest, token_payload: dict, django: httpx.AsyncClient, delivery) -> PaymentResponse:
     user_id = token_payload.get("user_id")
-    reference_id = str(uuid.uuid4()).replace('-', '')[:20].upper()
+    token = token_payload.get("_raw_token", "")
 
     # Step 1: Create PENDING transaction in Django
-    django_url = f"{settings.DJANGO_API_URL}/api/transactions/create/"
-    headers = {"Authorization": f"Bearer {token_payload.get('_raw_token', '')}"}
-
-    # Build transaction payload
-    txn_payload = {
-        "card_id": payment.card_id,
-        "amount": str(payment.amount),
-        "currency": payment.currency,
-        "merchant_name": payment.merchant_name,
-        "description": payment.description or "",
-    }
+    pending = await create_pending_transaction(django, token, _txn_payload(payment))
+    reference_id = pending["reference_id"]
 
     # Step 2: Simulate payment processing
-    payment_status, failure_reason = simulate_payment(float(payment.amount))
+    start = time.perf_counter()
+    payment_status, failure_reason = await processor.decide(float(payment.amount))
+    metrics.PAYMENT_DECISION_DURATION.observe(time.perf_counter() - start, "single")
+    metrics.PAYMENTS_TOTAL.inc(payment_status, failure_reason)
+
+    # Step 3: Hand the SUCCESS or FAILED result to the write-behind delivery queue
+    await delivery.put(token, reference_id, payment_status, failure_reason, user_id=user_id)
 
     return PaymentResponse(
         reference_id=reference_id,
@@ -112,6 +301,104 @@ async def process_payment(
     )
 
 
+@app.post("/payments/process/batch", response_model=BatchPaymentResponse, tags=["Payments"])
+async def process_payment_batch(
+    batch: BatchPaymentRequest,
+    token_payload: dict = Depends(verify_jwt_token),
+    django: httpx.AsyncClient = Depends(get_django_client),
+):
+    """
+    Process a batch of payments.
+    - Decides every payment in one processor call (issuer latency is awaited
+      concurrently, bounded by PAYMENT_BATCH_CONCURRENCY)
+    - Records the whole batch in Django with a single bulk call
+    - Returns one result per payment, in input order; an item that fails validation
+      or cannot be recorded gets an error result and does not fail the batch
+    """
+    if len(batch.payments) > settings.PAYMENT_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.PAYMENT_BATCH_MAX_ITEMS} payments per batch",
+        )
+    items = [(index, validate_payment(item)) for index, item in enumerate(batch.payments)]
+    results = await _process_items(items, token_payload, django)
+
+    return BatchPaymentResponse(
+        total=len(results),
+        succeeded=sum(1 for item in results if item.ok and item.payment.status == "SUCCESS"),
+        failed=sum(1 for item in results if item.ok and item.payment.status == "FAILED"),
+        errors=sum(1 for item in results if not item.ok),
+        results=results,
+    )
+
+
+@app.post("/payments/process/stream", tags=["Payments"])
+async def process_payment_stream(
+    request: Request,
+    token_payload: dict = Depends(verify_jwt_token),
+    django: httpx.AsyncClient = Depends(get_django_client),
+):
+    """
+    Bulk-ingest payments sent as NDJSON, one PaymentRequest per line.
+    - Lines are read from the request body incrementally and validated one by one
+    - Every PAYMENT_STREAM_WINDOW lines are decided and recorded in Django together,
+      with up to PAYMENT_STREAM_WINDOWS_IN_FLIGHT windows in progress at once
+    - Results stream back as NDJSON in input order, so memory stays flat
+      regardless of how many payments are sent
+    """
+    return BodyStreamingResponse(
+        _stream_results(request, token_payload, django),
+        media_type="application/x-ndjson",
+    )
+
+
+async def _stream_results(request: Request, token_payload: dict, django: httpx.AsyncClient):
+    pending = deque()
+    lines = iter_lines(request.stream(), settings.PAYMENT_STREAM_MAX_LINE_BYTES)
+    error = None
+    try:
+        try:
+            async for window in iter_windows(lines, settings.PAYMENT_STREAM_WINDOW):
+                pending.append(asyncio.ensure_future(_process_window(window, token_payload, django)))
+                while len(pending) >= settings.PAYMENT_STREAM_WINDOWS_IN_FLIGHT:
+                    yield await pending.popleft()
+        except LineTooLong as exc:
+            error = exc
+        while pending:
+            yield await pending.popleft()
+        if error is not None:
+            yield (json.dumps({"ok": False, "error": str(error)}) + "\n").encode()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _process_items(items, token_payload: dict, django: httpx.AsyncClient):
+    """
+    BatchPaymentItem per (index, PaymentRequest or validation error), in order.
+    Only the valid payments are processed; the others get their error.
+    """
+    valid = [(index, item) for index, item in items if not isinstance(item, str)]
+    results = {}
+    if valid:
+        indices = [index for index, _ in valid]
+        for result in await _process_many([item for _, item in valid], indices, token_payload, django):
+            results[result.index] = result
+    return [results.get(index) or BatchPaymentItem(index=index, ok=False, error=item) for index, item in items]
+
+
+async def _process_window(window, token_payload: dict, django: httpx.AsyncClient) -> bytes:
+    """Process one window of (index, PaymentRequest or validation error) as NDJSON lines"""
+    try:
+        results = await _process_items(window, token_payload, django)
+    except HTTPException as exc:
+        results = [
+            BatchPaymentItem(index=index, ok=False, error=item if isinstance(item, str) else str(exc.detail))
+            for index, item in window
+        ]
+    return ("\n".join(result.model_dump_json() for result in results) + "\n").encode()
+
+
 @app.get("/payments/history", tags=["Payments"])
 async def payment_history(token_payload: dict = Depends(verify_jwt_token)):
     """Proxy to Django transaction history"""
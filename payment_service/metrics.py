@@ -0,0 +1,236 @@
+"""
+Prometheus text-format metrics for the payment service.
+
+The hot path never takes a lock: every thread that records a value gets its
+own shard (a plain dict), so event-loop code and the threadpool that runs sync
+dependencies such as verify_jwt_token never contend. Shards are only summed
+when /metrics is scraped.
+"""
+import bisect
+import math
+import threading
+import time
+
+from starlette.routing import Match
+
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []
+        self._shards_lock = threading.Lock()
+
+    def _shard(self) -> dict:
+        try:
+            return self._local.shard
+        except AttributeError:
+            # First value recorded by this thread; the lock is taken once per thread
+            shard = self._local.shard = {}
+            with self._shards_lock:
+                self._shards.append(shard)
+            return shard
+
+    def _snapshots(self):
+        with self._shards_lock:
+            shards = list(self._shards)
+        return [shard.copy() for shard in shards]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return lines
+
+    def reset(self):
+        with self._shards_lock:
+            for shard in self._shards:
+                shard.clear()
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labelvalues, amount=1):
+        shard = self._shard()
+        shard[labelvalues] = shard.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues):
+        return sum(shard.get(labelvalues, 0) for shard in self._snapshots())
+
+    def _totals(self):
+        totals = {}
+        for shard in self._snapshots():
+            for key, value in shard.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def _samples(self):
+        for key, value in sorted(self._totals().items()):
+            yield f"{self.name}{_labels(self.labelnames, key)} {_number(value)}"
+
+
+class Gauge(Counter):
+    """Up/down gauge; each thread keeps its own delta and the shards are summed"""
+    type = "gauge"
+
+    def dec(self, *labelvalues, amount=1):
+        self.inc(*labelvalues, amount=-amount)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, *labelvalues):
+        shard = self._shard()
+        state = shard.get(labelvalues)
+        if state is None:
+            # Per-bucket counts (+Inf last), then sum
+            state = shard[labelvalues] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def count(self, *labelvalues):
+        return sum(sum(shard[labelvalues][:-1]) for shard in self._snapshots() if labelvalues in shard)
+
+    def _samples(self):
+        totals = {}
+        for shard in self._snapshots():
+            for key, state in shard.items():
+                merged = totals.setdefault(key, [0] * len(state))
+                for i, value in enumerate(state):
+                    merged[i] += value
+        for key, state in sorted(totals.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), state[:-1]):
+                cumulative += count
+                le = 'le="' + _number(bound) + '"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, key, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, key)} {_number(state[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, key)} {cumulative}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._callbacks = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def register_callback(self, name: str, documentation: str, fn, type="gauge"):
+        """Metric whose value is read from `fn()` at scrape time (skipped when it returns None)"""
+        self._callbacks.append((name, documentation, fn, type))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        for name, documentation, fn, type in self._callbacks:
+            value = fn()
+            if value is None:
+                continue
+            lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {type}", f"{name} {_number(value)}"]
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        for metric in self._metrics:
+            metric.reset()
+
+
+registry = Registry()
+
+REQUEST_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ("method", "route", "status"),
+))
+REQUESTS_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ("route",),
+))
+JWT_VERIFY_DURATION = registry.register(Histogram(
+    "jwt_verify_duration_seconds", "Time spent in verify_jwt_token", ("result",),
+    buckets=(0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.005),
+))
+PAYMENT_DECISION_DURATION = registry.register(Histogram(
+    "payment_decision_duration_seconds", "Time spent in the payment processor decision", ("mode",),
+))
+PAYMENTS_TOTAL = registry.register(Counter(
+    "payments_total", "Payment decisions by status and failure reason", ("status", "failure_reason"),
+))
+ADMISSION_REJECTED_TOTAL = registry.register(Counter(
+    "payment_admission_rejected_total", "Payments rejected by admission control", ("reason",),
+))
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency per route/status and in-flight requests"""
+
+    def __init__(self, app):
+        self.app = app
+        self._static_routes = None
+
+    def _route(self, scope) -> str:
+        routes = scope["app"].routes
+        if self._static_routes is None:
+            self._static_routes = {
+                route.path for route in routes
+                if hasattr(route, "path") and "{" not in route.path
+            }
+        path = scope["path"]
+        if path in self._static_routes:
+            return path
+        for route in routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL:
+                return getattr(route, "path", "unmatched")
+        return "unmatched"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route = self._route(scope)
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc(route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            REQUEST_DURATION.observe(time.perf_counter() - start, scope["method"], route, str(status_code))
+            REQUESTS_IN_FLIGHT.dec(route)
@@ -0,0 +1,173 @@
+import asyncio
+import bisect
+import math
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .config import settings
+
+FAILURE_REASONS = [
+    "Insufficient funds",
+    "Card declined by issuer",
+    "Transaction limit exceeded",
+    "Suspicious activity detected",
+]
+
+# (amount upper bound, failure rate); amounts up to 5000 fail 20% of the time, larger ones 40%
+DEFAULT_FAILURE_BANDS = [(5000.0, 0.2), (math.inf, 0.4)]
+
+
+class LatencyProfile:
+    """Issuer latency distribution; samples are in seconds"""
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        raise NotImplementedError
+
+
+class FixedLatency(LatencyProfile):
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+
+    def sample(self, rng, size):
+        return np.full(size, self.seconds)
+
+
+class NormalLatency(LatencyProfile):
+    def __init__(self, mean: float, stddev: float):
+        self.mean = mean
+        self.stddev = stddev
+
+    def sample(self, rng, size):
+        return np.clip(rng.normal(self.mean, self.stddev, size), 0.0, None)
+
+
+class LongTailLatency(LatencyProfile):
+    """Log-normal latency: most calls near `median`, a heavy tail controlled by `sigma`"""
+
+    def __init__(self, median: float, sigma: float, cap: float):
+        self.median = median
+        self.sigma = sigma
+        self.cap = cap
+
+    def sample(self, rng, size):
+        if self.median <= 0:
+            return np.zeros(size)
+        return np.minimum(rng.lognormal(math.log(self.median), self.sigma, size), self.cap)
+
+
+class PaymentProcessor:
+    """
+    Interface for payment decision engines.
+    decide() returns (status, failure_reason) for a single payment;
+    decide_batch() does the same for many payments in one call.
+    """
+
+    async def decide(self, amount: float) -> Tuple[str, str]:
+        raise NotImplementedError
+
+    async def decide_batch(self, amounts: Sequence[float], concurrency: int) -> List[Tuple[str, str]]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def bounded(amount):
+            async with semaphore:
+                return await self.decide(amount)
+
+        return list(await asyncio.gather(*(bounded(amount) for amount in amounts)))
+
+
+class SimulatedProcessor(PaymentProcessor):
+    """
+    Simulated issuer with a seeded RNG, per-amount-band failure rates and
+    configurable latency. Latency is applied with asyncio.sleep so the event
+    loop keeps serving other requests while a payment "waits on the issuer".
+    """
+
+    def __init__(
+        self,
+        failure_bands: Sequence[Tuple[float, float]] = DEFAULT_FAILURE_BANDS,
+        latency: Optional[LatencyProfile] = None,
+        seed: Optional[int] = None,
+        reasons: Sequence[str] = FAILURE_REASONS,
+    ):
+        bands = sorted(failure_bands)
+        self._bounds = [bound for bound, _ in bands]
+        self._rates = np.array([rate for _, rate in bands])
+        self.latency = latency or FixedLatency(0.0)
+        self.reasons = list(reasons)
+        self.rng = np.random.default_rng(seed)
+
+    def failure_rate(self, amount: float) -> float:
+        index = min(bisect.bisect_left(self._bounds, amount), len(self._bounds) - 1)
+        return float(self._rates[index])
+
+    def draw_batch(self, amounts: Sequence[float]):
+        """
+        Draw decisions for a whole batch at once.
+        Returns (failed, reason_index, latency) NumPy arrays, one entry per amount.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        size = len(amounts)
+        bands = np.minimum(np.searchsorted(self._bounds, amounts, side="left"), len(self._bounds) - 1)
+        failed = self.rng.random(size) < self._rates[bands]
+        reason_index = self.rng.integers(len(self.reasons), size=size)
+        latency = self.latency.sample(self.rng, size)
+        return failed, reason_index, latency
+
+    async def decide(self, amount):
+        failed, reason_index, latency = self.draw_batch([amount])
+        if latency[0] > 0:
+            await asyncio.sleep(latency[0])
+        if failed[0]:
+            return "FAILED", self.reasons[reason_index[0]]
+        return "SUCCESS", ""
+
+    async def decide_batch(self, amounts, concurrency):
+        failed, reason_index, latency = self.draw_batch(amounts)
+        positive = latency[latency > 0]
+        if len(positive):
+            # Each issuer call waits its own latency, at most `concurrency` at a time
+            semaphore = asyncio.Semaphore(concurrency)
+
+            async def wait(seconds):
+                async with semaphore:
+                    await asyncio.sleep(seconds)
+
+            await asyncio.gather(*(wait(float(seconds)) for seconds in positive))
+        return [
+            ("FAILED", self.reasons[reason]) if is_failed else ("SUCCESS", "")
+            for is_failed, reason in zip(failed.tolist(), reason_index.tolist())
+        ]
+
+
+def parse_failure_bands(spec: str) -> List[Tuple[float, float]]:
+    """Parse "5000:0.2,inf:0.4" into [(5000.0, 0.2), (inf, 0.4)]"""
+    bands = []
+    for part in spec.split(","):
+        bound, rate = part.split(":")
+        bands.append((float(bound), float(rate)))
+    if not bands or not math.isinf(max(bound for bound, _ in bands)):
+        raise ValueError("Failure bands must end with an 'inf' band")
+    return bands
+
+
+def create_latency_profile() -> LatencyProfile:
+    """Build the latency profile selected by PROCESSOR_LATENCY_PROFILE"""
+    profile = settings.PROCESSOR_LATENCY_PROFILE
+    latency = settings.PROCESSOR_LATENCY_MS / 1000
+    if profile == "fixed":
+        return FixedLatency(latency)
+    if profile == "normal":
+        return NormalLatency(latency, settings.PROCESSOR_LATENCY_JITTER_MS / 1000)
+    if profile == "longtail":
+        return LongTailLatency(latency, settings.PROCESSOR_LATENCY_TAIL_SIGMA, settings.PROCESSOR_LATENCY_MAX_MS / 1000)
+    raise ValueError(f"Unknown PROCESSOR_LATENCY_PROFILE: {profile}")
+
+
+def create_processor() -> PaymentProcessor:
+    """Build the payment processor from settings"""
+    return SimulatedProcessor(
+        failure_bands=parse_failure_bands(settings.PROCESSOR_FAILURE_BANDS),
+        latency=create_latency_profile(),
+        seed=settings.PROCESSOR_SEED,
+    )
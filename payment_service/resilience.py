@@ -0,0 +1,264 @@
+import asyncio
+import math
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Optional
+
+import httpx
+from fastapi import HTTPException, status
+
+from .config import settings
+from . import metrics
+
+# CircuitBreaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Rejected(httpx.TransportError):
+    """A Django call refused locally, without reaching Django"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class CircuitOpen(Rejected):
+    pass
+
+
+class BulkheadFull(Rejected):
+    pass
+
+
+class Bulkhead:
+    """
+    Limits concurrent calls to `max_concurrent`. Callers beyond that wait in
+    FIFO order for at most `max_wait` seconds, then fail with BulkheadFull.
+    """
+
+    def __init__(self, max_concurrent: int, max_wait: float):
+        self.max_concurrent = max_concurrent
+        self.max_wait = max_wait
+        self.active = 0
+        self._waiters = deque()
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self):
+        if self.active < self.max_concurrent and not self._waiters:
+            self.active += 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append(future)
+        try:
+            await asyncio.wait_for(future, self.max_wait)
+        except asyncio.TimeoutError:
+            raise BulkheadFull("Too many Django calls in flight", retry_after=self.max_wait)
+        except BaseException:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just as we were cancelled; pass it on
+                self.release()
+            raise
+        finally:
+            if future in self._waiters:
+                self._waiters.remove(future)
+
+    def release(self):
+        # Hand the slot straight to the next live waiter, otherwise free it
+        while self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                return
+        self.active -= 1
+
+    async def __aenter__(self):
+        await self.acquire()
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `reset_timeout` seconds. It then goes half-open and lets up to
+    `half_open_calls` probes through: a successful probe closes the circuit,
+    a failed one opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, half_open_calls: int = 1, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_calls = half_open_calls
+        self._clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probes = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit lets a probe through (0 when it is not open)"""
+        if self.state != OPEN:
+            return 0.0
+        return max(self.opened_at + self.reset_timeout - self._clock(), 0.0)
+
+    def before_call(self):
+        """Raise CircuitOpen if the call must not go through"""
+        if self.state == OPEN:
+            if self.retry_after() > 0:
+                raise CircuitOpen("Django circuit is open", retry_after=self.retry_after())
+            self.state = HALF_OPEN
+            self._probes = 0
+        if self.state == HALF_OPEN:
+            if self._probes >= self.half_open_calls:
+                raise CircuitOpen("Django circuit is half-open", retry_after=self.reset_timeout)
+            self._probes += 1
+
+    def record(self, success: Optional[bool]):
+        """Record a call's outcome; None means it never reached Django"""
+        if self.state == HALF_OPEN:
+            self._probes -= 1
+            if success:
+                self.state = CLOSED
+                self.failures = 0
+            elif success is False:
+                self._open()
+            return
+        if success:
+            self.failures = 0
+        elif success is False:
+            self.failures += 1
+            if self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = self._clock()
+        self.failures = 0
+
+
+class DjangoGuard:
+    """Bulkhead and circuit breaker shared by every Django call, plus a moving average of their latency"""
+
+    def __init__(self, bulkhead: Bulkhead, breaker: CircuitBreaker, latency_alpha: float = 0.2):
+        self.bulkhead = bulkhead
+        self.breaker = breaker
+        self.latency_alpha = latency_alpha
+        self.latency = 0.0
+
+    def observe(self, seconds: float):
+        self.latency += self.latency_alpha * (seconds - self.latency)
+
+    def stats(self) -> dict:
+        return {
+            "circuit": self.breaker.state,
+            "bulkhead_active": self.bulkhead.active,
+            "bulkhead_waiting": self.bulkhead.waiting,
+            "latency_seconds": round(self.latency, 6),
+        }
+
+
+class GuardedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper that sends every request through a DjangoGuard"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, guard: DjangoGuard):
+        self.transport = transport
+        self.guard = guard
+
+    async def handle_async_request(self, request):
+        guard = self.guard
+        guard.breaker.before_call()
+        success = None
+        try:
+            async with guard.bulkhead:
+                start = time.perf_counter()
+                try:
+                    response = await self.transport.handle_async_request(request)
+                except Exception:
+                    success = False
+                    raise
+                finally:
+                    guard.observe(time.perf_counter() - start)
+                success = response.status_code < 500
+                return response
+        finally:
+            guard.breaker.record(success)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+class AdmissionController:
+    """
+    Fail-fast admission for /payments/process. Requests are rejected with 429
+    when too many payments are in progress or too many Django calls are queued
+    at the bulkhead, and with 503 while the circuit is open or Django latency
+    is above `max_latency` with calls queueing. Rejections carry Retry-After.
+    """
+
+    def __init__(self, guard: DjangoGuard, max_in_flight: int, max_queue: int, max_latency: float, retry_after: int):
+        self.guard = guard
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.max_latency = max_latency
+        self.retry_after = retry_after
+        self.in_flight = 0
+
+    def check(self):
+        guard = self.guard
+        if guard.breaker.state == OPEN and guard.breaker.retry_after() > 0:
+            self._reject(status.HTTP_503_SERVICE_UNAVAILABLE, "circuit_open", guard.breaker.retry_after())
+        if self.in_flight >= self.max_in_flight:
+            self._reject(status.HTTP_429_TOO_MANY_REQUESTS, "in_flight", self.retry_after)
+        if guard.bulkhead.waiting >= self.max_queue:
+            self._reject(status.HTTP_429_TOO_MANY_REQUESTS, "queue", self.retry_after)
+        if guard.latency >= self.max_latency and guard.bulkhead.waiting:
+            self._reject(status.HTTP_503_SERVICE_UNAVAILABLE, "latency", self.retry_after)
+
+    @contextmanager
+    def admit(self):
+        """Count the request as in flight for the duration of the block, or raise 429/503"""
+        self.check()
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+
+    @staticmethod
+    def _reject(status_code: int, reason: str, retry_after: float):
+        metrics.ADMISSION_REJECTED_TOTAL.inc(reason)
+        raise HTTPException(
+            status_code=status_code,
+            detail="Payment service is overloaded, retry later",
+            headers={"Retry-After": str(max(math.ceil(retry_after), 1))},
+        )
+
+
+def create_django_guard() -> DjangoGuard:
+    """Build the Django call guard from settings"""
+    return DjangoGuard(
+        Bulkhead(settings.DJANGO_BULKHEAD_MAX_CONCURRENT, settings.DJANGO_BULKHEAD_MAX_WAIT),
+        CircuitBreaker(
+            settings.DJANGO_BREAKER_FAILURE_THRESHOLD,
+            settings.DJANGO_BREAKER_RESET_TIMEOUT,
+            settings.DJANGO_BREAKER_HALF_OPEN_CALLS,
+        ),
+    )
+
+
+def create_admission_controller(guard: DjangoGuard) -> AdmissionController:
+    """Build the /payments/process admission controller from settings"""
+    return AdmissionController(
+        guard,
+        max_in_flight=settings.ADMISSION_MAX_IN_FLIGHT,
+        max_queue=settings.ADMISSION_MAX_QUEUE,
+        max_latency=settings.ADMISSION_MAX_LATENCY,
+        retry_after=settings.ADMISSION_RETRY_AFTER,
+    )
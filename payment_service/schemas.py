@@ -1,5 +1,5 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, ValidationError
+from typing import Any, List, Optional, Union
 from decimal import Decimal
 
 
@@ -34,6 +34,42 @@ class PaymentResponse(BaseModel):
     user_id: str
 
 
+def validation_message(exc: ValidationError, root: str = "item") -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or root}: {error['msg']}"
+        for error in exc.errors()
+    )
+
+
+def validate_payment(data: Any) -> Union[PaymentRequest, str]:
+    """Validate one batch item; returns the PaymentRequest or an error message"""
+    try:
+        return PaymentRequest.model_validate(data)
+    except ValidationError as exc:
+        return validation_message(exc)
+
+
+class BatchPaymentRequest(BaseModel):
+    # Validated one by one (validate_payment), so a bad item is reported in its
+    # own result instead of rejecting the whole batch
+    payments: List[Any] = Field(..., min_length=1, description="PaymentRequest objects")
+
+
+class BatchPaymentItem(BaseModel):
+    index: int
+    ok: bool
+    payment: Optional[PaymentResponse] = None
+    error: Optional[str] = None
+
+
+class BatchPaymentResponse(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    errors: int
+    results: List[BatchPaymentItem]
+
+
 class PaymentStatusUpdate(BaseModel):
     reference_id: str
     status: str
@@ -0,0 +1,79 @@
+from typing import AsyncIterator, List, Tuple, Union
+
+from pydantic import ValidationError
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from .schemas import PaymentRequest, validation_message
+
+
+class LineTooLong(ValueError):
+    pass
+
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse for generators that keep reading the request body.
+    Starlette's default watches receive() for disconnects while streaming, which
+    would swallow body chunks; here a disconnect surfaces from request.stream().
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    """Split a byte stream into lines without ever holding more than one partial line"""
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        if b"\n" in chunk:
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                if len(line) > max_line_bytes:
+                    raise LineTooLong(f"Line exceeds {max_line_bytes} bytes")
+                yield line
+        if len(buffer) > max_line_bytes:
+            raise LineTooLong(f"Line exceeds {max_line_bytes} bytes")
+    if buffer:
+        yield buffer
+
+
+def parse_payment(line: bytes) -> Union[PaymentRequest, str]:
+    """Validate one NDJSON line; returns the PaymentRequest or an error message"""
+    try:
+        return PaymentRequest.model_validate_json(line)
+    except ValidationError as exc:
+        return validation_message(exc, root="line")
+
+
+async def iter_windows(
+    lines: AsyncIterator[bytes], window_size: int
+) -> AsyncIterator[List[Tuple[int, Union[PaymentRequest, str]]]]:
+    """
+    Group non-blank lines into windows of (record index, PaymentRequest or error).
+    Only one window is materialised at a time.
+    """
+    window = []
+    index = 0
+    try:
+        async for line in lines:
+            if not line.strip():
+                continue
+            window.append((index, parse_payment(line)))
+            index += 1
+            if len(window) >= window_size:
+                yield window
+                window = []
+    except LineTooLong:
+        # Records read before the oversized line are still processed
+        if window:
+            yield window
+        raise
+    if window:
+        yield window
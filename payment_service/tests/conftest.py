@@ -0,0 +1,46 @@
+import threading
+import time
+
+import pytest
+import uvicorn
+
+from payment_service.main import app
+from fastapi import Depends
+
+from payment_service.django_client import get_django_client
+from payment_service.delivery import InlineStatusDelivery, get_status_delivery
+from payment_service.benchmarks.django_stub import build_django_stub, stub_client
+
+
+@pytest.fixture
+def django_stub():
+    """Route the app's Django calls to an in-process stub, delivering status updates inline"""
+    stub = build_django_stub()
+
+    async def _client():
+        async with stub_client(stub) as client:
+            yield client
+
+    def _delivery(client=Depends(get_django_client)):
+        return InlineStatusDelivery(client)
+
+    app.dependency_overrides[get_django_client] = _client
+    app.dependency_overrides[get_status_delivery] = _delivery
+    yield stub
+    app.dependency_overrides.pop(get_django_client, None)
+    app.dependency_overrides.pop(get_status_delivery, None)
+
+
+@pytest.fixture
+def live_django_stub():
+    """Serve the stub on a real localhost socket so TCP connections can be observed"""
+    stub = build_django_stub()
+    server = uvicorn.Server(uvicorn.Config(stub, host="127.0.0.1", port=0, log_level="warning", lifespan="off"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    port = server.servers[0].sockets[0].getsockname()[1]
+    yield stub, f"http://127.0.0.1:{port}"
+    server.should_exit = True
+    thread.join(timeout=5)
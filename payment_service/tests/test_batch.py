@@ -0,0 +1,66 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from payment_service.main import app
+from payment_service.config import settings
+from payment_service.tests.test_payment import create_test_token
+
+client = TestClient(app)
+pytestmark = pytest.mark.usefixtures("django_stub")
+
+
+def _batch(*card_ids):
+    return {"payments": [
+        {"card_id": card_id, "amount": 10 + i, "merchant_name": f"Shop {i}"}
+        for i, card_id in enumerate(card_ids)
+    ]}
+
+
+def _post(body):
+    token = create_test_token()
+    return client.post("/payments/process/batch", json=body, headers={"Authorization": f"Bearer {token}"})
+
+
+class TestBatchPayments:
+    def test_results_in_input_order_with_single_bulk_call(self, django_stub):
+        response = _post(_batch(*range(1, 21)))
+        assert response.status_code == 200
+        data = response.json()
+        assert data["total"] == 20
+        assert data["succeeded"] + data["failed"] == 20
+        assert [item["index"] for item in data["results"]] == list(range(20))
+        assert [item["payment"]["merchant_name"] for item in data["results"]] == [f"Shop {i}" for i in range(20)]
+        assert [call[0] for call in django_stub.state.calls] == ["bulk"]
+        for item in data["results"]:
+            stored = django_stub.state.transactions[item["payment"]["reference_id"]]
+            assert stored["status"] == item["payment"]["status"]
+
+    def test_partial_failure(self):
+        response = _post(_batch(1, 404, 2))
+        assert response.status_code == 200
+        data = response.json()
+        assert data["errors"] == 1
+        assert [item["ok"] for item in data["results"]] == [True, False, True]
+        assert data["results"][1]["error"] == "Card not found."
+
+    def test_invalid_items_are_reported_per_item(self, django_stub):
+        body = _batch(1, 2, 3)
+        body["payments"][1]["amount"] = 0
+        body["payments"].append("not a payment")
+        response = _post(body)
+        assert response.status_code == 200
+        data = response.json()
+        assert (data["total"], data["errors"]) == (4, 2)
+        assert [item["ok"] for item in data["results"]] == [True, False, True, False]
+        assert data["results"][1]["error"].startswith("amount:")
+        assert data["results"][3]["payment"] is None
+        # Only the valid payments reach Django
+        assert [item["payment"]["merchant_name"] for item in data["results"] if item["ok"]] == ["Shop 0", "Shop 2"]
+        assert len(django_stub.state.transactions) == 2
+
+    def test_empty_batch_rejected(self):
+        assert _post({"payments": []}).status_code == 422
+
+    def test_max_items(self, monkeypatch):
+        monkeypatch.setattr(settings, "PAYMENT_BATCH_MAX_ITEMS", 3)
+        assert _post(_batch(1, 2, 3, 4)).status_code == 413
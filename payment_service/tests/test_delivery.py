@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from payment_service.delivery import DeadLetterStore, StatusDeliveryQueue
+
+
+class FakeDjango:
+    """
+    Serves the bulk update-status endpoint; `failures` maps reference_id ->
+    statuses to answer first. A 5xx fails the whole request, a 404 reports
+    the reference as not found. Tokens in `expired` are answered with 401.
+    """
+
+    def __init__(self, failures=None, expired=()):
+        self.updates = []
+        self.requests = []
+        self.failures = failures or {}
+        self.expired = set(expired)
+
+    def handler(self, request: httpx.Request):
+        assert request.url.path == "/api/transactions/update-status/bulk/"
+        updates = json.loads(request.content)["updates"]
+        self.requests.append((request.headers["authorization"], [u["reference_id"] for u in updates]))
+        if request.headers["authorization"].removeprefix("Bearer ") in self.expired:
+            return httpx.Response(401, json={"error": "Token is expired"})
+        server_errors = [
+            self.failures[u["reference_id"]].pop(0) for u in updates
+            if self.failures.get(u["reference_id"]) and self.failures[u["reference_id"]][0] >= 500
+        ]
+        if server_errors:
+            return httpx.Response(server_errors[0], json={"error": "failure"})
+        not_found = []
+        for update in updates:
+            pending_failures = self.failures.get(update["reference_id"])
+            if pending_failures:
+                pending_failures.pop(0)
+                not_found.append(update["reference_id"])
+                continue
+            self.updates.append((update["reference_id"], update["status"]))
+        return httpx.Response(200, json={
+            "updated": len(updates) - len(not_found), "not_found": not_found, "errors": [],
+        })
+
+    def client(self):
+        return httpx.AsyncClient(transport=httpx.MockTransport(self.handler), base_url="http://django")
+
+
+def make_queue(django, **kwargs):
+    options = {"backoff_base": 0.01, "backoff_max": 0.05}
+    options.update(kwargs)
+    return StatusDeliveryQueue(django.client(), **options)
+
+
+@pytest.mark.asyncio
+async def test_delivers_and_drains_on_stop():
+    django = FakeDjango()
+    queue = make_queue(django)
+    queue.start()
+    for i in range(120):
+        await queue.put("token", f"REF{i}", "SUCCESS")
+    await queue.stop(timeout=5)
+    assert len(django.updates) == 120
+    assert queue.stats()["depth"] == 0
+    assert queue.stats()["delivered"] == 120
+
+
+@pytest.mark.asyncio
+async def test_coalesces_updates_per_reference():
+    django = FakeDjango()
+    queue = make_queue(django)
+    await queue.put("token", "REF1", "FAILED", "Card declined by issuer")
+    await queue.put("token", "REF1", "SUCCESS")
+    queue.start()
+    await queue.stop(timeout=5)
+    assert django.updates == [("REF1", "SUCCESS")]
+    assert queue.coalesced == 1
+
+
+@pytest.mark.asyncio
+async def test_retries_server_errors_with_backoff():
+    django = FakeDjango(failures={"REF1": [503, 502]})
+    queue = make_queue(django)
+    queue.start()
+    await queue.put("token", "REF1", "SUCCESS")
+    await queue.stop(timeout=5)
+    assert django.updates == [("REF1", "SUCCESS")]
+    assert queue.retried == 2
+
+
+@pytest.mark.asyncio
+async def test_client_errors_and_exhausted_retries_are_dead_lettered(tmp_path):
+    django = FakeDjango(failures={"GONE": [404], "DOWN": [503] * 10})
+    dead_letters = DeadLetterStore(str(tmp_path / "dead.sqlite3"))
+    queue = make_queue(django, max_attempts=3, dead_letters=dead_letters)
+    queue.start()
+    # Different tokens go out as separate bulk calls, so DOWN's 503s do not hold GONE back
+    await queue.put("token-a", "GONE", "SUCCESS")
+    await queue.put("token-b", "DOWN", "FAILED", "Card declined by issuer", user_id=7)
+    await queue.stop(timeout=5)
+    assert django.updates == []
+    assert queue.dropped == 2
+    assert queue.retried == 2
+    rows = {row["reference_id"]: row for row in DeadLetterStore(dead_letters.path).entries()}
+    assert rows["GONE"]["reason"] == "rejected by Django"
+    assert (rows["DOWN"]["user_id"], rows["DOWN"]["status"], rows["DOWN"]["attempts"]) == ("7", "FAILED", 3)
+    assert rows["DOWN"]["reason"].endswith("after 3 attempts")
+
+
+@pytest.mark.asyncio
+async def test_expired_token_is_retried_with_the_users_newest_token(tmp_path):
+    django = FakeDjango(expired={"old-token"})
+    dead_letters = DeadLetterStore(str(tmp_path / "dead.sqlite3"))
+    queue = make_queue(django, dead_letters=dead_letters)
+    queue.start()
+    await queue.put("old-token", "REF1", "SUCCESS", user_id=1)
+    while not django.requests:
+        await asyncio.sleep(0)
+    # The user comes back with a fresh token while REF1 is backing off
+    await queue.put("new-token", "REF2", "SUCCESS", user_id=1)
+    await queue.stop(timeout=5)
+    assert sorted(django.updates) == [("REF1", "SUCCESS"), ("REF2", "SUCCESS")]
+    assert django.requests[0] == ("Bearer old-token", ["REF1"])
+    assert queue.retried == 1
+    assert queue.dropped == 0
+    assert DeadLetterStore(dead_letters.path).entries() == []
+
+
+@pytest.mark.asyncio
+async def test_one_bulk_call_per_token():
+    django = FakeDjango(failures={"A2": [404]})
+    queue = make_queue(django)
+    for i in range(5):
+        await queue.put("token-a", f"A{i}", "SUCCESS")
+    for i in range(3):
+        await queue.put("token-b", f"B{i}", "FAILED", "Card declined by issuer")
+    queue.start()
+    await queue.stop(timeout=5)
+    assert sorted(django.requests) == [
+        ("Bearer token-a", ["A0", "A1", "A2", "A3", "A4"]),
+        ("Bearer token-b", ["B0", "B1", "B2"]),
+    ]
+    assert queue.delivered == 7
+    assert queue.dropped == 1
+
+
+@pytest.mark.asyncio
+async def test_server_error_retries_the_whole_call():
+    django = FakeDjango(failures={"REF2": [500]})
+    queue = make_queue(django)
+    for i in range(3):
+        await queue.put("token", f"REF{i}", "SUCCESS")
+    queue.start()
+    await queue.stop(timeout=5)
+    assert len(django.requests) == 2
+    assert sorted(django.updates) == [("REF0", "SUCCESS"), ("REF1", "SUCCESS"), ("REF2", "SUCCESS")]
+    assert queue.retried == 3
+    assert queue.delivered == 3
+
+
+@pytest.mark.asyncio
+async def test_backpressure_when_full():
+    django = FakeDjango()
+    queue = make_queue(django, maxsize=2)
+    await queue.put("token", "REF1", "SUCCESS")
+    await queue.put("token", "REF2", "SUCCESS")
+    blocked = asyncio.create_task(queue.put("token", "REF3", "SUCCESS"))
+    await asyncio.sleep(0.05)
+    assert not blocked.done()
+    assert queue.stats()["depth"] == 2
+    queue.start()
+    await asyncio.wait_for(blocked, timeout=1)
+    await queue.stop(timeout=5)
+    assert len(django.updates) == 3
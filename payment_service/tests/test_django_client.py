@@ -0,0 +1,64 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from payment_service.main import app
+from payment_service.config import settings
+from payment_service.tests.test_payment import create_test_token
+
+
+PAYMENT = {"card_id": 1, "amount": 25.00, "merchant_name": "Shop"}
+
+
+class TestDjangoRoundTrip:
+    pytestmark = pytest.mark.usefixtures("django_stub")
+
+    def test_creates_pending_then_updates_status(self, django_stub):
+        token = create_test_token()
+        with TestClient(app) as client:
+            response = client.post("/payments/process", json=PAYMENT, headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 200
+        data = response.json()
+        assert [call[0] for call in django_stub.state.calls] == ["create", "update"]
+        stored = django_stub.state.transactions[data["reference_id"]]
+        assert stored["status"] == data["status"]
+        assert stored["failure_reason"] == data["failure_reason"]
+
+    def test_card_not_found_is_passed_through(self, django_stub):
+        token = create_test_token()
+        with TestClient(app) as client:
+            response = client.post(
+                "/payments/process",
+                json={**PAYMENT, "card_id": 404},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Card not found."
+        assert [call[0] for call in django_stub.state.calls] == ["create"]
+
+
+class TestConnectionPooling:
+    def test_django_unreachable_returns_502(self, monkeypatch):
+        monkeypatch.setattr(settings, "DJANGO_API_URL", "http://127.0.0.1:9")
+        token = create_test_token()
+        with TestClient(app) as client:
+            response = client.post("/payments/process", json=PAYMENT, headers={"Authorization": f"Bearer {token}"})
+        assert response.status_code == 502
+
+    def test_connections_are_reused(self, live_django_stub, monkeypatch):
+        stub, url = live_django_stub
+        monkeypatch.setattr(settings, "DJANGO_API_URL", url)
+        token = create_test_token()
+        with TestClient(app) as client:
+            for _ in range(10):
+                response = client.post(
+                    "/payments/process", json=PAYMENT, headers={"Authorization": f"Bearer {token}"}
+                )
+                assert response.status_code == 200
+        # Leaving the client context drains the status delivery queue
+        kinds = [kind for kind, _ in stub.state.calls]
+        assert kinds.count("create") == 10
+        assert set(kinds) == {"create", "bulk-update"}
+        assert all(txn["status"] != "PENDING" for txn in stub.state.transactions.values())
+        # Payments share keep-alive connections; the delivery worker may hold
+        # one while the next payment's create uses another
+        assert len({port for _, port in stub.state.calls}) <= 2
@@ -0,0 +1,149 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+from payment_service.main import app
+from payment_service.django_client import get_django_client
+from payment_service.delivery import InlineStatusDelivery, get_status_delivery
+from payment_service.idempotency import (
+    InMemoryIdempotencyStore,
+    SQLiteIdempotencyStore,
+    NEW,
+    COMPLETED,
+    IN_FLIGHT,
+    MISMATCH,
+)
+from payment_service.benchmarks.django_stub import build_django_stub, stub_client
+from payment_service.tests.test_payment import create_test_token
+
+client = TestClient(app)
+PAYMENT = {"card_id": 1, "amount": 75.00, "merchant_name": "Shop"}
+
+
+def _post(key, body=PAYMENT, user_id=1):
+    headers = {"Authorization": f"Bearer {create_test_token(user_id=user_id)}", "Idempotency-Key": key}
+    return client.post("/payments/process", json=body, headers=headers)
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.usefixtures("django_stub")
+class TestIdempotentPayments:
+    def test_replay_returns_stored_response(self, django_stub):
+        key = str(uuid.uuid4())
+        first = _post(key)
+        second = _post(key)
+        assert first.status_code == second.status_code == 200
+        assert second.json() == first.json()
+        assert second.headers["Idempotent-Replayed"] == "true"
+        assert [call[0] for call in django_stub.state.calls] == ["create", "update"]
+
+    def test_key_reused_with_different_body(self):
+        key = str(uuid.uuid4())
+        assert _post(key).status_code == 200
+        assert _post(key, {**PAYMENT, "amount": 80.00}).status_code == 422
+
+    def test_keys_are_scoped_per_user(self):
+        key = str(uuid.uuid4())
+        first = _post(key, user_id=1)
+        second = _post(key, user_id=2)
+        assert first.json()["reference_id"] != second.json()["reference_id"]
+
+    def test_failed_request_releases_key(self, django_stub):
+        key = str(uuid.uuid4())
+        assert _post(key, {**PAYMENT, "card_id": 404}).status_code == 404
+        assert _post(key, {**PAYMENT, "card_id": 404}).status_code == 404
+        assert [call[0] for call in django_stub.state.calls] == ["create", "create"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_duplicates_wait_for_original():
+    stub = build_django_stub(latency=0.05)
+    django = stub_client(stub)
+    app.dependency_overrides[get_django_client] = lambda: django
+    app.dependency_overrides[get_status_delivery] = lambda: InlineStatusDelivery(django)
+    headers = {"Authorization": f"Bearer {create_test_token()}", "Idempotency-Key": str(uuid.uuid4())}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://payments") as ac:
+            responses = await asyncio.gather(*(
+                ac.post("/payments/process", json=PAYMENT, headers=headers) for _ in range(5)
+            ))
+    finally:
+        app.dependency_overrides.pop(get_django_client, None)
+        app.dependency_overrides.pop(get_status_delivery, None)
+        await django.aclose()
+    assert {r.status_code for r in responses} == {200}
+    assert len({r.json()["reference_id"] for r in responses}) == 1
+    assert [call[0] for call in stub.state.calls] == ["create", "update"]
+
+
+class TestInMemoryIdempotencyStore:
+    @pytest.mark.asyncio
+    async def test_lifecycle(self):
+        store = InMemoryIdempotencyStore(ttl=60, lock_timeout=5, max_keys=10)
+        assert await store.begin("k", "f") == (NEW, None)
+        assert await store.begin("k", "f") == (IN_FLIGHT, None)
+        await store.complete("k", "f", {"ok": True})
+        assert await store.begin("k", "f") == (COMPLETED, {"ok": True})
+        assert await store.begin("k", "other") == (MISMATCH, None)
+
+    @pytest.mark.asyncio
+    async def test_ttl_and_size_eviction(self):
+        clock = FakeClock()
+        store = InMemoryIdempotencyStore(ttl=60, lock_timeout=5, max_keys=2, clock=clock)
+        for key in ("a", "b", "c"):
+            await store.begin(key, "f")
+            await store.complete(key, "f", {"key": key})
+        assert await store.begin("a", "f") == (NEW, None)
+        clock.now += 61
+        assert (await store.begin("c", "f"))[0] == NEW
+
+    @pytest.mark.asyncio
+    async def test_stale_in_flight_claim_can_be_taken_over(self):
+        clock = FakeClock()
+        store = InMemoryIdempotencyStore(ttl=60, lock_timeout=5, max_keys=10, clock=clock)
+        await store.begin("k", "f")
+        clock.now += 6
+        assert await store.begin("k", "f") == (NEW, None)
+
+
+class TestSQLiteIdempotencyStore:
+    @pytest.mark.asyncio
+    async def test_shared_between_workers(self, tmp_path):
+        path = str(tmp_path / "idempotency.sqlite3")
+        worker_a = SQLiteIdempotencyStore(path, ttl=60, lock_timeout=5, poll_interval=0.01)
+        worker_b = SQLiteIdempotencyStore(path, ttl=60, lock_timeout=5, poll_interval=0.01)
+        try:
+            assert await worker_a.begin("k", "f") == (NEW, None)
+            assert await worker_b.begin("k", "f") == (IN_FLIGHT, None)
+
+            async def finish():
+                await asyncio.sleep(0.05)
+                await worker_a.complete("k", "f", {"reference_id": "ABC"})
+
+            waited, _ = await asyncio.gather(worker_b.wait("k", timeout=2), finish())
+            assert waited
+            assert await worker_b.begin("k", "f") == (COMPLETED, {"reference_id": "ABC"})
+        finally:
+            worker_a.close()
+            worker_b.close()
+
+    @pytest.mark.asyncio
+    async def test_release_allows_retry(self, tmp_path):
+        store = SQLiteIdempotencyStore(str(tmp_path / "i.sqlite3"), ttl=60, lock_timeout=5)
+        try:
+            await store.begin("k", "f")
+            await store.release("k")
+            assert await store.begin("k", "f") == (NEW, None)
+        finally:
+            store.close()
@@ -0,0 +1,28 @@
+import json
+
+from payment_service.benchmarks import loadtest
+
+
+def test_report_shape(tmp_path):
+    output = tmp_path / "bench.json"
+    exit_code = loadtest.main_cli([
+        "--concurrency", "1,4", "--requests", "20", "--batch-size", "3", "--output", str(output),
+    ])
+    assert exit_code == 0
+    report = json.loads(output.read_text())
+    assert [(r["scenario"], r["concurrency"]) for r in report["results"]] == [
+        ("health", 1), ("health", 4), ("process", 1), ("process", 4), ("batch", 1), ("batch", 4),
+    ]
+    for result in report["results"]:
+        assert result["requests"] == 20
+        assert result["errors"] == 0
+        assert result["rps"] > 0
+        assert result["p50_ms"] <= result["p95_ms"] <= result["p99_ms"]
+
+
+def test_compare_flags_regressions():
+    baseline = {"results": [{"scenario": "process", "concurrency": 8, "rps": 1000, "p99_ms": 10}]}
+    same = [{"scenario": "process", "concurrency": 8, "rps": 950, "p99_ms": 11}]
+    worse = [{"scenario": "process", "concurrency": 8, "rps": 500, "p99_ms": 30}]
+    assert loadtest.compare(same, baseline, tolerance=0.15) == []
+    assert len(loadtest.compare(worse, baseline, tolerance=0.15)) == 2
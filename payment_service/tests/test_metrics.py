@@ -0,0 +1,83 @@
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from payment_service import metrics
+from payment_service.main import app
+from payment_service.tests.test_payment import create_test_token
+
+client = TestClient(app)
+
+
+def _sample(text, line_prefix):
+    for line in text.splitlines():
+        if line.startswith(line_prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+
+
+@pytest.mark.usefixtures("django_stub")
+class TestMetricsEndpoint:
+    def test_exposes_request_and_payment_metrics(self):
+        token = create_test_token()
+        client.post(
+            "/payments/process",
+            json={"card_id": 1, "amount": 10.00, "merchant_name": "Shop"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+        assert '# TYPE http_request_duration_seconds histogram' in text
+        assert _sample(text, 'http_request_duration_seconds_count{method="POST",route="/payments/process",status="200"}') >= 1
+        assert 'jwt_verify_duration_seconds_count{result=' in text
+        assert 'payment_decision_duration_seconds_count{mode="single"}' in text
+        assert 'payments_total{status=' in text
+        assert 'http_requests_in_flight{route="/metrics"} 1' in text
+
+    def test_unknown_routes_share_one_label(self):
+        client.get("/no-such-route")
+        assert 'route="unmatched",status="404"' in client.get("/metrics").text
+
+
+class TestPrimitives:
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = metrics.Histogram("test_seconds", "test", ("kind",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, "a")
+        lines = histogram.render()
+        assert 'test_seconds_bucket{kind="a",le="0.1"} 1' in lines
+        assert 'test_seconds_bucket{kind="a",le="1.0"} 2' in lines
+        assert 'test_seconds_bucket{kind="a",le="+Inf"} 3' in lines
+        assert 'test_seconds_count{kind="a"} 3' in lines
+
+    def test_counter_shards_are_merged_across_threads(self):
+        counter = metrics.Counter("test_total", "test", ("status",))
+
+        def work():
+            for _ in range(1000):
+                counter.inc("SUCCESS")
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert counter.value("SUCCESS") == 4000
+
+    def test_label_values_are_escaped(self):
+        counter = metrics.Counter("test_total", "test", ("reason",))
+        counter.inc('say "hi"\n')
+        assert 'test_total{reason="say \\"hi\\"\\n"} 1' in counter.render()
+
+    def test_observation_cost_is_a_few_microseconds(self):
+        histogram = metrics.Histogram("cost_seconds", "test", ("route",))
+        iterations = 20000
+        start = time.perf_counter()
+        for _ in range(iterations):
+            histogram.observe(0.003, "/payments/process")
+        per_call = (time.perf_counter() - start) / iterations
+        assert per_call < 10e-6
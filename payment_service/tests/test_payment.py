@@ -13,6 +13,9 @@ from payment_service.config import settings
 
 client = TestClient(app)
 
+# Django is replaced by the in-process stub from conftest.py
+pytestmark = pytest.mark.usefixtures("django_stub")
+
 
 def create_test_token(user_id=1, is_admin=False, expired=False):
     expiry = datetime.utcnow() + (timedelta(hours=-1) if expired else timedelta(hours=1))
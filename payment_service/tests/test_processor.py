@@ -0,0 +1,81 @@
+import asyncio
+import math
+import time
+
+import numpy as np
+import pytest
+
+from payment_service.processor import (
+    SimulatedProcessor,
+    FixedLatency,
+    NormalLatency,
+    LongTailLatency,
+    parse_failure_bands,
+)
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+class TestSimulatedProcessor:
+    def test_same_seed_same_decisions(self):
+        amounts = [10.0, 6000.0, 250.0] * 50
+        first = _run(SimulatedProcessor(seed=7).decide_batch(amounts, concurrency=4))
+        second = _run(SimulatedProcessor(seed=7).decide_batch(amounts, concurrency=4))
+        assert first == second
+
+    def test_failure_bands(self):
+        processor = SimulatedProcessor(failure_bands=[(100.0, 0.0), (math.inf, 1.0)], seed=1)
+        decisions = _run(processor.decide_batch([100.0, 100.01, 50.0], concurrency=4))
+        assert [status for status, _ in decisions] == ["SUCCESS", "FAILED", "SUCCESS"]
+        assert decisions[1][1] in processor.reasons
+        assert processor.failure_rate(5000.0) == 1.0
+
+    def test_default_failure_rate(self):
+        processor = SimulatedProcessor(seed=3)
+        failed, _, _ = processor.draw_batch(np.full(20000, 10.0))
+        assert 0.18 < failed.mean() < 0.22
+        failed, _, _ = processor.draw_batch(np.full(20000, 6000.0))
+        assert 0.38 < failed.mean() < 0.42
+
+    def test_single_decision(self):
+        status, reason = _run(SimulatedProcessor(failure_bands=[(math.inf, 1.0)]).decide(10.0))
+        assert status == "FAILED"
+        assert reason
+
+    def test_latency_does_not_block_event_loop(self):
+        processor = SimulatedProcessor(latency=FixedLatency(0.05), seed=1)
+
+        async def run():
+            start = time.perf_counter()
+            await asyncio.gather(*(processor.decide(10.0) for _ in range(20)))
+            return time.perf_counter() - start
+
+        assert _run(run()) < 0.5
+
+    def test_batch_latency_bounded_concurrency(self):
+        processor = SimulatedProcessor(latency=FixedLatency(0.05), seed=1)
+        start = time.perf_counter()
+        _run(processor.decide_batch([10.0] * 4, concurrency=2))
+        assert time.perf_counter() - start >= 0.1
+
+
+class TestLatencyProfiles:
+    def test_normal_is_never_negative(self):
+        samples = NormalLatency(0.001, 0.01).sample(np.random.default_rng(0), 1000)
+        assert samples.min() >= 0
+
+    def test_longtail_has_heavy_tail_and_cap(self):
+        samples = LongTailLatency(0.01, 1.0, cap=0.5).sample(np.random.default_rng(0), 10000)
+        assert np.percentile(samples, 99) > 5 * np.median(samples)
+        assert samples.max() <= 0.5
+
+
+class TestFailureBands:
+    def test_parse(self):
+        assert parse_failure_bands("5000:0.2,inf:0.4") == [(5000.0, 0.2), (math.inf, 0.4)]
+
+    def test_requires_open_ended_band(self):
+        with pytest.raises(ValueError):
+            parse_failure_bands("5000:0.2")
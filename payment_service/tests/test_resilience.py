@@ -0,0 +1,208 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from payment_service import main
+from payment_service.main import app
+from payment_service.django_client import create_django_client, create_pending_transaction, get_django_client
+from payment_service.delivery import InlineStatusDelivery, get_status_delivery
+from payment_service.resilience import (
+    AdmissionController,
+    Bulkhead,
+    BulkheadFull,
+    CircuitBreaker,
+    CircuitOpen,
+    DjangoGuard,
+    GuardedTransport,
+    CLOSED,
+    OPEN,
+    HALF_OPEN,
+)
+from payment_service.benchmarks.django_stub import build_django_stub, stub_client
+from payment_service.tests.test_payment import create_test_token
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestBulkhead:
+    def test_limits_concurrency_and_rejects_after_max_wait(self):
+        bulkhead = Bulkhead(max_concurrent=2, max_wait=0.05)
+        peak = 0
+
+        async def call():
+            nonlocal peak
+            async with bulkhead:
+                peak = max(peak, bulkhead.active)
+                await asyncio.sleep(0.2)
+
+        async def run():
+            return await asyncio.gather(*(call() for _ in range(4)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        assert peak == 2
+        assert sum(isinstance(result, BulkheadFull) for result in results) == 2
+        assert bulkhead.active == 0 and bulkhead.waiting == 0
+
+    def test_waiters_get_slots_in_order(self):
+        bulkhead = Bulkhead(max_concurrent=1, max_wait=1.0)
+        order = []
+
+        async def call(name):
+            async with bulkhead:
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        async def run():
+            await asyncio.gather(*(call(name) for name in "abc"))
+
+        asyncio.run(run())
+        assert order == ["a", "b", "c"]
+        assert bulkhead.active == 0
+
+
+class TestCircuitBreaker:
+    def test_opens_after_consecutive_failures(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=clock)
+        for success in (False, False, True, False, False):
+            breaker.before_call()
+            breaker.record(success)
+        assert breaker.state == CLOSED
+        breaker.before_call()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        with pytest.raises(CircuitOpen) as excinfo:
+            breaker.before_call()
+        assert excinfo.value.retry_after == 10
+
+    def test_half_open_probe_closes_or_reopens(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.before_call()
+        breaker.record(False)
+        clock.now = 10
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+        # Only one probe at a time
+        with pytest.raises(CircuitOpen):
+            breaker.before_call()
+        breaker.record(False)
+        assert breaker.state == OPEN
+        clock.now = 20
+        breaker.before_call()
+        breaker.record(True)
+        assert breaker.state == CLOSED
+
+    def test_abandoned_probe_frees_the_slot(self):
+        clock = FakeClock()
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.before_call()
+        breaker.record(False)
+        clock.now = 10
+        breaker.before_call()
+        breaker.record(None)
+        breaker.before_call()
+        assert breaker.state == HALF_OPEN
+
+
+class TestGuardedTransport:
+    def test_5xx_opens_circuit_and_rejections_map_to_503(self):
+        calls = []
+
+        def handler(request):
+            calls.append(request.url.path)
+            return httpx.Response(500)
+
+        guard = DjangoGuard(Bulkhead(5, 1.0), CircuitBreaker(failure_threshold=2, reset_timeout=30))
+        client = create_django_client(transport=httpx.MockTransport(handler), guard=guard)
+
+        async def run():
+            statuses = []
+            for _ in range(4):
+                try:
+                    await create_pending_transaction(client, "token", {"card_id": 1})
+                except HTTPException as exc:
+                    statuses.append((exc.status_code, (exc.headers or {}).get("Retry-After")))
+            await client.aclose()
+            return statuses
+
+        statuses = asyncio.run(run())
+        assert statuses == [(502, None), (502, None), (503, "30"), (503, "30")]
+        assert len(calls) == 2
+        assert isinstance(client._transport, GuardedTransport)
+
+
+class TestOverload:
+    """Django is stood in by a stub with 3 workers and 20ms per call, like gunicorn under load"""
+
+    @staticmethod
+    def _run(django, concurrency=60):
+        app.dependency_overrides[get_django_client] = lambda: django
+        app.dependency_overrides[get_status_delivery] = lambda: InlineStatusDelivery(django)
+        headers = {"Authorization": f"Bearer {create_test_token()}"}
+        payment = {"card_id": 1, "amount": 20.0, "merchant_name": "Shop"}
+
+        async def one(ac):
+            start = time.perf_counter()
+            response = await ac.post("/payments/process", json=payment, headers=headers)
+            return response, time.perf_counter() - start
+
+        async def run():
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://payments") as ac:
+                results = await asyncio.gather(*(one(ac) for _ in range(concurrency)))
+            await django.aclose()
+            return results
+
+        try:
+            return asyncio.run(run())
+        finally:
+            app.dependency_overrides.pop(get_django_client, None)
+            app.dependency_overrides.pop(get_status_delivery, None)
+
+    def test_tail_latency_is_bounded_by_shedding(self, monkeypatch):
+        # Unprotected: every request queues behind the 3 workers
+        monkeypatch.setattr(main.admission, "max_in_flight", 10 ** 6)
+        unprotected = self._run(stub_client(build_django_stub(latency=0.02, workers=3)))
+        assert all(response.status_code == 200 for response, _ in unprotected)
+        unprotected_worst = max(elapsed for _, elapsed in unprotected)
+
+        guard = DjangoGuard(Bulkhead(max_concurrent=3, max_wait=0.1), CircuitBreaker(5, 10))
+        monkeypatch.setattr(main, "admission", AdmissionController(
+            guard, max_in_flight=6, max_queue=3, max_latency=1.0, retry_after=2,
+        ))
+        stub = build_django_stub(latency=0.02, workers=3)
+        protected = self._run(create_django_client(transport=httpx.ASGITransport(app=stub), guard=guard))
+
+        statuses = [response.status_code for response, _ in protected]
+        assert statuses.count(200) >= 6
+        rejected = [response for response, _ in protected if response.status_code in (429, 503)]
+        assert len(rejected) + statuses.count(200) == len(protected)
+        assert rejected and all(int(response.headers["Retry-After"]) >= 1 for response in rejected)
+        protected_worst = max(elapsed for _, elapsed in protected)
+        assert protected_worst < 0.5
+        assert protected_worst < unprotected_worst / 2
+        assert main.admission.in_flight == 0
+
+    def test_open_circuit_fails_fast(self, monkeypatch):
+        guard = DjangoGuard(Bulkhead(3, 0.1), CircuitBreaker(failure_threshold=1, reset_timeout=30))
+        monkeypatch.setattr(main, "admission", AdmissionController(
+            guard, max_in_flight=100, max_queue=100, max_latency=1.0, retry_after=1,
+        ))
+        guard.breaker.record(False)
+        stub = build_django_stub()
+        [(response, _)] = self._run(
+            create_django_client(transport=httpx.ASGITransport(app=stub), guard=guard), concurrency=1
+        )
+        assert response.status_code == 503
+        assert 29 <= int(response.headers["Retry-After"]) <= 30
+        assert stub.state.calls == []
@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+
+from payment_service.main import app
+from payment_service.config import settings
+from payment_service.django_client import get_django_client
+from payment_service.streaming import iter_lines, LineTooLong
+from payment_service.benchmarks.django_stub import build_django_stub, stub_client
+from payment_service.tests.test_payment import create_test_token
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def stream_stub(monkeypatch):
+    # The streamed body outlives the request's dependencies, so use one long-lived client
+    monkeypatch.setattr(settings, "PAYMENT_STREAM_WINDOW", 10)
+    stub = build_django_stub()
+    app.dependency_overrides[get_django_client] = lambda: stub_client(stub)
+    yield stub
+    app.dependency_overrides.pop(get_django_client, None)
+
+
+def _ndjson(records):
+    return "".join((r if isinstance(r, str) else json.dumps(r)) + "\n" for r in records).encode()
+
+
+def _post(body):
+    token = create_test_token()
+    response = client.post(
+        "/payments/process/stream",
+        content=body,
+        headers={"Authorization": f"Bearer {token}", "Content-Type": "application/x-ndjson"},
+    )
+    return response, [json.loads(line) for line in response.text.splitlines()]
+
+
+class TestPaymentStream:
+    def test_results_stream_in_input_order(self, stream_stub):
+        records = [{"card_id": 1, "amount": 5 + i, "merchant_name": f"Shop {i}"} for i in range(35)]
+        response, results = _post(_ndjson(records))
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert [r["index"] for r in results] == list(range(35))
+        assert all(r["ok"] for r in results)
+        assert [r["payment"]["merchant_name"] for r in results] == [f"Shop {i}" for i in range(35)]
+        # One bulk call per window of 10 lines
+        assert [call[0] for call in stream_stub.state.calls] == ["bulk"] * 4
+
+    def test_bad_lines_do_not_stop_the_stream(self, stream_stub):
+        records = [
+            {"card_id": 1, "amount": 10, "merchant_name": "A"},
+            "{not json",
+            {"card_id": 1, "amount": 0, "merchant_name": "B"},
+            "",
+            {"card_id": 404, "amount": 10, "merchant_name": "C"},
+            {"card_id": 1, "amount": 10, "merchant_name": "D"},
+        ]
+        _, results = _post(_ndjson(records))
+        assert [r["ok"] for r in results] == [True, False, False, False, True]
+        assert "amount" in results[2]["error"]
+        assert results[3]["error"] == "Card not found."
+
+    def test_oversized_line_ends_the_stream(self, stream_stub, monkeypatch):
+        monkeypatch.setattr(settings, "PAYMENT_STREAM_MAX_LINE_BYTES", 200)
+        records = [
+            {"card_id": 1, "amount": 10, "merchant_name": "A"},
+            {"card_id": 1, "amount": 10, "merchant_name": "B" * 500},
+            {"card_id": 1, "amount": 10, "merchant_name": "C"},
+        ]
+        _, results = _post(_ndjson(records))
+        assert results[0]["ok"] is True
+        assert results[-1] == {"ok": False, "error": "Line exceeds 200 bytes"}
+        assert len(results) == 2
+
+    def test_requires_auth(self, stream_stub):
+        response = client.post("/payments/process/stream", content=b"{}\n")
+        assert response.status_code in (401, 403)
+
+
+class TestIterLines:
+    @staticmethod
+    async def _collect(chunks, max_line_bytes=100):
+        async def source():
+            for chunk in chunks:
+                yield chunk
+        return [line async for line in iter_lines(source(), max_line_bytes)]
+
+    def test_lines_split_across_chunks(self):
+        lines = asyncio.run(self._collect([b'{"a"', b': 1}\n{"b": 2}', b"\n", b'{"c": 3}']))
+        assert lines == [b'{"a": 1}', b'{"b": 2}', b'{"c": 3}']
+
+    def test_line_too_long(self):
+        with pytest.raises(LineTooLong):
+            asyncio.run(self._collect([b"x" * 60, b"x" * 60]))
@@ -0,0 +1,95 @@
+import time
+
+import jwt
+import pytest
+from fastapi.testclient import TestClient
+
+from payment_service.main import app, token_cache
+from payment_service.config import settings
+from payment_service.token_cache import TokenCache
+from payment_service.tests.test_payment import create_test_token
+
+client = TestClient(app)
+
+
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+class FakeClock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenCache:
+    def test_miss_then_hit(self):
+        cache = TokenCache(maxsize=4)
+        assert cache.get("abc") is None
+        cache.set("abc", {"user_id": 1, "exp": time.time() + 60})
+        assert cache.get("abc")["user_id"] == 1
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_entry_evicted_at_exp(self):
+        clock = FakeClock(1000)
+        cache = TokenCache(maxsize=4, clock=clock)
+        cache.set("abc", {"user_id": 1, "exp": 1060})
+        clock.now = 1059
+        assert cache.get("abc") is not None
+        clock.now = 1060
+        assert cache.get("abc") is None
+        assert cache.stats()["size"] == 0
+
+    def test_lru_bound(self):
+        cache = TokenCache(maxsize=2)
+        exp = time.time() + 60
+        cache.set("a", {"exp": exp})
+        cache.set("b", {"exp": exp})
+        cache.get("a")
+        cache.set("c", {"exp": exp})
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+
+    def test_tokens_without_exp_not_cached(self):
+        cache = TokenCache(maxsize=2)
+        cache.set("a", {"user_id": 1})
+        assert cache.get("a") is None
+
+    def test_returned_payload_is_a_copy(self):
+        cache = TokenCache(maxsize=2)
+        cache.set("a", {"exp": time.time() + 60})
+        cache.get("a")["_raw_token"] = "a"
+        assert "_raw_token" not in cache.get("a")
+
+
+class TestVerifyJwtTokenCache:
+    def test_repeated_token_hits_cache(self):
+        token = create_test_token()
+        for _ in range(3):
+            response = client.get("/payments/history", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 200
+        assert token_cache.stats()["misses"] == 1
+        assert token_cache.stats()["hits"] == 2
+
+    def test_expired_token_still_rejected(self):
+        token = create_test_token(expired=True)
+        for _ in range(2):
+            response = client.get("/payments/history", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 401
+            assert response.json()["detail"] == "Token has expired"
+        assert token_cache.stats()["size"] == 0
+
+    def test_invalid_token_still_rejected(self):
+        token = jwt.encode({"user_id": 1, "exp": time.time() + 60}, "wrong-secret", algorithm=settings.JWT_ALGORITHM)
+        for _ in range(2):
+            response = client.get("/payments/history", headers={"Authorization": f"Bearer {token}"})
+            assert response.status_code == 401
+            assert response.json()["detail"] == "Invalid token"
+        assert token_cache.stats()["size"] == 0
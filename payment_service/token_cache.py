@@ -0,0 +1,66 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+
+class TokenCache:
+    """
+    Bounded LRU cache of verified JWT payloads.
+    Entries are keyed by a SHA-256 of the raw token (the token itself is
+    never used as a key) and are dropped once the token's own `exp` passes,
+    so an expired token always falls through to a full jwt.decode.
+    """
+
+    def __init__(self, maxsize: int = 1024, clock=time.time):
+        self.maxsize = maxsize
+        self._clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str):
+        """Return a copy of the cached payload, or None on a miss"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                payload, exp = entry
+                # Same rule as PyJWT: a token is expired once exp <= now
+                if exp > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return dict(payload)
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, token: str, payload: dict):
+        """Cache a verified payload until its exp claim"""
+        if self.maxsize <= 0 or "exp" not in payload:
+            return
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (dict(payload), int(payload["exp"]))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }